@@ -2,15 +2,17 @@ import random
 import copy
 import time
 from midiutil import MIDIFile
+from seeding import resolve_seed, make_rng
 
 # === 1. 导入你的适应度函数库 ===
 # 假设你的 fitness_function.py 中有一个列表叫 funcs
 # 格式: funcs = [fitness_function_1, fitness_function_2, ...]
+# （funcs 在首次访问时才生成，导入本模块不会触发）
 try:
-    from fitness_function import funcs
+    import fitness_function
 except ImportError:
     print("错误: 未找到 fitness_function.py 或 funcs 列表。请确保文件存在。")
-    funcs = []      
+    fitness_function = None
 
 # === 2. 基础配置 (严格对应课件编码) ===
 # 课件 P.43-44: 乐音体系编码
@@ -24,32 +26,32 @@ CODE_HOLD = NUM_PITCHES + 1    # 14/29 代表延长记号 (Sustain) [cite: 438,
 GENOME_LENGTH = 64 
 
 # === 3. 数据结构定义 ===
-def generate_weighted_gene():
+def generate_weighted_gene(rng=random):
     """
     加权生成基因：
     - 延长记号 (HOLD): 50% 概率 (让音符平均长度为 2 个单位，即四分音符)
     - 休止符 (REST): 10% 概率
     - 新音符 (NOTE): 40% 概率
     """
-    rand = random.random()
+    rand = rng.random()
     if rand < 0.5:
         return CODE_HOLD  # 50% 概率产生延长
     elif rand < 0.6:
         return CODE_REST  # 10% 概率产生休止
     else:
-        return random.randint(1, NUM_PITCHES) # 剩余 40% 随机产生一个音高
+        return rng.randint(1, NUM_PITCHES) # 剩余 40% 随机产生一个音高
     
 class Individual:
-    def __init__(self, genes=None):
+    def __init__(self, genes=None, rng=random):
         if genes:
             self.genes = genes
         else:
             # 使用加权生成替代原来的 random.randint
-            self.genes = [generate_weighted_gene() for _ in range(GENOME_LENGTH)]
+            self.genes = [generate_weighted_gene(rng) for _ in range(GENOME_LENGTH)]
             
             # 修正：第一个基因不能是延长记号 (因为前面没有音)，强制设为休止或随机音
             if self.genes[0] == CODE_HOLD:
-                self.genes[0] = random.randint(0, NUM_PITCHES)
+                self.genes[0] = rng.randint(0, NUM_PITCHES)
                 
         self.fitness = 0.0
     # In your Individual class:            
@@ -124,7 +126,7 @@ class MelodyAdapter:
 
 # === 4. 遗传操作算子 (对应课件 P.45-52) ===
 
-def selection_roulette(population):
+def selection_roulette(population, rng=random):
     """
     轮盘赌选择 [cite: 530, 538]
     """
@@ -134,9 +136,9 @@ def selection_roulette(population):
     
     total_fitness = sum(ind.fitness + offset for ind in population)
     if total_fitness == 0:
-        return random.choice(population)
+        return rng.choice(population)
         
-    pick = random.uniform(0, total_fitness)
+    pick = rng.uniform(0, total_fitness)
     current = 0
     for ind in population:
         current += (ind.fitness + offset)
@@ -144,41 +146,41 @@ def selection_roulette(population):
             return ind
     return population[-1]
 
-def crossover(p1, p2):
+def crossover(p1, p2, rng=random):
     """
     单点交叉 [cite: 460, 467]
     """
-    point = random.randint(1, GENOME_LENGTH - 1)
+    point = rng.randint(1, GENOME_LENGTH - 1)
     c1_genes = p1.genes[:point] + p2.genes[point:]
     c2_genes = p2.genes[:point] + p1.genes[point:]
     return Individual(c1_genes), Individual(c2_genes)
 
-def mutate(ind, rate=0.05):
+def mutate(ind, rate=0.05, rng=random):
     """
     单点变异 (使用加权逻辑)
     """
     new_genes = ind.genes[:]
     for i in range(len(new_genes)):
-        if random.random() < rate:
+        if rng.random() < rate:
             # 变异时也倾向于生成延长记号，保持节奏的长线条
-            new_genes[i] = generate_weighted_gene()
+            new_genes[i] = generate_weighted_gene(rng)
             
     # # 再次修正首位基因
     # if new_genes[0] == CODE_HOLD:
-    #     new_genes[0] = random.randint(0, NUM_PITCHES)
+    #     new_genes[0] = rng.randint(0, NUM_PITCHES)
     return Individual(new_genes)
 
-def musical_transform(ind):
+def musical_transform(ind, rng=random):
     """
     特殊变异：移调、倒影、逆行 
     """
     genes = ind.genes[:]
-    op = random.choice(['transposition', 'inversion', 'retrograde'])
+    op = rng.choice(['transposition', 'inversion', 'retrograde'])
     
     if op == 'retrograde':
         genes.reverse()
     elif op == 'transposition':
-        shift = random.choice([-2, -1, 1, 2])
+        shift = rng.choice([-2, -1, 1, 2])
         for i in range(len(genes)):
             if 1 <= genes[i] <= NUM_PITCHES:
                 val = genes[i] + shift
@@ -195,16 +197,21 @@ def musical_transform(ind):
 
 # === 5. 遗传算法主程序 ===
 
-def run_genetic_algorithm(target_fitness_func, func_name="Unknown"):
-    # 参数设置 [cite: 540]
-    POP_SIZE = 200
-    MAX_GEN = 2000
+def run_genetic_algorithm(target_fitness_func, func_name="Unknown", pop_size=200, max_gen=2000,
+                          seed=None):
+    # 参数设置 [cite: 540]（pop_size / max_gen 可由调用方覆盖，如基准测试）
+    POP_SIZE = pop_size
+    MAX_GEN = max_gen
     ELITISM_COUNT = 5 # 精英保留数量
     
+    # 随机数流：由根种子派生（seed 默认 config.RANDOM_SEED，未设置时随机生成），相同种子可复现
+    seed = resolve_seed(seed)
+    rng = make_rng(seed, 'music_math', 'run')
+    
     # 初始化种群
-    population = [Individual() for _ in range(POP_SIZE)]
+    population = [Individual(rng=rng) for _ in range(POP_SIZE)]
     
-    print(f"--- 开始运行: {func_name} ---")
+    print(f"--- 开始运行: {func_name} (随机种子: {seed}) ---")
     
     for gen in range(MAX_GEN):
         # 1. 计算适应度 [cite: 548]
@@ -233,22 +240,22 @@ def run_genetic_algorithm(target_fitness_func, func_name="Unknown"):
         
         while len(next_gen) < POP_SIZE:
             # 轮盘赌选择
-            p1 = selection_roulette(population)
-            p2 = selection_roulette(population)
+            p1 = selection_roulette(population, rng)
+            p2 = selection_roulette(population, rng)
             
             c1, c2 = Individual(p1.genes[:]), Individual(p2.genes[:])
             
             # 交叉 [cite: 556]
-            if random.random() < 0.7:
-                c1, c2 = crossover(p1, p2)
+            if rng.random() < 0.7:
+                c1, c2 = crossover(p1, p2, rng)
             
             # 变异
-            c1 = mutate(c1)
-            c2 = mutate(c2)
+            c1 = mutate(c1, rng=rng)
+            c2 = mutate(c2, rng=rng)
             
             # 特殊变换
-            if random.random() < 0.1: c1 = musical_transform(c1)
-            if random.random() < 0.1: c2 = musical_transform(c2)
+            if rng.random() < 0.1: c1 = musical_transform(c1, rng)
+            if rng.random() < 0.1: c2 = musical_transform(c2, rng)
                 
             next_gen.append(c1)
             if len(next_gen) < POP_SIZE: next_gen.append(c2)
@@ -279,9 +286,22 @@ def save_to_midi(individual, filename):
 
 # === 7. 主执行循环：枚举 funcs ===
 if __name__ == "__main__":
+    funcs = fitness_function.funcs if fitness_function else []
     if not funcs:
         print("警告: funcs 列表为空，请检查 fitness_function.py")
-    import time, os
+    else:
+        print(f"Generated {len(funcs)} unique fitness functions for testing.")
+    import time, os, argparse
+    parser = argparse.ArgumentParser(description="单染色体遗传算法：逐个运行 funcs")
+    # 默认使用 NumPy 批量引擎（music_math_numpy.py，随机数流与逐个体版本不同，输出也不同）；
+    # --engine python 使用上面的逐个体版本（与旧版本的输出一致）
+    parser.add_argument('--engine', choices=['numpy', 'python'], default='numpy',
+                        help='遗传算法引擎（默认 numpy）')
+    args = parser.parse_args()
+    if args.engine == 'numpy':
+        from music_math_numpy import run_genetic_algorithm_numpy as run_ga
+    else:
+        run_ga = run_genetic_algorithm
     ts = (int)(time.time())
     os.mkdir(f'{ts}')
     for i, fitness_func in enumerate(funcs):
@@ -289,7 +309,7 @@ if __name__ == "__main__":
         fname = fitness_func.__name__
         
         # 运行算法
-        best_ind = run_genetic_algorithm(fitness_func, func_name=fname)
+        best_ind = run_ga(fitness_func, func_name=fname)
         debug_genome(best_ind)
         # 保存结果
         output_filename = f"{ts}/output_{fname}.mid"
@@ -9,6 +9,10 @@ Ablation Study Script
 
 import os
 import sys
+import time
+import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # 导入配置和主程序
 from config import (
@@ -21,6 +25,7 @@ from main import (
 )
 from fitness_function_rhythm import rhythm_fitness_overall
 from fitness_function_pitch import pitch_fitness_overall
+from seeding import resolve_seed, derive_seed
 
 
 # 定义12个消融实验配置
@@ -175,14 +180,16 @@ def set_weights(weight_config):
         PITCH_WEIGHTS[key] = value
 
 
-def run_ablation_study(scale_name=None):
+def run_ablation_study(scale_name=None, seed=None):
     """
     运行完整的消融实验
     总共12个实验：1基线 + 5音高 + 5节奏 + 1完整
+    seed: 根随机种子，实验 i 使用 derive_seed(seed, 'ablation', i)（默认随机生成）
     """
     
     if scale_name is None:
         scale_name = DEFAULT_SCALE
+    seed = resolve_seed(seed)
     
     scale_notes = SCALES[scale_name]
     results_dir = "results"
@@ -198,6 +205,7 @@ def run_ablation_study(scale_name=None):
     print("="*70)
     print(f"\n调式: {scale_name}")
     print(f"音阶大小: {len(scale_notes)} 个音")
+    print(f"根随机种子: {seed}")
     print(f"\n实验设计（共 {len(ABLATION_EXPERIMENTS)} 个实验）:")
     print(f"  实验1: 基线（无约束）")
     print(f"  实验2-6: 单独测试5个音高函数")
@@ -221,7 +229,8 @@ def run_ablation_study(scale_name=None):
             rhythm_fitness_overall,
             pitch_fitness_overall,
             scale_notes,
-            func_name=experiment['name']
+            func_name=experiment['name'],
+            seed=derive_seed(seed, 'ablation', experiment['id'])
         )
         
         # 输出结果
@@ -253,7 +262,117 @@ def run_ablation_study(scale_name=None):
     print(f"  • 单个函数 vs 完整组合 → 函数协同效果")
 
 
+def _run_experiment_job(experiment, scale_notes, seed):
+    """
+    在独立进程中运行单个实验
+    每个进程拥有自己的权重字典和随机数流，互不干扰
+    """
+    set_weights(experiment['weights'])
+    
+    start = time.time()
+    # 子进程的逐代输出会交错，统一丢弃，由父进程汇总进度
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        best_ind = run_genetic_algorithm(
+            rhythm_fitness_overall,
+            pitch_fitness_overall,
+            scale_notes,
+            func_name=experiment['name'],
+            seed=seed
+        )
+        save_to_midi(best_ind, experiment['filename'])
+    wall_time = time.time() - start
+    
+    return {
+        'id': experiment['id'],
+        'name': experiment['name'],
+        'description': experiment['description'],
+        'filename': experiment['filename'],
+        'seed': seed,
+        'rhythm_fitness': best_ind.rhythm_fitness,
+        'pitch_fitness': best_ind.pitch_fitness,
+        'total_fitness': best_ind.total_fitness,
+        'wall_time': wall_time,
+    }
+
+
+def run_ablation_study_parallel(scale_name=None, max_workers=None, base_seed=None):
+    """
+    并行运行消融实验
+    每个实验在独立进程中运行（独立的权重、种子和输出文件），
+    总耗时约等于最慢的单个实验
+    
+    参数:
+        scale_name: 调式名称
+        max_workers: 进程数（默认 min(实验数, CPU核数)）
+        base_seed: 根随机种子，实验 i 使用 derive_seed(base_seed, 'ablation', i)（默认随机生成）
+                   与串行模式相同的种子得到相同的结果
+    
+    返回:
+        list: 每个实验的结果字典（按实验编号排序）
+    """
+    if scale_name is None:
+        scale_name = DEFAULT_SCALE
+    base_seed = resolve_seed(base_seed)
+    if max_workers is None:
+        max_workers = min(len(ABLATION_EXPERIMENTS), os.cpu_count() or 1)
+    
+    scale_notes = SCALES[scale_name]
+    results_dir = "results"
+    if not os.path.exists(results_dir):
+        os.makedirs(results_dir)
+        print(f"✓ 已创建 {results_dir}/ 文件夹")
+    
+    print("\n" + "="*70)
+    print("  消融实验 (Ablation Study) - 并行模式")
+    print("="*70)
+    print(f"\n调式: {scale_name}")
+    print(f"进程数: {max_workers}")
+    print(f"根随机种子: {base_seed}")
+    print("="*70)
+    
+    total = len(ABLATION_EXPERIMENTS)
+    results = []
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_run_experiment_job, experiment, scale_notes,
+                        derive_seed(base_seed, 'ablation', experiment['id']))
+            for experiment in ABLATION_EXPERIMENTS
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            print(f"[{done}/{total}] 完成 实验{result['id']:2d} {result['description']:<12} "
+                  f"总分={result['total_fitness']:7.2f}  耗时={result['wall_time']:6.1f}s")
+    wall_time = time.time() - start
+    
+    results.sort(key=lambda r: r['id'])
+    
+    # 汇总表
+    print("\n" + "="*70)
+    print("  ✓ 消融实验完成！")
+    print("="*70)
+    print(f"{'编号':>4}  {'实验':<20} {'节奏':>8} {'音高':>8} {'总分':>8} {'耗时(s)':>8}  {'种子':>20}")
+    print("-"*70)
+    for r in results:
+        print(f"{r['id']:>4}  {r['name']:<20} {r['rhythm_fitness']:8.2f} {r['pitch_fitness']:8.2f} "
+              f"{r['total_fitness']:8.2f} {r['wall_time']:8.1f}  {r['seed']:>20}")
+    print("-"*70)
+    slowest = max(r['wall_time'] for r in results)
+    print(f"总耗时: {wall_time:.1f}s (最慢实验: {slowest:.1f}s, "
+          f"串行合计: {sum(r['wall_time'] for r in results):.1f}s)")
+    print(f"\nMIDI文件已保存到 results/，运行 'python playmid.py' 播放所有结果")
+    
+    return results
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="消融实验")
+    parser.add_argument('--parallel', action='store_true', help='多进程并行运行所有实验')
+    parser.add_argument('--workers', type=int, default=None, help='并行模式的进程数')
+    parser.add_argument('--seed', type=int, default=None, help='根随机种子（串行与并行模式结果一致）')
+    args = parser.parse_args()
+    
     print("\n消融实验")
     print("测试10个适应度函数：")
     print("  音高函数（5个）:")
@@ -269,7 +388,10 @@ if __name__ == "__main__":
     print("    9. rest - 休止符分布")
     print("    10. pattern - 节奏模式")
     print(f"\n总实验数: {len(ABLATION_EXPERIMENTS)} 个")
-    print(f"预计耗时: 约 {len(ABLATION_EXPERIMENTS) * 2}-{len(ABLATION_EXPERIMENTS) * 4} 分钟")
+    if args.parallel:
+        print(f"预计耗时: 约 2-4 分钟（并行模式，取决于最慢的实验）")
+    else:
+        print(f"预计耗时: 约 {len(ABLATION_EXPERIMENTS) * 2}-{len(ABLATION_EXPERIMENTS) * 4} 分钟")
     
     # 用户选择调式
     print("\n可用调式:")
@@ -294,6 +416,9 @@ if __name__ == "__main__":
     
     confirm = input(f"\n确认开始消融实验? (y/N): ").strip().lower()
     if confirm in ['y', 'yes']:
-        run_ablation_study(chosen_scale)
+        if args.parallel:
+            run_ablation_study_parallel(chosen_scale, max_workers=args.workers, base_seed=args.seed)
+        else:
+            run_ablation_study(chosen_scale, seed=args.seed)
     else:
         print("已取消")
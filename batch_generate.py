@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+批量生成（非交互）
+Headless Batch Generation
+
+main.py 的入口需要 input() 选择调式，每个进程只生成一段旋律。
+本脚本在一个进程内生成多段旋律：SCALES、适应度函数库与进程池只构建一次。
+
+用法:
+    python batch_generate.py --scales C_major A_minor --count 5 --seed 100
+    python batch_generate.py --scales all --preset quick_test --output-dir out/
+    python batch_generate.py --seeds 1 2 3 --workers 4
+    python batch_generate.py --engine numpy --count 10 --quiet
+    python batch_generate.py --count 50 --quiet --telemetry 10
+    python batch_generate.py --count 200 --quiet --pack sections
+
+每段旋律的随机种子为 种子基数 + 序号（--seeds 显式给出时按列表使用；
+都未给出时每段随机生成），结果写入输出目录，并附带 manifest.json
+记录调式、实际使用的种子与得分，可用 --seeds 逐段复现。
+指定 --telemetry N 时，每段旋律每 N 代的得分统计、评估次数与耗时
+追加写入输出目录下的 telemetry.jsonl（run 字段为该段的名称）。
+指定 --pack tracks / sections 时不再逐段写文件，全部旋律打包写入
+输出目录下的 batch.mid（每段一条音轨，或同一音轨上首尾相接并以段名标记）。
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from contextlib import redirect_stdout, ExitStack
+
+from config import CONFIG_PRESETS, DEFAULT_SCALE, RESULTS_DIR, PARALLEL_WORKERS
+from main import run_genetic_algorithm, save_to_midi, SCALES
+from midi_writer import write_midi_packed, PACK_LAYOUTS
+from telemetry import TelemetryRecorder
+from fitness_function_rhythm import rhythm_fitness_overall
+from fitness_function_pitch import pitch_fitness_overall
+
+
+PACKED_FILENAME = 'batch.mid'
+
+
+def _build_jobs(scale_names, count, seeds, base_seed):
+    """展开为 [(scale_name, seed), ...]"""
+    if seeds:
+        per_scale = list(seeds)
+    elif base_seed is not None:
+        per_scale = [base_seed + i for i in range(count)]
+    else:
+        per_scale = [None] * count
+    return [(scale_name, seed) for scale_name in scale_names for seed in per_scale]
+
+
+def _run_one(scale_notes, seed, engine, preset, evaluator, func_name, run_info,
+             telemetry=None):
+    """生成一段旋律，返回最优个体（运行信息写入 run_info）"""
+    if engine == 'numpy':
+        from ga_numpy import run_genetic_algorithm_numpy
+        return run_genetic_algorithm_numpy(
+            rhythm_fitness_overall, pitch_fitness_overall, scale_notes,
+            func_name=func_name,
+            pop_size=preset['POP_SIZE'], max_gen=preset['MAX_GEN'],
+            run_info=run_info, seed=seed, telemetry=telemetry,
+        )
+    return run_genetic_algorithm(
+        rhythm_fitness_overall, pitch_fitness_overall, scale_notes,
+        func_name=func_name, evaluator=evaluator,
+        pop_size=preset['POP_SIZE'], max_gen=preset['MAX_GEN'], run_info=run_info,
+        seed=seed, telemetry=telemetry,
+    )
+
+
+def batch_generate(scale_names=None, count=1, seeds=None, base_seed=None,
+                   preset='default', output_dir=None, engine='python',
+                   workers=None, quiet=False, telemetry_interval=None, pack=None):
+    """
+    在一个进程内批量生成旋律
+
+    Args:
+        scale_names: 调式名称列表（默认 DEFAULT_SCALE）
+        count: 每个调式生成的数量（给出 seeds 时忽略）
+        seeds: 显式种子列表，每个调式各生成一段
+        base_seed: 种子基数，第 i 段使用 base_seed + i
+        preset: 'default' / 'quick_test' / 'high_quality'
+        output_dir: 输出目录（默认 RESULTS_DIR）
+        engine: 'python'（main.run_genetic_algorithm）或 'numpy'（ga_numpy）
+        workers: python 引擎共享的评估进程数（0 = 串行，默认 PARALLEL_WORKERS）
+        quiet: 不输出每一代的进度
+        telemetry_interval: 每N代向 output_dir/telemetry.jsonl 追加一条遥测记录（None = 不记录）
+        pack: None（每段一个MIDI文件）或 'tracks' / 'sections'（全部写入 output_dir/batch.mid）
+
+    Returns:
+        manifest 条目列表
+    """
+    scale_names = scale_names or [DEFAULT_SCALE]
+    output_dir = output_dir or RESULTS_DIR
+    workers = PARALLEL_WORKERS if workers is None else workers
+    preset_values = CONFIG_PRESETS[preset]
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = _build_jobs(scale_names, count, seeds, base_seed)
+
+    print(f"批量生成: {len(jobs)} 段旋律 | 调式 {', '.join(scale_names)} | "
+          f"预设 {preset} (种群 {preset_values['POP_SIZE']}, {preset_values['MAX_GEN']} 代) | "
+          f"引擎 {engine}" + (f" | {workers} 个评估进程" if engine == 'python' and workers > 0 else ""))
+
+    evaluator = None
+    if engine == 'python' and workers > 0:
+        from parallel_eval import ParallelEvaluator
+        evaluator = ParallelEvaluator(max_workers=workers)
+
+    telemetry = None
+    if telemetry_interval:
+        telemetry = TelemetryRecorder(os.path.join(output_dir, 'telemetry.jsonl'),
+                                      interval=telemetry_interval)
+
+    manifest = []
+    packed = []
+    start_time = time.perf_counter()
+    try:
+        for index, (scale_name, seed) in enumerate(jobs, 1):
+            scale_notes = SCALES[scale_name]
+            seed_label = 'none' if seed is None else seed
+            func_name = f"{scale_name}_seed{seed_label}"
+            filename = PACKED_FILENAME if pack else f"batch_{index:04d}_{func_name}.mid"
+
+            job_start = time.perf_counter()
+            run_info = {}
+            with ExitStack() as stack:
+                if quiet:
+                    stack.enter_context(redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+                best = _run_one(scale_notes, seed, engine, preset_values, evaluator, func_name,
+                                run_info, telemetry)
+                if pack:
+                    packed.append((func_name, best))
+                else:
+                    save_to_midi(best, filename, directory=output_dir)
+            elapsed = time.perf_counter() - job_start
+
+            manifest.append({
+                'index': index,
+                'scale': scale_name,
+                'seed': run_info.get('seed', seed),
+                'filename': filename,
+                'total_fitness': best.total_fitness,
+                'rhythm_fitness': best.rhythm_fitness,
+                'pitch_fitness': best.pitch_fitness,
+                'generations': run_info.get('generations'),
+                'stop_reason': run_info.get('stop_reason'),
+                'wall_time': elapsed,
+            })
+            if pack:
+                manifest[-1]['track' if pack == 'tracks' else 'section'] = len(packed) - 1
+            label = f"{filename}#{len(packed) - 1}" if pack else filename
+            print(f"[{index}/{len(jobs)}] {label}  总分={best.total_fitness:.2f}  "
+                  f"{run_info.get('generations')} 代 ({run_info.get('stop_reason')})  {elapsed:.1f}s")
+    finally:
+        if evaluator is not None:
+            evaluator.close()
+        if telemetry is not None:
+            telemetry.close()
+
+    if pack:
+        write_midi_packed(os.path.join(output_dir, PACKED_FILENAME),
+                          [best for _, best in packed], layout=pack,
+                          names=[name for name, _ in packed])
+
+    total_time = time.perf_counter() - start_time
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'preset': preset,
+            'engine': engine,
+            'workers': workers,
+            'pack': pack,
+            'total_time': total_time,
+            'melodies': manifest,
+        }, f, indent=2, ensure_ascii=False)
+
+    rate = len(jobs) / total_time if total_time > 0 else 0.0
+    print(f"\n✓ 完成: {len(jobs)} 段旋律，用时 {total_time:.1f}s（{rate:.3f} 段/秒）")
+    print(f"✓ 输出目录: {output_dir}/（清单: {manifest_path}）")
+    return manifest
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="非交互批量生成旋律")
+    parser.add_argument('--scales', nargs='+', default=[DEFAULT_SCALE],
+                        help="调式名称（'all' 表示全部调式）")
+    parser.add_argument('--count', type=int, default=1, help='每个调式生成的数量')
+    parser.add_argument('--seed', type=int, default=None, help='种子基数（第 i 段使用 seed + i）')
+    parser.add_argument('--seeds', type=int, nargs='+', default=None, help='显式种子列表')
+    parser.add_argument('--preset', choices=sorted(CONFIG_PRESETS), default='default',
+                        help='配置预设')
+    parser.add_argument('--output-dir', default=RESULTS_DIR, help='输出目录')
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='python',
+                        help='遗传算法引擎')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='python 引擎的评估进程数（0 = 串行）')
+    parser.add_argument('--quiet', action='store_true', help='不输出每一代的进度')
+    parser.add_argument('--telemetry', type=int, default=None, metavar='N',
+                        help='每N代向输出目录的 telemetry.jsonl 写入一条遥测记录')
+    parser.add_argument('--pack', choices=PACK_LAYOUTS, default=None,
+                        help=f'全部旋律写入一个 {PACKED_FILENAME}（每段一条音轨 / 首尾相接）')
+    args = parser.parse_args(argv)
+
+    scale_names = list(SCALES) if args.scales == ['all'] else args.scales
+    unknown = [name for name in scale_names if name not in SCALES]
+    if unknown:
+        parser.error(f"未知调式: {', '.join(unknown)}（可用: {', '.join(SCALES)}）")
+
+    batch_generate(scale_names=scale_names, count=args.count, seeds=args.seeds,
+                   base_seed=args.seed, preset=args.preset, output_dir=args.output_dir,
+                   engine=args.engine, workers=args.workers, quiet=args.quiet,
+                   telemetry_interval=args.telemetry, pack=args.pack)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
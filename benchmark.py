@@ -0,0 +1,340 @@
+"""
+性能基准测试
+GA Throughput Benchmarks
+
+测量内容（固定随机种子，结果写为JSON）：
+1. main.run_genetic_algorithm 在 QUICK_TEST / 默认 / HIGH_QUALITY 三种预设下的
+   每秒代数与每秒评估个体数（含缓存命中）
+2. 每个节奏/音高适应度分量函数的单次调用耗时
+3. Individual.to_notes 与 save_to_midi 的耗时
+4. Music_Math.run_genetic_algorithm 与 music_math_numpy 引擎的每秒代数与每秒评估个体数
+5. 新解释器中冷导入 main / Music_Math / ablation_study 的耗时
+   （进程池的每个工作进程启动时都要付出这部分开销）
+
+与已保存的基准（仓库中的 benchmark_baseline.json，固定种子 + --update-baseline 生成）比较：
+任一指标变差超过容差即列出并以非零状态退出；基准文件缺失或无法读取时同样以非零状态退出
+（--allow-missing-baseline 时只打印警告）。
+指标名以 _per_sec 结尾的越大越好，以 _us / _ms 结尾的越小越好。
+
+用法:
+    python benchmark.py                        # 运行并与基准比较
+    python benchmark.py --update-baseline      # 运行并保存为新基准
+    python benchmark.py --generations 5 --output bench.json
+    python benchmark.py --full                 # 按预设的 MAX_GEN 完整运行（很慢）
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+
+from config import CONFIG_PRESETS, DEFAULT_SCALE
+import main
+from main import Individual, MelodyAdapter, SCALES, save_to_midi
+from seeding import make_rng
+from fitness_function_rhythm import (
+    rhythm_fitness_parity,
+    rhythm_fitness_density,
+    rhythm_fitness_syncopation,
+    rhythm_fitness_rest,
+    rhythm_fitness_pattern,
+    rhythm_fitness_overall,
+)
+from fitness_function_pitch import (
+    pitch_fitness_stepwise,
+    pitch_fitness_consonance,
+    pitch_fitness_range,
+    pitch_fitness_direction,
+    pitch_fitness_climax,
+    pitch_fitness_overall,
+)
+
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_SEED = 42
+DEFAULT_TOLERANCE = 0.25      # 允许的相对变差（25%）
+DEFAULT_GENERATIONS = 10      # 每个预设运行的代数（--full 时使用预设的 MAX_GEN）
+SAMPLE_SIZE = 200             # 分量 / 解码计时使用的个体数量
+REPEATS = 3                   # 计时重复次数，取最快一次
+MIDI_FILES = 20               # save_to_midi 计时写出的文件数
+IMPORT_MODULES = ('main', 'Music_Math', 'ablation_study')
+
+RHYTHM_FUNCS = [
+    rhythm_fitness_parity,
+    rhythm_fitness_density,
+    rhythm_fitness_syncopation,
+    rhythm_fitness_rest,
+    rhythm_fitness_pattern,
+    rhythm_fitness_overall,
+]
+
+PITCH_FUNCS = [
+    pitch_fitness_stepwise,
+    pitch_fitness_consonance,
+    pitch_fitness_range,
+    pitch_fitness_direction,
+    pitch_fitness_climax,
+    pitch_fitness_overall,
+]
+
+
+def _best_of(func, repeats=REPEATS):
+    """重复计时，返回最快一次的秒数"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _sample_individuals(scale_notes, seed, n=SAMPLE_SIZE):
+    """固定种子生成一批随机个体"""
+    rng = make_rng(seed, 'sample')
+    return [Individual(scale_notes=scale_notes, rng=rng) for _ in range(n)]
+
+
+# ============================================================
+# 各项测量
+# ============================================================
+
+def bench_ga(scale_notes, seed, generations=None):
+    """main.run_genetic_algorithm 在各预设下的吞吐量"""
+    results = {}
+    for name in ('quick_test', 'default', 'high_quality'):
+        preset = CONFIG_PRESETS[name]
+        pop_size = preset['POP_SIZE']
+        max_gen = generations or preset['MAX_GEN']
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            main.run_genetic_algorithm(rhythm_fitness_overall, pitch_fitness_overall,
+                                       scale_notes, func_name=f"benchmark_{name}",
+                                       pop_size=pop_size, max_gen=max_gen, seed=seed)
+        elapsed = time.perf_counter() - start
+        results[f"ga.{name}.generations_per_sec"] = max_gen / elapsed
+        results[f"ga.{name}.evaluations_per_sec"] = max_gen * pop_size / elapsed
+        print(f"  {name:<13} 种群 {pop_size:<4} {max_gen} 代: {elapsed:.2f}s "
+              f"({max_gen / elapsed:.2f} 代/秒, {max_gen * pop_size / elapsed:.0f} 评估/秒)")
+    return results
+
+
+def bench_components(scale_notes, seed):
+    """每个适应度分量函数的单次调用耗时"""
+    adapters = [MelodyAdapter(ind.to_notes(), ind.rhythm_genes, ind.pitch_genes)
+                for ind in _sample_individuals(scale_notes, seed)]
+    results = {}
+    for func in RHYTHM_FUNCS + PITCH_FUNCS:
+        def run(func=func):
+            for adapter in adapters:
+                func(adapter)
+        per_call = _best_of(run) / len(adapters) * 1e6
+        results[f"fitness.{func.__name__}.per_call_us"] = per_call
+        print(f"  {func.__name__:<28} {per_call:8.2f} µs/次")
+    return results
+
+
+def bench_decode_and_midi(scale_notes, seed):
+    """Individual.to_notes 与 save_to_midi 的耗时"""
+    population = _sample_individuals(scale_notes, seed)
+
+    def decode():
+        for ind in population:
+            ind.to_notes()
+    to_notes_us = _best_of(decode) / len(population) * 1e6
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        def write():
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                for i, ind in enumerate(population[:MIDI_FILES]):
+                    save_to_midi(ind, f"bench_{i}.mid", directory=tmpdir)
+        save_ms = _best_of(write) / MIDI_FILES * 1e3
+
+    print(f"  {'Individual.to_notes':<28} {to_notes_us:8.2f} µs/次")
+    print(f"  {'save_to_midi':<28} {save_ms:8.2f} ms/次")
+    return {
+        "decode.to_notes.per_call_us": to_notes_us,
+        "midi.save_to_midi.per_call_ms": save_ms,
+    }
+
+
+def bench_music_math(seed, generations=None):
+    """Music_Math.run_genetic_algorithm 与 NumPy 引擎的吞吐量（单染色体编码）"""
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        import Music_Math
+        from music_math_numpy import run_genetic_algorithm_numpy
+        from fitness_function import create_weighted_fitness
+    fitness_func = create_weighted_fitness(1.0, 1.0, 1.0, 1.0, 1.0)
+    pop_size = 200
+    max_gen = generations or 2000
+
+    metrics = {}
+    for label, key, run in (('Music_Math', 'music_math', Music_Math.run_genetic_algorithm),
+                            ('Music_Math[np]', 'music_math_numpy', run_genetic_algorithm_numpy)):
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            run(fitness_func, func_name="benchmark", pop_size=pop_size, max_gen=max_gen, seed=seed)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<15} 种群 {pop_size:<4} {max_gen} 代: {elapsed:.2f}s "
+              f"({max_gen / elapsed:.2f} 代/秒, {max_gen * pop_size / elapsed:.0f} 评估/秒)")
+        metrics[f"{key}.generations_per_sec"] = max_gen / elapsed
+        metrics[f"{key}.evaluations_per_sec"] = max_gen * pop_size / elapsed
+    return metrics
+
+
+def bench_imports(modules=IMPORT_MODULES):
+    """在新解释器中冷导入各模块的耗时；导入时有输出则给出警告"""
+    code = ("import time; start = time.perf_counter(); import {0}; "
+            "print(time.perf_counter() - start)")
+    root = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module in modules:
+        best = float('inf')
+        for _ in range(REPEATS):
+            proc = subprocess.run([sys.executable, '-c', code.format(module)], cwd=root,
+                                  capture_output=True, text=True, check=True)
+            lines = proc.stdout.strip().splitlines()
+            best = min(best, float(lines[-1]))
+        results[f"import.{module}.cold_ms"] = best * 1e3
+        print(f"  import {module:<22} {best * 1e3:8.2f} ms")
+        if len(lines) > 1 or proc.stderr.strip():
+            print(f"  ⚠️  导入 {module} 时产生了输出")
+    return results
+
+
+# ============================================================
+# 基准比较
+# ============================================================
+
+def _higher_is_better(metric):
+    return metric.endswith("_per_sec")
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    与基准比较
+
+    Returns:
+        回退的指标列表 [(metric, baseline_value, current_value, change), ...]
+        change 为相对变化（正数 = 变好）
+    """
+    if baseline.get("settings") != results.get("settings"):
+        print(f"⚠️  基准的运行参数与本次不同: {baseline.get('settings')} vs {results.get('settings')}")
+
+    regressions = []
+    print(f"\n{'指标':<44} {'基准':>12} {'本次':>12} {'变化':>8}")
+    print("-" * 80)
+    for metric, current in results["metrics"].items():
+        base = baseline.get("metrics", {}).get(metric)
+        if not base:
+            print(f"{metric:<44} {'-':>12} {current:>12.2f} {'新增':>8}")
+            continue
+        if _higher_is_better(metric):
+            change = current / base - 1
+        else:
+            change = base / current - 1
+        flag = ""
+        if change < -tolerance:
+            regressions.append((metric, base, current, change))
+            flag = "  ✗"
+        print(f"{metric:<44} {base:>12.2f} {current:>12.2f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def run_benchmarks(seed=DEFAULT_SEED, generations=DEFAULT_GENERATIONS, scale_name=None,
+                   skip_music_math=False):
+    """运行全部测量，返回可写为JSON的结果字典"""
+    scale_name = scale_name or DEFAULT_SCALE
+    scale_notes = SCALES[scale_name]
+    metrics = {}
+
+    print("\n[1] 遗传算法吞吐量 (main.run_genetic_algorithm)")
+    metrics.update(bench_ga(scale_notes, seed, generations))
+    print("\n[2] 适应度分量耗时")
+    metrics.update(bench_components(scale_notes, seed))
+    print("\n[3] 解码与MIDI写出")
+    metrics.update(bench_decode_and_midi(scale_notes, seed))
+    if not skip_music_math:
+        print("\n[4] Music_Math 遗传算法吞吐量")
+        metrics.update(bench_music_math(seed, generations))
+    print("\n[5] 冷启动导入耗时")
+    metrics.update(bench_imports())
+
+    return {
+        "settings": {
+            "seed": seed,
+            "generations": generations,
+            "scale": scale_name,
+            "sample_size": SAMPLE_SIZE,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "metrics": metrics,
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="遗传算法性能基准测试")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="随机种子")
+    parser.add_argument("--generations", type=int, default=DEFAULT_GENERATIONS,
+                        help="每个预设运行的代数")
+    parser.add_argument("--full", action="store_true", help="按预设的 MAX_GEN 完整运行")
+    parser.add_argument("--scale", default=None, help=f"调式（默认 {DEFAULT_SCALE}）")
+    parser.add_argument("--skip-music-math", action="store_true", help="跳过 Music_Math 测量")
+    parser.add_argument("--output", default=None, help="结果JSON输出路径")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基准JSON路径")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果保存为基准")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        help="基准文件缺失或无法读取时只警告、不以非零状态退出")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="允许的相对变差（默认 0.25）")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(seed=args.seed,
+                             generations=None if args.full else args.generations,
+                             scale_name=args.scale,
+                             skip_music_math=args.skip_music_math)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ 结果已写入: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✓ 基准已更新: {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError) as e:
+        print("\n" + "!" * 80)
+        print(f"✗ 无法读取基准文件 {args.baseline}: {e}")
+        print("  使用 --update-baseline 创建")
+        print("!" * 80)
+        return 0 if args.allow_missing_baseline else 2
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("\n" + "!" * 80)
+        print(f"✗ 性能回退: {len(regressions)} 项指标变差超过 {args.tolerance:.0%}")
+        for metric, base, current, change in regressions:
+            print(f"  {metric}: {base:.2f} -> {current:.2f} ({change:+.1%})")
+        print("!" * 80)
+        return 1
+    print(f"\n✓ 无性能回退（容差 {args.tolerance:.0%}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
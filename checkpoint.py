@@ -0,0 +1,179 @@
+"""
+检查点与断点续跑
+Checkpoint / Resume for Long GA Runs
+
+HIGH_QUALITY 运行（种群500 × 2048代）全部状态都在 run_genetic_algorithm 的内存里，
+进程被终止就前功尽弃。检查点每隔 CHECKPOINT_INTERVAL 代或 CHECKPOINT_SECONDS 秒
+保存一次本代评估、排序之后的完整状态：
+- 种群的节奏 / 音高基因（连续字节串）与三组适应度（float64 字节串）
+- 代数、累计评估次数、停止条件的状态
+- 适应度缓存的条目（LRU 顺序）与哪些个体带有增量评估状态（python 引擎），
+  续跑后的缓存命中与评估次数与不中断时相同，MAX_EVALUATIONS 在同一代停止
+- 随机数生成器状态、根种子
+- 当前的 RHYTHM_WEIGHTS / PITCH_WEIGHTS
+
+文件格式为 MAGIC + pickle，先写入同目录的临时文件、fsync 后 os.replace，
+因此任何时刻磁盘上都是一个完整的检查点。
+写盘在后台线程中进行：主循环只做一次字节拼接，
+上一次写盘尚未完成时只保留最新的状态。
+
+续跑时恢复种群、适应度、随机数状态与权重，从检查点所在的代继续
+（该代已评估的适应度直接复用，不再重算），之后的进化与不中断时逐位相同。
+
+用法:
+    python main.py                               # config.CHECKPOINT_PATH 设置后自动保存
+    run_genetic_algorithm(..., checkpointer=CheckpointWriter('run.ckpt', interval=50))
+    run_genetic_algorithm(..., resume='run.ckpt')
+"""
+
+import os
+import pickle
+import threading
+import time
+from array import array
+
+from config import CHECKPOINT_PATH, CHECKPOINT_INTERVAL, CHECKPOINT_SECONDS
+
+
+MAGIC = b'GACKPT1\n'
+
+
+# ============================================================
+# 打包
+# ============================================================
+
+def pack_genes(rows):
+    """多行基因（bytearray / list）-> 连续字节串"""
+    return b''.join(bytes(row) for row in rows)
+
+
+def unpack_genes(blob, length):
+    """pack_genes 的逆操作 -> [bytearray, ...]"""
+    return [bytearray(blob[i:i + length]) for i in range(0, len(blob), length)]
+
+
+def pack_scores(values):
+    """得分序列 -> float64 字节串"""
+    return array('d', values).tobytes()
+
+
+def unpack_scores(blob):
+    """pack_scores 的逆操作 -> [float, ...]"""
+    scores = array('d')
+    scores.frombytes(blob)
+    return scores.tolist()
+
+
+def capture_weights():
+    """当前权重的副本"""
+    from fitness_function_rhythm import RHYTHM_WEIGHTS
+    from fitness_function_pitch import PITCH_WEIGHTS
+    return {'rhythm': dict(RHYTHM_WEIGHTS), 'pitch': dict(PITCH_WEIGHTS)}
+
+
+def restore_weights(weights):
+    """原地写回权重（保持各模块对同一字典的引用）"""
+    from fitness_function_rhythm import RHYTHM_WEIGHTS
+    from fitness_function_pitch import PITCH_WEIGHTS
+    RHYTHM_WEIGHTS.clear()
+    RHYTHM_WEIGHTS.update(weights['rhythm'])
+    PITCH_WEIGHTS.clear()
+    PITCH_WEIGHTS.update(weights['pitch'])
+
+
+# ============================================================
+# 读写
+# ============================================================
+
+def save_checkpoint(path, state):
+    """原子地写入检查点（临时文件 + fsync + os.replace）"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """读取检查点，返回状态字典"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"不是有效的检查点文件: {path}")
+        return pickle.load(f)
+
+
+class CheckpointWriter:
+    """
+    周期性检查点（后台线程写盘）
+
+    Args:
+        path: 检查点文件路径
+        interval: 每N代保存一次（None 表示不按代数）
+        seconds: 距上次保存超过T秒时保存（None 表示不按时间）
+    """
+
+    def __init__(self, path, interval=None, seconds=None):
+        self.path = path
+        self.interval = interval
+        self.seconds = seconds
+        self.saved = 0
+        self.error = None
+        self._last_time = time.perf_counter()
+        self._pending = None
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls):
+        """按 config.CHECKPOINT_* 构建；未设置路径时返回 None"""
+        if not CHECKPOINT_PATH:
+            return None
+        return cls(CHECKPOINT_PATH, interval=CHECKPOINT_INTERVAL, seconds=CHECKPOINT_SECONDS)
+
+    def due(self, gen):
+        """本代是否需要保存"""
+        if self.interval and gen % self.interval == 0:
+            return True
+        return bool(self.seconds) and time.perf_counter() - self._last_time >= self.seconds
+
+    def save(self, state):
+        """提交一个状态（立即返回；写盘在后台完成）"""
+        self._last_time = time.perf_counter()
+        with self._condition:
+            self._pending = state
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                state, self._pending = self._pending, None
+            try:
+                save_checkpoint(self.path, state)
+                self.saved += 1
+            except OSError as e:
+                self.error = e
+                print(f"检查点写入失败: {e}")
+
+    def close(self):
+        """写完最后一个已提交的状态并停止后台线程"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
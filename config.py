@@ -46,9 +46,60 @@ CROSSOVER_RATE = 0.7     # 交叉概率 (70%)
 MUTATION_RATE = 0.05     # 变异概率 (5%)
 TRANSFORM_RATE = 0.05    # 特殊变换概率 (5%)
 
+# 父代选择方式: 'roulette'（轮盘赌）, 'sus'（随机遍历抽样）, 'tournament'（锦标赛）
+SELECTION_METHOD = 'roulette'
+TOURNAMENT_SIZE = 3      # 锦标赛规模 k
+
+# 根随机种子（None表示每次运行随机生成，并在输出中打印以便复现）
+# 运行、岛屿、实验的随机数流都由它派生（见 seeding.py）
+RANDOM_SEED = None
+
 # 输出设置
 PRINT_INTERVAL = 200     # 每N代输出一次进度
 
+# 逐代遥测（见 telemetry.py）：JSONL 输出路径，None表示不记录
+TELEMETRY_PATH = None      # 如 "results/telemetry.jsonl"
+TELEMETRY_INTERVAL = 1     # 每N代记录一次（最后一代总会记录）
+
+# 检查点（见 checkpoint.py）：路径为None表示不保存；按代数或秒数触发，满足其一即保存
+CHECKPOINT_PATH = None     # 如 "results/run.ckpt"
+CHECKPOINT_INTERVAL = 50   # 每N代保存一次（None表示不按代数）
+CHECKPOINT_SECONDS = None  # 距上次保存超过T秒时保存（None表示不按时间）
+
+# 适应度缓存（按解码后的旋律缓存评分，0表示禁用）
+FITNESS_CACHE_SIZE = 4096
+
+# 并行适应度评估（0表示在主进程中串行评估）
+PARALLEL_WORKERS = 0       # 工作进程数
+PARALLEL_CHUNK_SIZE = 32   # 每个任务包含的个体数量
+
+# 增量适应度评估（仅用于 rhythm_fitness_overall + pitch_fitness_overall）
+# 子代只修补相对父代变化的部分；启用后适应度在主进程中计算，不使用并行评估
+DELTA_EVALUATION = False
+DELTA_MAX_CHANGES = 4      # 变化位置超过该数量时退回完整评估
+
+# 融合适应度评估（仅用于 rhythm_fitness_overall + pitch_fitness_overall）
+# 按当前权重生成单遍评估函数，节奏基因与音符各只遍历一次，得分与逐函数计算一致
+FUSED_EVALUATION = True
+
+# 提前停止条件（None表示不启用；满足任一条件即停止并返回当前最优个体）
+STAGNATION_WINDOW = None     # 最优总分连续N代没有提升则停止（如 200）
+STAGNATION_TOLERANCE = 1e-6  # 小于该值的提升不算提升
+TARGET_SCORE = None          # 最优总分达到该值即停止
+TIME_LIMIT = None            # 墙钟时间上限（秒，每代检查一次）
+MAX_EVALUATIONS = None       # 实际计算的适应度次数上限（缓存命中不计）
+
+# 岛屿模型（island_model.py）：每个岛屿是一个独立进程中的子种群
+ISLAND_COUNT = 0             # 岛屿数量（0表示使用CPU核心数）
+MIGRATION_INTERVAL = 25      # 每隔多少代迁移一次
+MIGRATION_SIZE = 2           # 每个岛屿每次迁出的最优个体数
+MIGRATION_TOPOLOGY = 'ring'  # 'ring'（环形）或 'random'（随机目标）
+
+# Music_Math 权重网格预筛选（fitness_components.py）：先在共享抽样种群上为打乱后的前N个组合打分，
+# 再从中选出 funcs（None表示不筛选，直接取打乱后的前20个）
+GRID_SCREEN_SIZE = None      # 如 10000
+GRID_SCREEN_SAMPLE = 2000    # 共享抽样种群的大小
+
 # ============================================================
 # MIDI输出设置
 # ============================================================
@@ -171,6 +222,13 @@ DISPLAY_SETTINGS = {
 # 快捷配置预设
 # ============================================================
 
+# 默认配置（即上面的核心参数）
+DEFAULT_PRESET = {
+    'POP_SIZE': POP_SIZE,
+    'MAX_GEN': MAX_GEN,
+    'PRINT_INTERVAL': PRINT_INTERVAL,
+}
+
 # 如果想要更快的测试，使用这个预设
 QUICK_TEST = {
     'POP_SIZE': 50,
@@ -185,6 +243,12 @@ HIGH_QUALITY = {
     'PRINT_INTERVAL': 200,
 }
 
+CONFIG_PRESETS = {
+    'default': DEFAULT_PRESET,
+    'quick_test': QUICK_TEST,
+    'high_quality': HIGH_QUALITY,
+}
+
 # 当前使用的配置模式 ('default', 'quick_test', 'high_quality')
 CONFIG_MODE = 'default'
 
@@ -192,25 +256,27 @@ CONFIG_MODE = 'default'
 # 配置应用函数
 # ============================================================
 
-def apply_config_mode(mode='default'):
-    """应用配置模式"""
+def apply_config_mode(mode='default', verbose=True):
+    """应用配置模式（verbose=False 时不输出）"""
     global POP_SIZE, MAX_GEN, PRINT_INTERVAL
     
     if mode == 'quick_test':
         POP_SIZE = QUICK_TEST['POP_SIZE']
         MAX_GEN = QUICK_TEST['MAX_GEN']
         PRINT_INTERVAL = QUICK_TEST['PRINT_INTERVAL']
-        print("⚡ 使用快速测试模式")
+        message = "⚡ 使用快速测试模式"
     elif mode == 'high_quality':
         POP_SIZE = HIGH_QUALITY['POP_SIZE']
         MAX_GEN = HIGH_QUALITY['MAX_GEN']
         PRINT_INTERVAL = HIGH_QUALITY['PRINT_INTERVAL']
-        print("🎯 使用高质量模式")
+        message = "🎯 使用高质量模式"
     else:
-        print("✓ 使用默认配置")
+        message = "✓ 使用默认配置"
+    if verbose:
+        print(message)
 
-# 启动时应用配置
-apply_config_mode(CONFIG_MODE)
+# 导入时静默应用配置（作为库导入时不输出）
+apply_config_mode(CONFIG_MODE, verbose=False)
 
 # ============================================================
 # 配置验证
@@ -0,0 +1,115 @@
+"""
+种群批量解码器
+Batch Decoder: dual genes -> structure-of-arrays note table
+
+将 (N, RHYTHM_LENGTH) 节奏基因矩阵与 (N, PITCH_LENGTH) 音高基因矩阵，
+配合调式查找数组，一次解码为紧凑的 NumPy 数组（结构体数组布局）：
+    onset    - (N, L) 起拍掩码
+    pitch    - (N, max_notes) 音符音高（MIDI，填充位置为0）
+    start    - (N, max_notes) 起始时间（拍）
+    duration - (N, max_notes) 时值（拍）
+    counts   - (N,) 每行音符数量
+
+解码规则与 main.Individual.to_notes 完全相同：
+发声(1)开始新音符，延长(2)延长当前音符（休止之后的延长保持静音），休止(0)结束当前音符。
+"""
+
+import numpy as np
+
+from config import RHYTHM_NOTE, RHYTHM_HOLD
+
+
+# 每个节奏位置代表一个八分音符（0.5拍）
+STEP_BEATS = 0.5
+
+
+def scale_lookup(scale_notes):
+    """调式音阶列表 -> 查找数组（音高基因索引 -> MIDI音高）"""
+    return np.asarray(scale_notes, dtype=np.int16)
+
+
+class DecodedMelody:
+    """
+    NoteTable 中单行的轻量视图
+    提供 notes / rhythm_genes / pitch_genes（同 MelodyAdapter）以及 to_notes()，
+    因此可以直接传给逐旋律适应度函数与 save_to_midi
+    """
+    def __init__(self, note_list, rhythm_genes, pitch_genes):
+        self.notes = note_list
+        self.rhythm_genes = rhythm_genes
+        self.pitch_genes = pitch_genes
+
+    def to_notes(self):
+        return self.notes
+
+
+class NoteTable:
+    """整个种群解码后的音符表（结构体数组）"""
+
+    def __init__(self, onset, pitch, start, duration, counts, rhythm=None, pitch_genes=None):
+        self.onset = onset
+        self.pitch = pitch
+        self.start = start
+        self.duration = duration
+        self.counts = counts
+        self.rhythm = rhythm
+        self.pitch_genes = pitch_genes
+
+    def __len__(self):
+        return len(self.counts)
+
+    def notes(self, i):
+        """第 i 行的音符列表 [(pitch, start, duration), ...]，与 to_notes 的返回值相同"""
+        n = int(self.counts[i])
+        return list(zip(
+            self.pitch[i, :n].tolist(),
+            self.start[i, :n].tolist(),
+            self.duration[i, :n].tolist(),
+        ))
+
+    def row(self, i):
+        """第 i 行的 DecodedMelody 视图"""
+        rhythm_genes = self.rhythm[i].tolist() if self.rhythm is not None else None
+        pitch_genes = self.pitch_genes[i].tolist() if self.pitch_genes is not None else None
+        return DecodedMelody(self.notes(i), rhythm_genes, pitch_genes)
+
+
+def decode_population(rhythm, pitch, scale_array):
+    """
+    批量解码
+
+    Args:
+        rhythm: (N, L) 节奏基因矩阵
+        pitch: (N, L) 音高基因矩阵（调式内索引）
+        scale_array: scale_lookup(scale_notes) 的返回值
+
+    Returns:
+        NoteTable
+    """
+    rhythm = np.asarray(rhythm)
+    pitch = np.asarray(pitch)
+    n, length = rhythm.shape
+    positions = np.arange(length)
+
+    onset = rhythm == RHYTHM_NOTE
+    counts = onset.sum(axis=1)
+
+    # 音符在遇到下一个发声或休止时结束：时值 = 到下一个非延长位置的距离
+    boundary = np.where(rhythm != RHYTHM_HOLD, positions[None, :], length)
+    after = np.minimum.accumulate(boundary[:, ::-1], axis=1)[:, ::-1]
+    next_boundary = np.concatenate([after[:, 1:], np.full((n, 1), length)], axis=1)
+
+    # 将每行的起拍依次压缩到前 counts 列
+    max_notes = max(int(counts.max()) if n else 0, 1)
+    rows, cols = np.nonzero(onset)
+    slots = (np.cumsum(onset, axis=1) - 1)[rows, cols]
+
+    note_pitch = np.zeros((n, max_notes), dtype=np.int16)
+    note_start = np.zeros((n, max_notes))
+    note_duration = np.zeros((n, max_notes))
+    note_pitch[rows, slots] = scale_array[pitch[rows, cols]]
+    note_start[rows, slots] = cols * STEP_BEATS
+    note_duration[rows, slots] = (next_boundary[rows, cols] - cols) * STEP_BEATS
+
+    return NoteTable(onset, note_pitch, note_start, note_duration, counts,
+                     rhythm=rhythm, pitch_genes=pitch)
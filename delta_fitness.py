@@ -0,0 +1,363 @@
+"""
+增量适应度评估
+Delta Fitness Evaluation for Point Mutations
+
+变异只改动约5%的基因，子代却要完整解码并重算全部10个分量。
+这里为每个已评估个体保存一份 FitnessState（各分量的原始累加值），
+子代与父代比较得到变化位置后，只修补受影响的部分：
+
+音高（节奏基因未变时）：
+- stepwise / consonance：只重算变化音符两侧的相邻音程，修补总和
+- direction：只重算受影响的方向及其相邻转向
+- range / climax：无法局部修补，直接重算
+节奏：
+- density：起拍计数增量
+- rest：休止计数增量（最长连续休止需要重新扫描）
+- parity：只重算变化位置所在的对径点对
+- syncopation / pattern：无法局部修补，直接重算
+节奏基因发生变化时音符结构改变，音高分量全部重算。
+权重为0的分量与 *_fitness_overall 一样跳过，不计算也不维护其状态；
+父代评估时启用的分量与当前权重不同（权重在运行中被修改）时退回完整评估。
+
+仅适用于 rhythm_fitness_overall + pitch_fitness_overall 组合，得分与完整计算完全一致。
+"""
+
+from config import RHYTHM_NOTE, RHYTHM_REST
+from fitness_function_rhythm import (
+    RHYTHM_WEIGHTS,
+    rhythm_fitness_overall,
+    rhythm_fitness_syncopation,
+    rhythm_fitness_pattern,
+    parity_pair_score,
+    density_score,
+    rest_score,
+    longest_rest_run,
+)
+from fitness_function_pitch import (
+    PITCH_WEIGHTS,
+    pitch_fitness_overall,
+    pitch_fitness_range,
+    pitch_fitness_climax,
+    DIRECTION_CHANGE_TABLE,
+    interval_value,
+    interval_values,
+    count_direction_changes,
+)
+
+
+# 分量的累加顺序与 *_fitness_overall 一致
+RHYTHM_KEYS = ('parity', 'density', 'syncopation', 'rest', 'pattern')
+PITCH_KEYS = ('stepwise', 'consonance', 'range', 'direction', 'climax')
+
+
+class _Melody:
+    """传给无法修补的逐旋律函数的最小适配对象"""
+    __slots__ = ('notes', 'rhythm_genes')
+
+    def __init__(self, notes, rhythm_genes):
+        self.notes = notes
+        self.rhythm_genes = rhythm_genes
+
+
+class FitnessState:
+    """一个已评估个体的分量状态"""
+    __slots__ = (
+        'rhythm_genes', 'pitch_genes', 'notes', 'note_index',
+        'stepwise_sum', 'consonance_sum', 'directions', 'direction_changes',
+        'note_count', 'rest_count', 'parity_score',
+        'enabled', 'components', 'rhythm_fitness', 'pitch_fitness',
+    )
+
+
+def supports(rhythm_fitness_func, pitch_fitness_func):
+    """该函数组合是否可以走增量评估"""
+    return (rhythm_fitness_func is rhythm_fitness_overall
+            and pitch_fitness_func is pitch_fitness_overall)
+
+
+def _enabled():
+    """当前权重下启用的 (节奏分量, 音高分量)，判断方式与 *_fitness_overall 相同"""
+    return (frozenset(key for key in RHYTHM_KEYS if RHYTHM_WEIGHTS.get(key, 0) != 0),
+            frozenset(key for key in PITCH_KEYS if PITCH_WEIGHTS.get(key, 0) != 0))
+
+
+def _combine(state):
+    """把启用的分量合成为节奏/音高总分（与 *_fitness_overall 的累加方式相同）"""
+    components = state.components
+    rhythm_enabled, pitch_enabled = state.enabled
+    rhythm_total = 0
+    for key in RHYTHM_KEYS:
+        if key in rhythm_enabled:
+            rhythm_total += components[key]
+    pitch_total = 0
+    for key in PITCH_KEYS:
+        if key in pitch_enabled:
+            pitch_total += components[key]
+    state.rhythm_fitness = rhythm_total
+    state.pitch_fitness = pitch_total
+    return state
+
+
+# ============================================================
+# 音高分量
+# ============================================================
+
+def _finish_pitch(state, components, enabled):
+    """由原始累加值得到启用的归一化音高分量"""
+    n = len(state.notes)
+    num_intervals = n - 1
+    if 'stepwise' in enabled:
+        components['stepwise'] = state.stepwise_sum / num_intervals if n >= 2 else 0
+    if 'consonance' in enabled:
+        components['consonance'] = state.consonance_sum / num_intervals if n >= 2 else 0
+    if 'direction' in enabled:
+        if n >= 3:
+            components['direction'] = state.direction_changes / (len(state.directions) - 1) * 20
+        else:
+            components['direction'] = 0
+    melody = _Melody(state.notes, state.rhythm_genes)
+    if 'range' in enabled:
+        components['range'] = pitch_fitness_range(melody)
+    if 'climax' in enabled:
+        components['climax'] = pitch_fitness_climax(melody)
+
+
+def _full_pitch(state, notes, enabled):
+    """完整计算启用的音高分量的原始累加值（未启用的置为 None）"""
+    state.notes = notes
+    state.stepwise_sum = state.consonance_sum = None
+    state.directions = state.direction_changes = None
+    if not enabled & {'stepwise', 'consonance', 'direction'}:
+        return
+    pitches = [n[0] for n in notes]
+    if 'stepwise' in enabled:
+        state.stepwise_sum = sum(interval_values('stepwise', pitches))
+    if 'consonance' in enabled:
+        state.consonance_sum = sum(interval_values('consonance', pitches))
+    if 'direction' in enabled:
+        state.directions = interval_values('direction', pitches)
+        state.direction_changes = count_direction_changes(state.directions)
+
+
+def _patch_pitch(state, parent, changed_notes, scale_notes, enabled):
+    """只修补变化音符两侧的音程"""
+    notes = list(parent.notes)
+    for k, pitch_idx in changed_notes:
+        _, start, duration = notes[k]
+        notes[k] = (scale_notes[pitch_idx], start, duration)
+    state.notes = notes
+
+    n = len(notes)
+    affected = set()
+    for k, _ in changed_notes:
+        if k - 1 >= 0:
+            affected.add(k - 1)
+        if k < n - 1:
+            affected.add(k)
+
+    intervals = [(parent.notes[j+1][0] - parent.notes[j][0], notes[j+1][0] - notes[j][0], j)
+                 for j in affected]
+    state.stepwise_sum = parent.stepwise_sum
+    state.consonance_sum = parent.consonance_sum
+    state.directions = parent.directions
+    state.direction_changes = parent.direction_changes
+
+    if 'stepwise' in enabled:
+        for old, new, _ in intervals:
+            state.stepwise_sum += interval_value('stepwise', new) - interval_value('stepwise', old)
+    if 'consonance' in enabled:
+        for old, new, _ in intervals:
+            state.consonance_sum += (interval_value('consonance', new)
+                                     - interval_value('consonance', old))
+    if 'direction' not in enabled:
+        return
+
+    directions = list(parent.directions)
+    for _, new, j in intervals:
+        directions[j] = interval_value('direction', new)
+
+    # 受影响的转向位置：与变化方向相邻的方向对
+    pairs = set()
+    for j in affected:
+        if j - 1 >= 0:
+            pairs.add(j - 1)
+        if j < len(directions) - 1:
+            pairs.add(j)
+    turn = DIRECTION_CHANGE_TABLE
+    direction_changes = parent.direction_changes
+    for j in pairs:
+        direction_changes += (turn[directions[j]][directions[j+1]]
+                              - turn[parent.directions[j]][parent.directions[j+1]])
+
+    state.directions = directions
+    state.direction_changes = direction_changes
+
+
+# ============================================================
+# 节奏分量
+# ============================================================
+
+def _full_rhythm(state, enabled):
+    """完整计算启用的计数型节奏分量的原始值（未启用的置为 None）"""
+    rhythm = state.rhythm_genes
+    n = len(rhythm)
+    half = n // 2
+    state.note_count = rhythm.count(RHYTHM_NOTE) if 'density' in enabled else None
+    state.rest_count = rhythm.count(RHYTHM_REST) if 'rest' in enabled else None
+    state.parity_score = None
+    if 'parity' in enabled:
+        state.parity_score = sum(parity_pair_score(rhythm[i] == RHYTHM_NOTE,
+                                                   rhythm[i + half] == RHYTHM_NOTE)
+                                 for i in range(half))
+
+
+def _patch_rhythm(state, parent, changed_positions, enabled):
+    """修补启用的起拍/休止计数与受影响的对径点对"""
+    rhythm = state.rhythm_genes
+    old_rhythm = parent.rhythm_genes
+    n = len(rhythm)
+    half = n // 2
+
+    state.note_count = parent.note_count
+    state.rest_count = parent.rest_count
+    state.parity_score = parent.parity_score
+    if 'density' in enabled:
+        for i in changed_positions:
+            state.note_count += (rhythm[i] == RHYTHM_NOTE) - (old_rhythm[i] == RHYTHM_NOTE)
+    if 'rest' in enabled:
+        for i in changed_positions:
+            state.rest_count += (rhythm[i] == RHYTHM_REST) - (old_rhythm[i] == RHYTHM_REST)
+    if 'parity' in enabled:
+        pairs = {i % half for i in changed_positions if i < 2 * half}
+        parity = parent.parity_score
+        for i in pairs:
+            parity += (parity_pair_score(rhythm[i] == RHYTHM_NOTE, rhythm[i + half] == RHYTHM_NOTE)
+                       - parity_pair_score(old_rhythm[i] == RHYTHM_NOTE, old_rhythm[i + half] == RHYTHM_NOTE))
+        state.parity_score = parity
+
+
+def _finish_rhythm(state, components, enabled):
+    """由计数得到启用的节奏分量；syncopation / pattern 直接重算"""
+    rhythm = state.rhythm_genes
+    melody = _Melody(state.notes, rhythm)
+    if 'parity' in enabled:
+        components['parity'] = state.parity_score
+    if 'density' in enabled:
+        components['density'] = density_score(state.note_count, len(rhythm))
+    if 'syncopation' in enabled:
+        components['syncopation'] = rhythm_fitness_syncopation(melody)
+    if 'rest' in enabled:
+        components['rest'] = rest_score(state.rest_count, longest_rest_run(rhythm))
+    if 'pattern' in enabled:
+        components['pattern'] = rhythm_fitness_pattern(melody)
+
+
+# ============================================================
+# 对外接口
+# ============================================================
+
+def _note_index(rhythm_genes):
+    """位置 -> 音符序号（非起拍位置为 -1）"""
+    index = []
+    k = 0
+    for r in rhythm_genes:
+        if r == RHYTHM_NOTE:
+            index.append(k)
+            k += 1
+        else:
+            index.append(-1)
+    return index
+
+
+def evaluate_full(rhythm_genes, pitch_genes, notes):
+    """
+    完整评估并生成 FitnessState
+
+    Args:
+        notes: decode_genes / to_notes 的解码结果
+    """
+    state = FitnessState()
+    state.rhythm_genes = list(rhythm_genes)
+    state.pitch_genes = list(pitch_genes)
+    state.note_index = _note_index(state.rhythm_genes)
+    state.enabled = rhythm_enabled, pitch_enabled = _enabled()
+    components = {}
+    _full_pitch(state, notes, pitch_enabled)
+    _full_rhythm(state, rhythm_enabled)
+    _finish_pitch(state, components, pitch_enabled)
+    _finish_rhythm(state, components, rhythm_enabled)
+    state.components = components
+    return _combine(state)
+
+
+def evaluate_delta(parent, rhythm_genes, pitch_genes, scale_notes, decode, max_changes=4):
+    """
+    基于父代状态增量评估子代
+
+    Args:
+        parent: 父代的 FitnessState
+        decode: 节奏变化时用于重新解码的函数 decode(rhythm_genes, pitch_genes) -> notes
+        max_changes: 变化位置超过该数量（如发生交叉、逆行）时退回完整评估
+
+    Returns:
+        FitnessState
+    """
+    changed_rhythm = [i for i, (a, b) in enumerate(zip(rhythm_genes, parent.rhythm_genes)) if a != b]
+    changed_pitch = [i for i, (a, b) in enumerate(zip(pitch_genes, parent.pitch_genes)) if a != b]
+    enabled = _enabled()
+    if len(changed_rhythm) + len(changed_pitch) > max_changes or enabled != parent.enabled:
+        return evaluate_full(rhythm_genes, pitch_genes, decode(rhythm_genes, pitch_genes))
+
+    state = FitnessState()
+    state.rhythm_genes = list(rhythm_genes)
+    state.pitch_genes = list(pitch_genes)
+    state.enabled = rhythm_enabled, pitch_enabled = enabled
+
+    if not changed_rhythm and not changed_pitch:
+        # 与父代完全相同（如精英个体）
+        state.note_index = parent.note_index
+        state.notes = parent.notes
+        state.stepwise_sum = parent.stepwise_sum
+        state.consonance_sum = parent.consonance_sum
+        state.directions = parent.directions
+        state.direction_changes = parent.direction_changes
+        state.note_count = parent.note_count
+        state.rest_count = parent.rest_count
+        state.parity_score = parent.parity_score
+        state.components = parent.components
+        return _combine(state)
+
+    components = {}
+    if changed_rhythm:
+        # 音符结构改变：音高分量完整重算，计数型节奏分量增量修补
+        state.note_index = _note_index(state.rhythm_genes)
+        _full_pitch(state, decode(rhythm_genes, pitch_genes), pitch_enabled)
+        _patch_rhythm(state, parent, changed_rhythm, rhythm_enabled)
+        _finish_pitch(state, components, pitch_enabled)
+        _finish_rhythm(state, components, rhythm_enabled)
+    else:
+        # 只有音高基因变化：节奏分量不变
+        state.note_index = parent.note_index
+        state.note_count = parent.note_count
+        state.rest_count = parent.rest_count
+        state.parity_score = parent.parity_score
+        for key in rhythm_enabled:
+            components[key] = parent.components[key]
+
+        changed_notes = [(parent.note_index[i], pitch_genes[i])
+                         for i in changed_pitch if parent.note_index[i] >= 0]
+        if changed_notes:
+            _patch_pitch(state, parent, changed_notes, scale_notes, pitch_enabled)
+            _finish_pitch(state, components, pitch_enabled)
+        else:
+            # 变化都落在延长/休止位置：音符不变
+            state.notes = parent.notes
+            state.stepwise_sum = parent.stepwise_sum
+            state.consonance_sum = parent.consonance_sum
+            state.directions = parent.directions
+            state.direction_changes = parent.direction_changes
+            for key in pitch_enabled:
+                components[key] = parent.components[key]
+
+    state.components = components
+    return _combine(state)
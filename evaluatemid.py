@@ -22,6 +22,24 @@ def evaluate_midi(midi_path):
     except Exception as e:
         print(f"  错误: {e}")
 
+def evaluate_note_table(table, tempo=120):
+    """
+    直接分析 decode_batch.NoteTable（无需先写出MIDI文件）
+    输出与 evaluate_midi 相同的统计信息
+    """
+    seconds_per_beat = 60.0 / tempo
+    for i in range(len(table)):
+        n = int(table.counts[i])
+        print(f"\n旋律 {i}:")
+        if n:
+            pitches = table.pitch[i, :n]
+            print(f"  音高范围: {pitches.min()} ~ {pitches.max()} (跨度 {pitches.max()-pitches.min()} 半音)")
+            end_beat = (table.start[i, :n] + table.duration[i, :n]).max()
+        else:
+            end_beat = 0.0
+        print(f"  总时长: {end_beat * seconds_per_beat:.2f} 秒")
+        print(f"  音符数量: {n}")
+
 def evaluate_all_midis(directory="results"):
     """批量分析MIDI文件"""
     if not os.path.exists(directory):
@@ -0,0 +1,87 @@
+"""
+适应度缓存
+Phenotype-keyed Fitness Cache (LRU)
+
+很多基因组解码后是同一段旋律：
+- HOLD / REST 位置上的音高基因不会被 to_notes 读取
+- 每代复制的精英个体与上一代完全相同
+因此以"表现型"为键缓存适应度，避免重复评分。
+
+缓存键 = (解码后的音符, 节奏基因, 权重指纹)
+- 音符列表覆盖了音高函数读取的全部信息
+- 节奏基因按原样保留（节奏函数直接读取 rhythm_genes，休止后的延长也会影响计数），
+  以 bytes 形式参与哈希
+- 权重指纹保证 RHYTHM_WEIGHTS / PITCH_WEIGHTS 在运行中被修改时不会命中旧值
+"""
+
+from collections import OrderedDict
+
+
+def weights_fingerprint(rhythm_weights, pitch_weights):
+    """当前权重的哈希指纹（权重字典被原地修改后指纹随之变化）"""
+    return hash((
+        tuple(sorted(rhythm_weights.items())),
+        tuple(sorted(pitch_weights.items())),
+    ))
+
+
+def phenotype_key(note_list, rhythm_genes, weights_key):
+    """规范表现型键：音符 + 节奏基因 + 权重指纹"""
+    return (tuple(note_list), bytes(rhythm_genes), weights_key)
+
+
+class FitnessCache:
+    """
+    有界 LRU 缓存
+    值为 (rhythm_fitness, pitch_fitness)
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """查询缓存，未命中返回 None"""
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        if self.max_size <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def snapshot(self, weights_key):
+        """
+        当前权重下的条目（LRU 顺序，最久未使用在前）与命中统计，供检查点保存
+        权重指纹依赖进程的字符串哈希，不能跨进程复用，因此只保存音符与节奏基因
+        """
+        entries = [(notes, rhythm, value) for (notes, rhythm, key), value in self._data.items()
+                   if key == weights_key]
+        return {'entries': entries, 'hits': self.hits, 'misses': self.misses}
+
+    def restore(self, snapshot, weights_key):
+        """snapshot 的逆操作：以本进程的权重指纹重建条目与统计"""
+        for notes, rhythm, value in snapshot['entries']:
+            self.put((notes, rhythm, weights_key), value)
+        self.hits = snapshot['hits']
+        self.misses = snapshot['misses']
+
+    @property
+    def hit_ratio(self):
+        """命中率（0-1）"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
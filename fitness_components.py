@@ -0,0 +1,227 @@
+"""
+适应度分量层与权重网格预筛选
+Shared Fitness Components and Weight-grid Screening
+
+create_weighted_fitness(a, b, c, d, e) 生成的每个组合函数都会各自重新计算
+fitness_function_11 / fitness_function_10 / fitness_rhythmic_sustain /
+fitness_rhythmic_rest / fitness_function_muspy 五个分量。
+这里把五个分量作为一个 (N, 5) 矩阵只计算一次：
+- component_matrix：对解码后的种群批量计算分量（muspy 分量仅在安装了 muspy 时逐行计算）
+- ComponentCache：以表现型（解码后的音符）为键缓存分量行，只计算未命中的行
+- weighted_totals：任意 K 组权重一次矩阵乘法得到 (N, K) 的加权总分
+  （没有音符的行为 -500，与组合函数相同；其余与逐函数累加在浮点误差范围内一致）
+
+预筛选：在一个共享的抽样种群上为成千上万个权重组合打分，
+只把最有希望的组合交给完整的遗传算法运行：
+    每个组合按自己的加权总分选出精英（前 elite_fraction），
+    再用同一把"尺子"（reference 权重，默认各分量等权）评价这些精英的平均得分。
+这样比较的是"该组合会把搜索引向什么样的旋律"，不受各组合权重整体大小的影响。
+
+用法:
+    cache = ComponentCache()
+    components = cache.lookup(decode_genes(genes))          # (N, 5)
+    totals = weighted_totals(components, weight_vectors)    # (N, K)
+
+    scores = screen_weights(combos, sample_size=2000, seed=42)
+    promising = select_promising(combos, keep=20, seed=42)
+"""
+
+import numpy as np
+
+import fitness_function
+from config import GRID_SCREEN_SAMPLE
+from fitness_cache import FitnessCache
+from fitness_function_batch import (
+    fitness_function_11_batch,
+    fitness_function_10_batch,
+    fitness_rhythmic_sustain_batch,
+    fitness_rhythmic_rest_batch,
+)
+from decode_batch import NoteTable
+from seeding import resolve_seed, make_np_rng
+
+
+# 列顺序与 create_weighted_fitness(a, b, c, d, e) 的参数顺序一致
+COMPONENT_KEYS = ('advanced', 'variety', 'sustain', 'rest', 'muspy')
+
+# 组合函数对没有音符的旋律给出的分数
+EMPTY_SCORE = -500.0
+
+# weighted_totals 每次处理的权重组数（限制 (N, K) 中间矩阵的大小）
+WEIGHT_BLOCK = 4096
+
+
+# ============================================================
+# 分量矩阵
+# ============================================================
+
+def _muspy_column(table):
+    """muspy 分量：安装了 muspy 时逐行计算，否则为0（同组合函数的处理）"""
+    n = len(table.counts)
+    if fitness_function._load_muspy() is None:
+        return np.zeros(n)
+    return np.array([fitness_function.fitness_function_muspy(table.row(i)) for i in range(n)],
+                    dtype=float)
+
+
+def component_matrix(table):
+    """
+    解码后的种群 -> (N, 5) 分量矩阵（列见 COMPONENT_KEYS）
+
+    Args:
+        table: decode_batch.NoteTable（如 music_math_numpy.decode_genes 的返回值）
+    """
+    return np.column_stack([
+        fitness_function_11_batch(table),
+        fitness_function_10_batch(table),
+        fitness_rhythmic_sustain_batch(table),
+        fitness_rhythmic_rest_batch(table),
+        _muspy_column(table),
+    ])
+
+
+def phenotype_keys(table):
+    """每行的表现型键（音高、起始时间、时值；与填充宽度无关）"""
+    steps = np.stack([table.pitch.astype(np.int16),
+                      (table.start * 2).astype(np.int16),
+                      (table.duration * 2).astype(np.int16)], axis=-1)
+    return [steps[i, :n].tobytes() for i, n in enumerate(table.counts.tolist())]
+
+
+def _take_rows(table, rows):
+    """NoteTable 的行子集"""
+    return NoteTable(table.onset[rows], table.pitch[rows], table.start[rows],
+                     table.duration[rows], table.counts[rows])
+
+
+class ComponentCache:
+    """
+    按表现型缓存分量行（LRU，见 fitness_cache.FitnessCache）
+
+    Args:
+        max_size: 最多缓存的表现型数量
+    """
+
+    def __init__(self, max_size=1 << 16):
+        self._cache = FitnessCache(max_size=max_size)
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+    def __len__(self):
+        return len(self._cache)
+
+    def lookup(self, table):
+        """返回 (N, 5) 分量矩阵；只为未命中的表现型计算（同一批中的重复表现型只算一次）"""
+        keys = phenotype_keys(table)
+        components = np.empty((len(keys), len(COMPONENT_KEYS)))
+        pending = {}
+        for i, key in enumerate(keys):
+            row = self._cache.get(key)
+            if row is None:
+                pending.setdefault(key, []).append(i)
+            else:
+                components[i] = row
+
+        if pending:
+            first_rows = [rows[0] for rows in pending.values()]
+            computed = component_matrix(_take_rows(table, np.array(first_rows)))
+            for (key, rows), row in zip(pending.items(), computed):
+                components[rows] = row
+                self._cache.put(key, row)
+        return components
+
+
+# ============================================================
+# 加权总分
+# ============================================================
+
+def weight_matrix(weight_vectors):
+    """
+    权重组 -> (K, 5) 矩阵
+
+    Args:
+        weight_vectors: [(a, b, c, d, e), ...]、单组权重，或组合函数（带 weights 属性）的列表
+    """
+    rows = [getattr(w, 'weights', w) for w in weight_vectors]
+    weights = np.asarray(rows, dtype=float)
+    return weights.reshape(-1, len(COMPONENT_KEYS))
+
+
+def weighted_totals(components, weight_vectors, counts=None):
+    """
+    (N, 5) 分量矩阵 × K 组权重 -> (N, K) 加权总分
+
+    Args:
+        counts: 每行音符数；给出时没有音符的行记为 EMPTY_SCORE
+    """
+    totals = components @ weight_matrix(weight_vectors).T
+    if counts is not None:
+        totals[np.asarray(counts) == 0] = EMPTY_SCORE
+    return totals
+
+
+# ============================================================
+# 预筛选
+# ============================================================
+
+def sample_genes(sample_size=GRID_SCREEN_SAMPLE, seed=None):
+    """共享抽样种群：按 Music_Math 的加权初始化生成 sample_size 个基因组"""
+    from music_math_numpy import MusicMathPopulation
+    rng = make_np_rng(resolve_seed(seed), 'music_math', 'screen')
+    return MusicMathPopulation(sample_size, rng=rng).genes
+
+
+def screen_weights(weight_vectors, genes=None, sample_size=GRID_SCREEN_SAMPLE, seed=None,
+                   elite_fraction=0.05, reference=None, cache=None):
+    """
+    在共享抽样种群上为每组权重打分
+
+    Args:
+        weight_vectors: 权重组列表（见 weight_matrix）
+        genes: 抽样种群的基因矩阵（默认 sample_genes(sample_size, seed)；
+               也可以传入已有运行的末代种群）
+        elite_fraction: 每组权重按自身总分选出的精英比例
+        reference: 评价精英的公共权重（默认各分量等权，因此会偏向接近等权的组合；
+                   有明确偏好时传入对应的权重）
+        cache: 可选的 ComponentCache（多次筛选共享）
+
+    Returns:
+        (K,) 得分：各组精英在 reference 权重下的平均总分
+    """
+    from music_math_numpy import decode_genes
+    if genes is None:
+        genes = sample_genes(sample_size, seed)
+    table = decode_genes(genes)
+    components = (cache or ComponentCache()).lookup(table)
+    counts = table.counts
+
+    reference = np.ones(len(COMPONENT_KEYS)) if reference is None else reference
+    reference_totals = weighted_totals(components, [reference], counts)[:, 0]
+
+    weights = weight_matrix(weight_vectors)
+    n = len(counts)
+    elite = min(n, max(1, int(round(n * elite_fraction))))
+    scores = np.empty(len(weights))
+    for start in range(0, len(weights), WEIGHT_BLOCK):
+        block = weighted_totals(components, weights[start:start + WEIGHT_BLOCK], counts)
+        top = np.argpartition(-block, elite - 1, axis=0)[:elite]
+        scores[start:start + len(block.T)] = reference_totals[top].mean(axis=0)
+    return scores
+
+
+def select_promising(weight_vectors, keep, **kwargs):
+    """
+    预筛选后得分最高的 keep 组权重（同分时保持原顺序）
+
+    kwargs 传给 screen_weights
+    """
+    weight_vectors = list(weight_vectors)
+    scores = screen_weights(weight_vectors, **kwargs)
+    order = np.argsort(-scores, kind='stable')[:keep]
+    return [weight_vectors[i] for i in order]
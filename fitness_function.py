@@ -1,13 +1,26 @@
 import numpy as np
 import math
 import itertools
-# 尝试导入 muspy，如果没有安装，则提供降级处理或报错提示
-try:
-    import muspy
-    MUSPY_AVAILABLE = True
-except ImportError:
-    MUSPY_AVAILABLE = False
-    print("Warning: MusPy not installed. fitness_function_muspy will return 0.")
+
+from seeding import resolve_seed, make_rng
+
+# muspy 在首次使用时才导入（导入本模块时不做任何I/O或大计算）
+# 如果没有安装，则提供降级处理或报错提示
+_muspy = None
+_muspy_checked = False
+
+
+def _load_muspy():
+    """首次调用时尝试导入 muspy，返回模块或 None"""
+    global _muspy, _muspy_checked
+    if not _muspy_checked:
+        _muspy_checked = True
+        try:
+            import muspy
+            _muspy = muspy
+        except ImportError:
+            print("Warning: MusPy not installed. fitness_function_muspy will return 0.")
+    return _muspy
 
 # === 基础乐理常量 ===
 # C 大调音阶 (C, D, E, F, G, A, B)
@@ -128,7 +141,8 @@ def convert_to_muspy(melody):
     """
     将自定义的 Melody 对象转换为 muspy.Music 对象
     """
-    if not MUSPY_AVAILABLE:
+    muspy = _load_muspy()
+    if muspy is None:
         return None
 
     # 设定解析度：24 ticks = 1 quarter note (1 beat)
@@ -161,7 +175,8 @@ def convert_to_muspy(melody):
 
 def fitness_function_muspy(melody):
     # 1. 基础检查
-    if not melody.notes or not MUSPY_AVAILABLE:
+    muspy = _load_muspy()
+    if not melody.notes or muspy is None:
         return 0
         
     try:
@@ -222,30 +237,52 @@ def create_weighted_fitness(a, b, c, d, e):
         score += fitness_rhythmic_sustain(melody) * c
         score += fitness_rhythmic_rest(melody) * d
 
-        if MUSPY_AVAILABLE:
+        if _load_muspy() is not None:
             score += fitness_function_muspy(melody) * e
             
         return score
     
     internal_fitness.__name__ = name
+    # 批量版本（fitness_function_batch.batch_version）按权重重建同一个组合
+    internal_fitness.weights = (a, b, c, d, e)
     return internal_fitness
 
 # Define the range of weights you want to test
 # Example: Testing weights 0.5, 1.0, and 2.0 for different components
 weight_options = [0.5,0.7, 1.1, 1.3, 2.2, 2.9, 3.7, 3.9, 4.3, 4.7]
 
-# Generate all combinations (Grid Search)
-combinations = list(itertools.product(weight_options, repeat=5))
-import random
 
-random.shuffle(combinations)
+def _build_grid():
+    """生成网格组合与 funcs 列表（首次访问 combinations / selected_combos / funcs 时调用）"""
+    global combinations, selected_combos, funcs
+    # Generate all combinations (Grid Search)
+    combinations = list(itertools.product(weight_options, repeat=5))
+
+    # 抽样顺序由根种子决定（config.RANDOM_SEED，未设置时随机生成并输出）
+    seed = resolve_seed()
+    make_rng(seed, 'fitness_grid').shuffle(combinations)
+
+    # config.GRID_SCREEN_SIZE 设置时，先在共享抽样种群上预筛选前N个组合（见 fitness_components.py）
+    from config import GRID_SCREEN_SIZE
+    if GRID_SCREEN_SIZE:
+        from fitness_components import select_promising
+        selected_combos = select_promising(combinations[:GRID_SCREEN_SIZE], keep=20, seed=seed)
+    else:
+        selected_combos = (combinations[:20]) # Adjust this number as needed
+
+    funcs = []
+    for combo in selected_combos:
+        # Unpack the tuple into a, b, c, d, e
+        new_func = create_weighted_fitness(*combo)
+        funcs.append(new_func)
+    # funcs.append(fitness_function_muspy)
 
-selected_combos = (combinations[:20]) # Adjust this number as needed
 
-funcs = []
-for combo in selected_combos:
-    # Unpack the tuple into a, b, c, d, e
-    new_func = create_weighted_fitness(*combo)
-    funcs.append(new_func)
-# funcs.append(fitness_function_muspy)
-print(f"Generated {funcs} unique fitness functions for testing.")
\ No newline at end of file
+def __getattr__(name):
+    """延迟属性：网格组合、funcs 与 MUSPY_AVAILABLE 在首次访问时才计算"""
+    if name in ('combinations', 'selected_combos', 'funcs'):
+        _build_grid()
+        return globals()[name]
+    if name == 'MUSPY_AVAILABLE':
+        return _load_muspy() is not None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,216 @@
+"""
+单染色体适应度函数库（批量版）
+Batched Fitness Functions for Music_Math
+
+fitness_function.py 中各函数的种群级实现：
+输入为 decode_batch.NoteTable（pitch / start / duration / counts），
+一次返回整个种群的得分向量 (N,)，得分与逐旋律版本完全一致。
+
+注意逐旋律版本中部分函数把 n[1]（起始时间）当作时值使用，
+批量版本保持相同的行为（读取 start 而不是 duration）。
+fitness_function_11 在没有音符时会抛出 IndexError，遗传算法按0分处理；
+批量版本直接对这些行返回0。
+
+1. fitness_function_random_batch - 音符数量
+2. fitness_rhythmic_sustain_batch - 长音奖励
+3. fitness_rhythmic_rest_batch - 休止比例
+4. fitness_function_c_major_batch - C大调调内音
+5. fitness_function_end_c_batch - 结束在C
+6. fitness_function_diff_batch - 级进 / 大跳
+7. fitness_function_stepwise_batch - end_c + diff
+8. fitness_function_11_batch - 骨干音、终止音与跳进
+9. fitness_function_10_batch - stepwise + 节奏变化
+10. create_weighted_fitness 生成的组合函数（见 batch_version）
+"""
+
+import numpy as np
+
+import fitness_function
+from fitness_function import (
+    SCALE_C_MAJOR,
+    CHORD_C_MAJOR,
+    fitness_function_random,
+    fitness_rhythmic_sustain,
+    fitness_rhythmic_rest,
+    fitness_function_c_major,
+    fitness_function_end_c,
+    fitness_function_diff,
+    fitness_function_stepwise,
+    fitness_function_11,
+    fitness_function_10,
+)
+
+
+# 音级 -> 是否属于集合（按 pitch % 12 查表）
+_IN_SCALE = np.array([pc in SCALE_C_MAJOR for pc in range(12)])
+_IN_CHORD = np.array([pc in CHORD_C_MAJOR for pc in range(12)])
+
+
+# ============================================================
+# 辅助函数
+# ============================================================
+
+def _note_mask(table):
+    """有效音符位置 (N, max_notes)"""
+    return np.arange(table.pitch.shape[1])[None, :] < table.counts[:, None]
+
+
+def _pair_mask(table):
+    """有效相邻音符对 (N, max_notes - 1)：第 j 列有效当且仅当 j < counts - 1"""
+    return np.arange(table.pitch.shape[1] - 1)[None, :] < (table.counts[:, None] - 1)
+
+
+def _last_pitch_class(table):
+    """每行最后一个音符的音级（无音符的行为 -1）"""
+    rows = np.arange(len(table.counts))
+    last = table.pitch[rows, np.maximum(table.counts - 1, 0)].astype(np.int64) % 12
+    return np.where(table.counts > 0, last, -1)
+
+
+def _intervals(table):
+    """相邻音符的绝对音程 (N, max_notes - 1)"""
+    return np.abs(np.diff(table.pitch.astype(np.int64), axis=1))
+
+
+# ============================================================
+# 批量适应度函数
+# ============================================================
+
+def fitness_function_random_batch(table):
+    """音符数量（同 fitness_function_random）"""
+    return table.counts.astype(float)
+
+
+def fitness_rhythmic_sustain_batch(table):
+    """
+    长音奖励（同 fitness_rhythmic_sustain，"时值"取 n[1]）
+    - 1.0 ≤ d ≤ 2.0：+3d，并计入 num；d > 2.5：-30
+    - num ≥ 16 时再减 3 × num；没有音符得0分
+    """
+    valid = _note_mask(table)
+    d = table.start
+    rewarded = valid & (d >= 1.0) & (d <= 2.0)
+    score = np.where(rewarded, d * 3, 0.0).sum(axis=1)
+    num = np.where(rewarded, d, 0.0).sum(axis=1)
+    score -= 30 * (valid & (d > 2.5)).sum(axis=1)
+    score = np.where(num >= 16, score - num * 3, score)
+    return np.where(table.counts > 0, score, 0.0)
+
+
+def fitness_rhythmic_rest_batch(table):
+    """
+    休止比例（同 fitness_rhythmic_rest）
+    - gap = 32 - 总时值；1 ≤ gap ≤ 3：+25；gap > 3：-25
+    """
+    played = np.where(_note_mask(table), table.duration, 0.0).sum(axis=1)
+    gap = 32 - played
+    return np.where((gap >= 1.0) & (gap <= 3.0), 25.0, np.where(gap > 3.0, -25.0, 0.0))
+
+
+def fitness_function_c_major_batch(table):
+    """调内音 +10，调外音 -10（同 fitness_function_c_major）"""
+    in_scale = _IN_SCALE[table.pitch.astype(np.int64) % 12]
+    return np.where(_note_mask(table), np.where(in_scale, 10.0, -10.0), 0.0).sum(axis=1)
+
+
+def fitness_function_end_c_batch(table):
+    """c_major + 结束在C +50 / 否则 -20；没有音符得0分（同 fitness_function_end_c）"""
+    ending = np.where(_last_pitch_class(table) == 0, 50.0, -20.0)
+    score = fitness_function_c_major_batch(table) + ending
+    return np.where(table.counts > 0, score, 0.0)
+
+
+def fitness_function_diff_batch(table):
+    """音程≤2：+10，>7：-10（同 fitness_function_diff）"""
+    if table.pitch.shape[1] < 2:
+        return np.zeros(len(table.counts))
+    intervals = _intervals(table)
+    scores = np.where(intervals <= 2, 10.0, np.where(intervals > 7, -10.0, 0.0))
+    return np.where(_pair_mask(table), scores, 0.0).sum(axis=1)
+
+
+def fitness_function_stepwise_batch(table):
+    """end_c + diff（同 fitness_function_stepwise）"""
+    return fitness_function_end_c_batch(table) + fitness_function_diff_batch(table)
+
+
+def fitness_function_11_batch(table):
+    """
+    同 fitness_function_11
+    - 主和弦音 +5；结束在C +40，结束在E +20
+    - 大于8个半音且不是八度的跳进每次 -15
+    """
+    valid = _note_mask(table)
+    score = np.where(valid & _IN_CHORD[table.pitch.astype(np.int64) % 12], 5.0, 0.0).sum(axis=1)
+
+    last = _last_pitch_class(table)
+    score += np.where(last == 0, 40.0, np.where(last == 4, 20.0, 0.0))
+
+    if table.pitch.shape[1] >= 2:
+        intervals = _intervals(table)
+        jumps = (_pair_mask(table) & (intervals > 8) & (intervals != 12)).sum(axis=1)
+        score -= jumps * 15
+    return np.where(table.counts > 0, score, 0.0)
+
+
+def fitness_function_10_batch(table):
+    """stepwise + 相邻两个音符"时值"（n[1]）与音高都不同时 +5（同 fitness_function_10）"""
+    score = fitness_function_stepwise_batch(table)
+    if table.pitch.shape[1] < 2:
+        return score
+    changed = ((np.diff(table.start, axis=1) != 0)
+               & (np.diff(table.pitch.astype(np.int64), axis=1) != 0)
+               & _pair_mask(table))
+    return score + changed.sum(axis=1) * 5
+
+
+def weighted_fitness_batch(a, b, c, d):
+    """
+    create_weighted_fitness(a, b, c, d, e) 的批量版本（不含 muspy 分量）
+    没有音符的行得 -500，其余按原函数的顺序累加
+    """
+    def internal_fitness_batch(table):
+        score = np.zeros(len(table.counts))
+        score = score + fitness_function_11_batch(table) * a
+        score = score + fitness_function_10_batch(table) * b
+        score = score + fitness_rhythmic_sustain_batch(table) * c
+        score = score + fitness_rhythmic_rest_batch(table) * d
+        return np.where(table.counts > 0, score, -500.0)
+    return internal_fitness_batch
+
+
+# ============================================================
+# 导出函数表
+# ============================================================
+
+# 逐旋律函数 -> 批量函数（供引擎自动切换到批量路径）
+FITNESS_BATCH_VERSIONS = {
+    fitness_function_random: fitness_function_random_batch,
+    fitness_rhythmic_sustain: fitness_rhythmic_sustain_batch,
+    fitness_rhythmic_rest: fitness_rhythmic_rest_batch,
+    fitness_function_c_major: fitness_function_c_major_batch,
+    fitness_function_end_c: fitness_function_end_c_batch,
+    fitness_function_diff: fitness_function_diff_batch,
+    fitness_function_stepwise: fitness_function_stepwise_batch,
+    fitness_function_11: fitness_function_11_batch,
+    fitness_function_10: fitness_function_10_batch,
+}
+
+
+def batch_version(func):
+    """
+    逐旋律适应度函数对应的批量函数；没有批量版本时返回 None
+
+    create_weighted_fitness 生成的函数按其 weights 重建；
+    安装了 muspy 且 e ≠ 0 时 muspy 分量无法批量计算，返回 None（逐行调用原函数）
+    """
+    batch = FITNESS_BATCH_VERSIONS.get(func)
+    if batch is not None:
+        return batch
+    weights = getattr(func, 'weights', None)
+    if weights is None:
+        return None
+    a, b, c, d, e = weights
+    if e != 0 and fitness_function._load_muspy() is not None:
+        return None
+    return weighted_fitness_batch(a, b, c, d)
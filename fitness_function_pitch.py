@@ -8,6 +8,10 @@ Pitch Fitness Functions
 3. pitch_fitness_range - 音域平衡（鼓励适中的音域范围）
 4. pitch_fitness_direction - 旋律方向变化（避免单一方向）
 5. pitch_fitness_climax - 旋律高潮（鼓励有明显的最高/最低音）
+
+stepwise / consonance / direction 的逐音程规则预先展开为按有符号音程索引的查找表
+（INTERVAL_TABLES），逐旋律、批量与增量评估都只做查表求和。
+查找表覆盖 MIDI 音域内的全部音程；超出范围的音程（非 MIDI 音高）按规则函数计算。
 """
 
 # 导入配置
@@ -23,6 +27,135 @@ except ImportError:
     }
 
 
+# ============================================================
+# 单个音程的评分规则（供逐旋律、增量评估共用）
+# ============================================================
+
+def stepwise_interval_score(interval):
+    """级进规则：绝对音程 -> 得分"""
+    if interval <= 2:  # 大二度以内（级进）
+        return 20
+    elif interval <= 4:  # 小三度到大三度（小跳）
+        return 5
+    else:  # 大跳
+        return -10
+
+
+def consonance_interval_score(interval):
+    """协和度规则：绝对音程 -> 得分（规则说明见 pitch_fitness_consonance）"""
+    # 将大于12的音程归约到一个八度内
+    interval_class = interval % 12
+    
+    # 根据音程类型评分（平衡版本）
+    if interval == 0:  # 相邻音符相同（重复音）
+        return -15  # 惩罚，避免单调
+    elif interval_class == 12 or interval == 12:  # 纯八度
+        return 12  # 降低，避免偏向
+    elif interval_class == 7:  # 纯五度
+        return 12  # 提高，鼓励
+    elif interval_class == 5:  # 纯四度
+        return 12  # 提高，鼓励
+    elif interval_class in [3, 4]:  # 小三度、大三度
+        return 12  # 提高，鼓励
+    elif interval_class in [8, 9]:  # 小六度、大六度
+        return 10  # 稍微提高
+    elif interval_class == 2:  # 大二度
+        return 5
+    elif interval_class == 1:  # 小二度
+        return -5
+    elif interval_class == 6:  # 三全音（增四度/减五度）
+        return -10
+    elif interval_class == 10:  # 小七度
+        return -5
+    elif interval_class == 11:  # 大七度
+        return -10
+    return 0
+
+
+def interval_direction(diff):
+    """音程方向：+1上行，-1下行，0持平"""
+    if diff > 0:
+        return 1  # 上行
+    elif diff < 0:
+        return -1  # 下行
+    else:
+        return 0  # 持平
+
+
+def is_direction_change(d1, d2):
+    """相邻两个方向是否构成转向（上→下 或 下→上）"""
+    return d1 != 0 and d2 != 0 and d1 != d2
+
+
+# ============================================================
+# 音程查找表（由上面的规则一次性生成）
+# ============================================================
+
+# 有符号音程 diff = 后一个音 - 前一个音，查表下标为 diff + INTERVAL_OFFSET。
+# 覆盖整个 MIDI 音域（0-127），因此 PITCH_MIN..PITCH_MAX 内的旋律
+# 以及从 MIDI 文件读入的任意旋律都能直接查表；
+# |diff| > INTERVAL_SPAN 的音程不在表内，由 interval_value 按规则函数计算
+INTERVAL_SPAN = 127
+INTERVAL_OFFSET = INTERVAL_SPAN
+INTERVAL_LAST = 2 * INTERVAL_SPAN  # 最后一个有效下标
+
+
+def build_interval_tables():
+    """
+    将逐音程规则展开为查找表
+
+    Returns:
+        dict: 'stepwise' / 'consonance' -> 得分，'direction' -> 方向（+1/0/-1），
+              均为长度 2 * INTERVAL_SPAN + 1 的列表，下标为 diff + INTERVAL_OFFSET
+    """
+    diffs = range(-INTERVAL_SPAN, INTERVAL_SPAN + 1)
+    return {
+        'stepwise': [stepwise_interval_score(abs(d)) for d in diffs],
+        'consonance': [consonance_interval_score(abs(d)) for d in diffs],
+        'direction': [interval_direction(d) for d in diffs],
+    }
+
+
+# 查找表是规则的唯一数据来源：调整某个音程的得分只需修改对应条目
+# （上行、下行各一项），例如纯五度：
+#     for d in (7, -7): INTERVAL_TABLES['consonance'][d + INTERVAL_OFFSET] = 15
+#
+# 修改上面的规则函数后调用 INTERVAL_TABLES.update(build_interval_tables())
+INTERVAL_TABLES = build_interval_tables()
+
+# 转向表：DIRECTION_CHANGE_TABLE[d1][d2] = is_direction_change(d1, d2)
+# 按 0, +1, -1 的顺序排列，使方向值 -1 通过负下标直接落在最后一项
+DIRECTION_CHANGE_TABLE = [[int(is_direction_change(d1, d2)) for d2 in (0, 1, -1)]
+                          for d1 in (0, 1, -1)]
+
+
+def interval_value(key, diff):
+    """单个有符号音程在 INTERVAL_TABLES[key] 中的值；超出表的范围时按规则函数计算"""
+    index = diff + INTERVAL_OFFSET
+    if 0 <= index <= INTERVAL_LAST:
+        return INTERVAL_TABLES[key][index]
+    if key == 'direction':
+        return interval_direction(diff)
+    if key == 'stepwise':
+        return stepwise_interval_score(abs(diff))
+    return consonance_interval_score(abs(diff))
+
+
+def interval_values(key, pitches):
+    """相邻音程在 INTERVAL_TABLES[key] 中的值列表（音域超过 INTERVAL_SPAN 时逐个检查下标）"""
+    if pitches and max(pitches) - min(pitches) > INTERVAL_SPAN:
+        return [interval_value(key, b - a) for a, b in zip(pitches, pitches[1:])]
+    table = INTERVAL_TABLES[key]
+    offset = INTERVAL_OFFSET
+    return [table[b - a + offset] for a, b in zip(pitches, pitches[1:])]
+
+
+def count_direction_changes(directions):
+    """方向序列中的转向次数（查 DIRECTION_CHANGE_TABLE）"""
+    table = DIRECTION_CHANGE_TABLE
+    return sum(table[a][b] for a, b in zip(directions, directions[1:]))
+
+
 def pitch_fitness_stepwise(melody):
     """
     级进流畅旋律（归一化版本）
@@ -42,16 +175,8 @@ def pitch_fitness_stepwise(melody):
     
     pitches = [n[0] for n in melody.notes]
     
-    # 计算音程质量得分
-    interval_score = 0
-    for i in range(len(pitches) - 1):
-        interval = abs(pitches[i] - pitches[i+1])
-        if interval <= 2:  # 大二度以内（级进）
-            interval_score += 20
-        elif interval <= 4:  # 小三度到大三度（小跳）
-            interval_score += 5
-        else:  # 大跳
-            interval_score -= 10
+    # 计算音程质量得分（查表求和）
+    interval_score = sum(interval_values('stepwise', pitches))
     
     # 归一化：除以音程数量，得到平均质量
     num_intervals = len(pitches) - 1
@@ -107,37 +232,8 @@ def pitch_fitness_consonance(melody):
     
     pitches = [n[0] for n in melody.notes]
     
-    # 计算协和度得分
-    consonance_score = 0
-    for i in range(len(pitches) - 1):
-        interval = abs(pitches[i] - pitches[i+1])
-        
-        # 将大于12的音程归约到一个八度内
-        interval_class = interval % 12
-        
-        # 根据音程类型评分（平衡版本）
-        if interval == 0:  # 相邻音符相同（重复音）
-            consonance_score -= 15  # 惩罚，避免单调
-        elif interval_class == 12 or interval == 12:  # 纯八度
-            consonance_score += 12  # 降低，避免偏向
-        elif interval_class == 7:  # 纯五度
-            consonance_score += 12  # 提高，鼓励
-        elif interval_class == 5:  # 纯四度
-            consonance_score += 12  # 提高，鼓励
-        elif interval_class in [3, 4]:  # 小三度、大三度
-            consonance_score += 12  # 提高，鼓励
-        elif interval_class in [8, 9]:  # 小六度、大六度
-            consonance_score += 10  # 稍微提高
-        elif interval_class == 2:  # 大二度
-            consonance_score += 5
-        elif interval_class == 1:  # 小二度
-            consonance_score -= 5
-        elif interval_class == 6:  # 三全音（增四度/减五度）
-            consonance_score -= 10
-        elif interval_class == 10:  # 小七度
-            consonance_score -= 5
-        elif interval_class == 11:  # 大七度
-            consonance_score -= 10
+    # 计算协和度得分（查表求和）
+    consonance_score = sum(interval_values('consonance', pitches))
     
     # 归一化：除以音程数量，得到平均协和度
     num_intervals = len(pitches) - 1
@@ -206,23 +302,10 @@ def pitch_fitness_direction(melody):
     pitches = [n[0] for n in melody.notes]
     
     # 计算每个音程的方向（+1上行，-1下行，0持平）
-    directions = []
-    for i in range(len(pitches) - 1):
-        diff = pitches[i+1] - pitches[i]
-        if diff > 0:
-            directions.append(1)  # 上行
-        elif diff < 0:
-            directions.append(-1)  # 下行
-        else:
-            directions.append(0)  # 持平
-    
-    # 统计方向变化次数
-    direction_changes = 0
-    for i in range(len(directions) - 1):
-        # 方向发生变化（上→下 或 下→上）
-        if directions[i] != 0 and directions[i+1] != 0:
-            if directions[i] != directions[i+1]:
-                direction_changes += 1
+    directions = interval_values('direction', pitches)
+    
+    # 统计方向变化次数（上→下 或 下→上）
+    direction_changes = count_direction_changes(directions)
     
     # 归一化：方向变化比例
     if len(directions) > 1:
@@ -311,4 +394,3 @@ pitch_fitness_funcs = [
     pitch_fitness_overall,
 ]
 
-print(f"✓ 已加载 {len(pitch_fitness_funcs)} 个音高适应度函数")
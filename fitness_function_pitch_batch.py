@@ -0,0 +1,225 @@
+"""
+音高适应度函数库（批量版）
+Batched Pitch Fitness Functions
+
+fitness_function_pitch.py 中各函数的种群级实现：
+输入为填充后的音高矩阵 (N, max_notes) 与每行的音符数量 (N,)，
+一次返回整个种群的得分向量 (N,)，得分与逐旋律版本完全一致。
+stepwise / consonance / direction 直接按有符号音程从 INTERVAL_TABLES 中取值。
+
+1. pitch_fitness_stepwise_batch - 级进流畅
+2. pitch_fitness_consonance_batch - 音程协和度
+3. pitch_fitness_range_batch - 音域平衡
+4. pitch_fitness_direction_batch - 旋律方向变化
+5. pitch_fitness_climax_batch - 旋律高潮
+6. pitch_fitness_overall_batch - 综合（按 PITCH_WEIGHTS 启用）
+"""
+
+import numpy as np
+
+from fitness_function_pitch import (
+    PITCH_WEIGHTS,
+    INTERVAL_TABLES,
+    INTERVAL_OFFSET,
+    INTERVAL_LAST,
+    DIRECTION_CHANGE_TABLE,
+    interval_value,
+    pitch_fitness_stepwise,
+    pitch_fitness_consonance,
+    pitch_fitness_range,
+    pitch_fitness_direction,
+    pitch_fitness_climax,
+    pitch_fitness_overall,
+)
+
+
+# ============================================================
+# 辅助函数
+# ============================================================
+
+def pitch_matrix_from_notes(note_lists, pad_value=0):
+    """
+    将多个音符列表转换为填充音高矩阵
+
+    Args:
+        note_lists: [[(pitch, start, duration), ...], ...]
+        pad_value: 填充值（填充位置不会参与评分）
+
+    Returns:
+        (pitches, lengths): (N, max_notes) int16 矩阵与 (N,) 长度向量
+    """
+    lengths = np.array([len(notes) for notes in note_lists], dtype=np.int64)
+    max_notes = int(lengths.max()) if len(lengths) else 0
+    pitches = np.full((len(note_lists), max(max_notes, 1)), pad_value, dtype=np.int16)
+    for i, notes in enumerate(note_lists):
+        if notes:
+            pitches[i, :len(notes)] = [n[0] for n in notes]
+    return pitches, lengths
+
+
+def _interval_mask(pitches, lengths):
+    """相邻音程的有效位置掩码：(N, max_notes - 1)，第 j 列有效当且仅当 j < length - 1"""
+    cols = np.arange(pitches.shape[1] - 1)
+    return cols[None, :] < (lengths[:, None] - 1)
+
+
+def _interval_index(pitches):
+    """相邻音符的有符号音程查表下标 (N, max_notes - 1)"""
+    return np.diff(pitches.astype(np.int64), axis=1) + INTERVAL_OFFSET
+
+
+def _lookup(key, index):
+    """
+    从 INTERVAL_TABLES[key] 中按下标批量取值（每次调用读取当前表，调整后立即生效）
+    超出表范围的下标（非 MIDI 音高）按 interval_value 逐个计算
+    """
+    table = np.asarray(INTERVAL_TABLES[key])
+    outside = (index < 0) | (index > INTERVAL_LAST)
+    if not outside.any():
+        return table[index]
+    values = table[np.clip(index, 0, INTERVAL_LAST)]
+    values[outside] = [interval_value(key, int(d) - INTERVAL_OFFSET) for d in index[outside]]
+    return values
+
+
+def _normalize(total, count):
+    """total / count，count 为 0 的行返回 0"""
+    safe = np.where(count > 0, count, 1)
+    return np.where(count > 0, total / safe, 0.0)
+
+
+# ============================================================
+# 批量适应度函数
+# ============================================================
+
+def pitch_fitness_stepwise_batch(pitches, lengths):
+    """
+    级进流畅旋律（批量版，规则同 pitch_fitness_stepwise）
+    - 间隔≤2：+20，间隔3-4：+5，大跳：-10
+    - 除以音程数量归一化；少于2个音符得0分
+    """
+    pitches = np.asarray(pitches)
+    lengths = np.asarray(lengths)
+    if pitches.shape[1] < 2:
+        return np.zeros(len(lengths))
+
+    scores = _lookup('stepwise', _interval_index(pitches))
+    scores = np.where(_interval_mask(pitches, lengths), scores, 0)
+
+    num_intervals = np.where(lengths >= 2, lengths - 1, 0)
+    return _normalize(scores.sum(axis=1), num_intervals)
+
+
+def pitch_fitness_consonance_batch(pitches, lengths):
+    """
+    音程协和度（批量版，规则同 pitch_fitness_consonance）
+    - 重复音：-15；八度/五度/四度/三度：+12；六度：+10；大二度：+5
+    - 小二度、小七度：-5；三全音、大七度：-10；其余（如两个八度）：0
+    """
+    pitches = np.asarray(pitches)
+    lengths = np.asarray(lengths)
+    if pitches.shape[1] < 2:
+        return np.zeros(len(lengths))
+
+    scores = _lookup('consonance', _interval_index(pitches))
+    scores = np.where(_interval_mask(pitches, lengths), scores, 0)
+
+    num_intervals = np.where(lengths >= 2, lengths - 1, 0)
+    return _normalize(scores.sum(axis=1), num_intervals)
+
+
+def pitch_fitness_range_batch(pitches, lengths):
+    """
+    音域平衡（批量版，规则同 pitch_fitness_range）
+    - 音域<6：-10；6-18：+20；>18：-5；少于2个音符得0分
+    """
+    pitches = np.asarray(pitches).astype(np.int64)
+    lengths = np.asarray(lengths)
+    valid = np.arange(pitches.shape[1])[None, :] < lengths[:, None]
+
+    highest = np.where(valid, pitches, np.iinfo(np.int64).min).max(axis=1)
+    lowest = np.where(valid, pitches, np.iinfo(np.int64).max).min(axis=1)
+    pitch_range = np.where(lengths >= 2, highest - lowest, 0)
+
+    scores = np.where(pitch_range < 6, -10.0, np.where(pitch_range <= 18, 20.0, -5.0))
+    return np.where(lengths >= 2, scores, 0.0)
+
+
+def pitch_fitness_direction_batch(pitches, lengths):
+    """
+    旋律方向变化（批量版，规则同 pitch_fitness_direction）
+    - 统计相邻两个非持平方向之间的转向次数
+    - 得分 = 转向次数 / (音程数 - 1) × 20；少于3个音符得0分
+    """
+    pitches = np.asarray(pitches)
+    lengths = np.asarray(lengths)
+    if pitches.shape[1] < 3:
+        return np.zeros(len(lengths))
+
+    directions = _lookup('direction', _interval_index(pitches))
+    changes = np.asarray(DIRECTION_CHANGE_TABLE, dtype=bool)[directions[:, :-1], directions[:, 1:]]
+    cols = np.arange(changes.shape[1])
+    changes &= cols[None, :] < (lengths[:, None] - 2)
+
+    num_pairs = np.where(lengths >= 3, lengths - 2, 0)
+    return _normalize(changes.sum(axis=1), num_pairs) * 20
+
+
+def pitch_fitness_climax_batch(pitches, lengths):
+    """
+    旋律高潮（批量版，规则同 pitch_fitness_climax）
+    - 最高音（首次出现）不在首尾：+12.5；最低音（首次出现）不在首尾：+12.5
+    - 少于4个音符得0分
+    """
+    pitches = np.asarray(pitches).astype(np.int64)
+    lengths = np.asarray(lengths)
+    valid = np.arange(pitches.shape[1])[None, :] < lengths[:, None]
+
+    max_idx = np.where(valid, pitches, np.iinfo(np.int64).min).argmax(axis=1)
+    min_idx = np.where(valid, pitches, np.iinfo(np.int64).max).argmin(axis=1)
+
+    last = lengths - 1
+    scores = (
+        np.where((max_idx > 0) & (max_idx < last), 12.5, 0.0)
+        + np.where((min_idx > 0) & (min_idx < last), 12.5, 0.0)
+    )
+    return np.where(lengths >= 4, scores, 0.0)
+
+
+def pitch_fitness_overall_batch(pitches, lengths):
+    """
+    综合音高适应度（批量版）
+    与 pitch_fitness_overall 相同：权重=0的函数不计算，其余简单相加
+    """
+    pitches = np.asarray(pitches)
+    lengths = np.asarray(lengths)
+    total_score = np.zeros(len(lengths))
+
+    for key, func in PITCH_BATCH_FUNCS.items():
+        if PITCH_WEIGHTS.get(key, 0) != 0:
+            total_score = total_score + func(pitches, lengths)
+
+    return total_score
+
+
+# ============================================================
+# 导出函数表（顺序与 pitch_fitness_overall 的累加顺序一致）
+# ============================================================
+
+PITCH_BATCH_FUNCS = {
+    'stepwise': pitch_fitness_stepwise_batch,
+    'consonance': pitch_fitness_consonance_batch,
+    'range': pitch_fitness_range_batch,
+    'direction': pitch_fitness_direction_batch,
+    'climax': pitch_fitness_climax_batch,
+}
+
+# 逐旋律函数 -> 批量函数（供引擎自动切换到批量路径）
+PITCH_BATCH_VERSIONS = {
+    pitch_fitness_stepwise: pitch_fitness_stepwise_batch,
+    pitch_fitness_consonance: pitch_fitness_consonance_batch,
+    pitch_fitness_range: pitch_fitness_range_batch,
+    pitch_fitness_direction: pitch_fitness_direction_batch,
+    pitch_fitness_climax: pitch_fitness_climax_batch,
+    pitch_fitness_overall: pitch_fitness_overall_batch,
+}
@@ -10,6 +10,8 @@ Rhythm Fitness Functions
 5. rhythm_fitness_pattern - 节奏模式（鼓励有规律的节奏）
 """
 
+from collections import Counter
+
 # 导入配置
 try:
     from config import RHYTHM_WEIGHTS
@@ -23,6 +25,62 @@ except ImportError:
     }
 
 
+# ============================================================
+# 计数型评分规则（供逐旋律、增量评估共用）
+# ============================================================
+
+def parity_pair_score(onset, mirror_onset):
+    """一对对径点的奇性得分：都是起拍 -30，恰有一个起拍 +10，都不是 0"""
+    if onset:
+        return -30 if mirror_onset else 10
+    return 10 if mirror_onset else 0
+
+
+def density_score(note_count, n):
+    """起拍数量 -> 密度得分（规则说明见 rhythm_fitness_density）"""
+    note_ratio = note_count / n
+    if 0.40 <= note_ratio <= 0.55:  # 最理想（40-55%）
+        return 20
+    elif 0.30 <= note_ratio < 0.40 or 0.55 < note_ratio <= 0.65:  # 稍偏离
+        return 10
+    elif note_ratio > 0.65:  # 太密
+        return -20
+    elif note_ratio < 0.30:  # 太疏
+        return -20
+    return 0
+
+
+def rest_score(rest_count, max_consecutive):
+    """休止数量与最长连续休止 -> 休止得分（规则说明见 rhythm_fitness_rest）"""
+    score = 0
+    if 2 <= rest_count <= 4:  # 最理想（6-12%）
+        score += 20
+    elif 5 <= rest_count <= 6:  # 稍多但可接受
+        score += 10
+    elif rest_count > 6:  # 太多
+        score -= 10
+    elif rest_count == 0:  # 没有
+        score -= 15
+    
+    # 如果休止符分散（最长连续不超过2个）
+    if rest_count > 0 and max_consecutive <= 2:
+        score += 5
+    return score
+
+
+def longest_rest_run(rhythm):
+    """最长连续休止长度"""
+    consecutive_rests = 0
+    max_consecutive = 0
+    for r in rhythm:
+        if r == 0:
+            consecutive_rests += 1
+            max_consecutive = max(max_consecutive, consecutive_rests)
+        else:
+            consecutive_rests = 0
+    return max_consecutive
+
+
 def rhythm_fitness_parity(melody):
     """
     节奏奇性（最基础的节奏适应度函数）
@@ -56,21 +114,8 @@ def rhythm_fitness_parity(melody):
     # 只需要检查前半部分，避免重复计算
     for i in range(n // 2):
         mirror_i = i + (n // 2) # 对径点位置
-        
-        # 如果当前位置是起拍（发声）
-        if rhythm[i] == 1:
-            # 检查对径点
-            if rhythm[mirror_i] == 1:
-                # 对径点也是起拍 → 惩罚（过于对称）
-                score -= 30
-            else:
-                # 对径点不是起拍 → 奖励（满足奇性）
-                score += 10
-        
-        # 如果当前位置不是起拍，但对径点是起拍
-        elif rhythm[mirror_i] == 1:
-            # 这种情况下奇性也满足 → 奖励
-            score += 10
+        # 都是起拍 → 惩罚（过于对称）；只有一个是起拍 → 奖励（满足奇性）
+        score += parity_pair_score(rhythm[i] == 1, rhythm[mirror_i] == 1)
     
     # 如果序列长度是奇数，中心点不需要检查对径
     # （因为它自己就是自己的对径点）
@@ -102,23 +147,9 @@ def rhythm_fitness_density(melody):
     rhythm = melody.rhythm_genes
     n = len(rhythm)
     
-    # 统计起拍数量
+    # 统计起拍数量并根据密度评分
     note_count = rhythm.count(1)
-    note_ratio = note_count / n
-    
-    # 根据密度评分
-    if 0.40 <= note_ratio <= 0.55:  # 最理想（40-55%）
-        score = 20
-    elif 0.30 <= note_ratio < 0.40 or 0.55 < note_ratio <= 0.65:  # 稍偏离
-        score = 10
-    elif note_ratio > 0.65:  # 太密
-        score = -20
-    elif note_ratio < 0.30:  # 太疏
-        score = -20
-    else:
-        score = 0
-    
-    return score
+    return density_score(note_count, n)
 
 
 def rhythm_fitness_syncopation(melody):
@@ -190,36 +221,11 @@ def rhythm_fitness_rest(melody):
     
     rhythm = melody.rhythm_genes
     
-    # 统计休止符数量
+    # 统计休止符数量与最长连续休止
     rest_count = rhythm.count(0)
+    max_consecutive = longest_rest_run(rhythm)
     
-    score = 0
-    
-    # 根据休止符数量评分（更严格的标准）
-    if 2 <= rest_count <= 4:  # 最理想（6-12%）
-        score += 20
-    elif 5 <= rest_count <= 6:  # 稍多但可接受
-        score += 10
-    elif rest_count > 6:  # 太多
-        score -= 10
-    elif rest_count == 0:  # 没有
-        score -= 15
-    
-    # 检查休止符是否分散（不连续）
-    consecutive_rests = 0
-    max_consecutive = 0
-    for r in rhythm:
-        if r == 0:
-            consecutive_rests += 1
-            max_consecutive = max(max_consecutive, consecutive_rests)
-        else:
-            consecutive_rests = 0
-    
-    # 如果休止符分散（最长连续不超过2个）
-    if rest_count > 0 and max_consecutive <= 2:
-        score += 5
-    
-    return score
+    return rest_score(rest_count, max_consecutive)
 
 
 def rhythm_fitness_pattern(melody):
@@ -239,7 +245,8 @@ def rhythm_fitness_pattern(melody):
     if not hasattr(melody, 'rhythm_genes') or not melody.rhythm_genes:
         return 0
     
-    rhythm = melody.rhythm_genes
+    # 以 bytes 表示，切片即可直接作为可哈希的模式键
+    rhythm = bytes(melody.rhythm_genes)
     n = len(rhythm)
     
     score = 0
@@ -250,11 +257,10 @@ def rhythm_fitness_pattern(melody):
             # 检查是否有重复的模式
             patterns = []
             for i in range(n - pattern_len + 1):
-                pattern = tuple(rhythm[i:i+pattern_len])
+                pattern = rhythm[i:i+pattern_len]
                 patterns.append(pattern)
             
             # 如果某个模式出现2次以上
-            from collections import Counter
             pattern_counts = Counter(patterns)
             if pattern_counts.most_common(1)[0][1] >= 2:
                 score += 10
@@ -303,4 +309,3 @@ rhythm_fitness_funcs = [
     rhythm_fitness_overall,
 ]
 
-print(f"✓ 已加载 {len(rhythm_fitness_funcs)} 个节奏适应度函数")
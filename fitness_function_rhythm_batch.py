@@ -0,0 +1,206 @@
+"""
+节奏适应度函数库（批量版）
+Batched Rhythm Fitness Functions
+
+fitness_function_rhythm.py 中各函数的种群级实现：
+直接作用于原始节奏基因矩阵 (N, RHYTHM_LENGTH)（int8，0=休止, 1=发声, 2=延长），
+一次返回整个种群的得分向量 (N,)，得分与逐旋律版本完全一致。
+
+1. rhythm_fitness_parity_batch - 节奏奇性（对径点成对检查）
+2. rhythm_fitness_density_batch - 节奏密度（起拍计数）
+3. rhythm_fitness_syncopation_batch - 切分音（起拍间隔种类数）
+4. rhythm_fitness_rest_batch - 休止符分布（休止计数与最长连续休止）
+5. rhythm_fitness_pattern_batch - 节奏模式（重复的2/3/4-gram）
+6. rhythm_fitness_overall_batch - 综合（按 RHYTHM_WEIGHTS 启用）
+"""
+
+import numpy as np
+
+from fitness_function_rhythm import (
+    RHYTHM_WEIGHTS,
+    rhythm_fitness_parity,
+    rhythm_fitness_density,
+    rhythm_fitness_syncopation,
+    rhythm_fitness_rest,
+    rhythm_fitness_pattern,
+    rhythm_fitness_overall,
+)
+
+
+# 节奏符号数量（n-gram 按该进制编码为整数）
+NUM_RHYTHM_SYMBOLS = 3
+
+
+# ============================================================
+# 基础统计量
+# ============================================================
+
+def onset_gaps(rhythm):
+    """
+    相邻起拍之间的间隔
+
+    Returns:
+        gaps: (N, L) int64，位置 j 为起拍且其后还有起拍时为到下一个起拍的距离，否则为 0
+    """
+    rhythm = np.asarray(rhythm)
+    n, length = rhythm.shape
+    onset = rhythm == 1
+    idx = np.where(onset, np.arange(length)[None, :], length)
+    # next_onset[:, j] = j 之后（不含 j）第一个起拍的位置，不存在时为 length
+    after = np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+    next_onset = np.concatenate([after[:, 1:], np.full((n, 1), length)], axis=1)
+    has_next = onset & (next_onset < length)
+    return np.where(has_next, next_onset - np.arange(length)[None, :], 0)
+
+
+def longest_run(mask):
+    """每行中连续 True 的最长长度 (N,)"""
+    mask = np.asarray(mask, dtype=bool)
+    if mask.shape[1] == 0:
+        return np.zeros(mask.shape[0], dtype=np.int64)
+    count = np.cumsum(mask, axis=1)
+    # 最近一个 False 位置处的累计值，用于重置连续计数
+    reset = np.maximum.accumulate(np.where(mask, 0, count), axis=1)
+    return (count - reset).max(axis=1)
+
+
+def has_repeated_ngram(rhythm, size):
+    """每行是否存在出现2次以上的长度为 size 的子序列 (N,)"""
+    rhythm = np.asarray(rhythm).astype(np.int64)
+    n, length = rhythm.shape
+    num_windows = length - size + 1
+    if num_windows < 2:
+        return np.zeros(n, dtype=bool)
+
+    codes = np.zeros((n, num_windows), dtype=np.int64)
+    for k in range(size):
+        codes = codes * NUM_RHYTHM_SYMBOLS + rhythm[:, k:k + num_windows]
+    codes.sort(axis=1)
+    return (codes[:, 1:] == codes[:, :-1]).any(axis=1)
+
+
+# ============================================================
+# 批量适应度函数
+# ============================================================
+
+def rhythm_fitness_parity_batch(rhythm):
+    """
+    节奏奇性（批量版，规则同 rhythm_fitness_parity）
+    对每对 (i, i + n//2)：都是起拍 -30；恰有一个起拍 +10
+    """
+    rhythm = np.asarray(rhythm)
+    half = rhythm.shape[1] // 2
+    onset = rhythm == 1
+    first = onset[:, :half]
+    mirror = onset[:, half:2 * half]
+    both = (first & mirror).sum(axis=1)
+    one = (first ^ mirror).sum(axis=1)
+    return (one * 10 - both * 30).astype(np.float64)
+
+
+def rhythm_fitness_density_batch(rhythm):
+    """
+    节奏密度（批量版，规则同 rhythm_fitness_density）
+    起拍比例 40-55%：+20；30-40% 或 55-65%：+10；其余：-20
+    """
+    rhythm = np.asarray(rhythm)
+    note_ratio = (rhythm == 1).sum(axis=1) / rhythm.shape[1]
+    ideal = (note_ratio >= 0.40) & (note_ratio <= 0.55)
+    near = ((note_ratio >= 0.30) & (note_ratio < 0.40)) | ((note_ratio > 0.55) & (note_ratio <= 0.65))
+    return np.where(ideal, 20.0, np.where(near, 10.0, -20.0))
+
+
+def rhythm_fitness_syncopation_batch(rhythm):
+    """
+    切分音（批量版，规则同 rhythm_fitness_syncopation）
+    得分 = 起拍间隔种类数 / min(间隔数, 8) × 20；起拍少于2个得0分
+    """
+    rhythm = np.asarray(rhythm)
+    n, length = rhythm.shape
+    gaps = onset_gaps(rhythm)
+
+    present = np.zeros((n, length + 1), dtype=bool)
+    rows, cols = np.nonzero(gaps)
+    present[rows, gaps[rows, cols]] = True
+    unique_intervals = present.sum(axis=1)
+
+    num_intervals = (rhythm == 1).sum(axis=1) - 1
+    max_possible = np.minimum(num_intervals, 8)
+    safe = np.where(max_possible > 0, max_possible, 1)
+    return np.where(max_possible > 0, unique_intervals / safe * 20, 0.0)
+
+
+def rhythm_fitness_rest_batch(rhythm):
+    """
+    休止符分布（批量版，规则同 rhythm_fitness_rest）
+    休止 2-4：+20；5-6：+10；>6：-10；0：-15
+    有休止且最长连续休止不超过2：额外 +5
+    """
+    rhythm = np.asarray(rhythm)
+    rest = rhythm == 0
+    rest_count = rest.sum(axis=1)
+    max_consecutive = longest_run(rest)
+
+    score = np.select(
+        [
+            (rest_count >= 2) & (rest_count <= 4),
+            (rest_count >= 5) & (rest_count <= 6),
+            rest_count > 6,
+            rest_count == 0,
+        ],
+        [20.0, 10.0, -10.0, -15.0],
+        default=0.0,
+    )
+    return score + np.where((rest_count > 0) & (max_consecutive <= 2), 5.0, 0.0)
+
+
+def rhythm_fitness_pattern_batch(rhythm):
+    """
+    节奏模式（批量版，规则同 rhythm_fitness_pattern）
+    依次检查长度2/3/4的子序列，任意一种出现重复即 +10
+    """
+    rhythm = np.asarray(rhythm)
+    length = rhythm.shape[1]
+    found = np.zeros(rhythm.shape[0], dtype=bool)
+    for pattern_len in (2, 3, 4):
+        if length >= pattern_len * 2:
+            found |= has_repeated_ngram(rhythm, pattern_len)
+    return np.where(found, 10.0, 0.0)
+
+
+def rhythm_fitness_overall_batch(rhythm):
+    """
+    综合节奏适应度（批量版）
+    与 rhythm_fitness_overall 相同：权重=0的函数不计算，其余简单相加
+    """
+    rhythm = np.asarray(rhythm)
+    total_score = np.zeros(rhythm.shape[0])
+
+    for key, func in RHYTHM_BATCH_FUNCS.items():
+        if RHYTHM_WEIGHTS.get(key, 0) != 0:
+            total_score = total_score + func(rhythm)
+
+    return total_score
+
+
+# ============================================================
+# 导出函数表（顺序与 rhythm_fitness_overall 的累加顺序一致）
+# ============================================================
+
+RHYTHM_BATCH_FUNCS = {
+    'parity': rhythm_fitness_parity_batch,
+    'density': rhythm_fitness_density_batch,
+    'syncopation': rhythm_fitness_syncopation_batch,
+    'rest': rhythm_fitness_rest_batch,
+    'pattern': rhythm_fitness_pattern_batch,
+}
+
+# 逐旋律函数 -> 批量函数（供引擎自动切换到批量路径）
+RHYTHM_BATCH_VERSIONS = {
+    rhythm_fitness_parity: rhythm_fitness_parity_batch,
+    rhythm_fitness_density: rhythm_fitness_density_batch,
+    rhythm_fitness_syncopation: rhythm_fitness_syncopation_batch,
+    rhythm_fitness_rest: rhythm_fitness_rest_batch,
+    rhythm_fitness_pattern: rhythm_fitness_pattern_batch,
+    rhythm_fitness_overall: rhythm_fitness_overall_batch,
+}
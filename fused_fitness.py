@@ -0,0 +1,317 @@
+"""
+单遍融合适应度评估
+Fused Single-pass Overall Fitness
+
+rhythm_fitness_overall / pitch_fitness_overall 依次调用最多10个分量函数，
+每个函数都要重新检查 melody.notes、重建音高列表、重新计数并扫描整个序列。
+这里按当前 RHYTHM_WEIGHTS / PITCH_WEIGHTS 生成一个专用的评估函数：
+- 只包含权重非0的分量（与 *_fitness_overall 的启用规则相同）
+- 节奏基因、音符列表各只遍历一次，所有分量在同一个循环中累加
+- 返回节奏总分、音高总分与各分量得分，结果与逐函数计算完全一致
+- 相邻音程超出 INTERVAL_TABLES 的范围（非 MIDI 音高）时改为逐分量函数计算
+
+权重在运行中被修改（如 ablation_study.set_weights）时，
+按 weights_fingerprint 自动重新生成；生成过的版本会被保留，切换回来时无需重建。
+
+用法:
+    evaluate = get_evaluator()            # 当前权重对应的评估函数
+    rhythm, pitch, breakdown = evaluate(rhythm_genes, notes)
+
+    total, breakdown = fused_fitness(melody)
+"""
+
+from functools import partial
+
+from fitness_cache import weights_fingerprint
+from fitness_function_rhythm import (
+    RHYTHM_WEIGHTS,
+    rhythm_fitness_overall,
+    rhythm_fitness_parity,
+    rhythm_fitness_density,
+    rhythm_fitness_syncopation,
+    rhythm_fitness_rest,
+    rhythm_fitness_pattern,
+    parity_pair_score,
+    density_score,
+    rest_score,
+)
+from fitness_function_pitch import (
+    PITCH_WEIGHTS,
+    pitch_fitness_overall,
+    pitch_fitness_stepwise,
+    pitch_fitness_consonance,
+    pitch_fitness_range,
+    pitch_fitness_direction,
+    pitch_fitness_climax,
+    INTERVAL_TABLES,
+    INTERVAL_OFFSET,
+    INTERVAL_LAST,
+    DIRECTION_CHANGE_TABLE,
+)
+
+
+# 分量的累加顺序与 *_fitness_overall 一致（保证浮点结果逐位相同）
+RHYTHM_KEYS = ('parity', 'density', 'syncopation', 'rest', 'pattern')
+PITCH_KEYS = ('stepwise', 'consonance', 'range', 'direction', 'climax')
+
+
+def supports(rhythm_fitness_func, pitch_fitness_func):
+    """该函数组合是否可以走融合评估"""
+    return (rhythm_fitness_func is rhythm_fitness_overall
+            and pitch_fitness_func is pitch_fitness_overall)
+
+
+# ============================================================
+# 代码片段
+# ============================================================
+# 每个分量由三段组成：循环前初始化、循环体、循环后得出分量得分 score_<分量>。
+# 节奏循环变量：i（位置）、r（当前符号）、n（长度）、half（n // 2）
+# 音高循环变量：k（音符序号）、p（当前音高）、d（查表下标）、m（音符数）
+
+_RHYTHM_BLOCKS = {
+    'parity': (
+        ["score_parity = 0"],
+        ["if half <= i < half2:",
+         "    score_parity += parity_pair_score(rhythm[i - half] == 1, r == 1)"],
+        [],
+    ),
+    'density': (
+        ["onsets = 0"],
+        ["if r == 1:",
+         "    onsets += 1"],
+        ["score_density = density_score(onsets, n) if n else 0"],
+    ),
+    'syncopation': (
+        ["last_onset = -1", "gaps = set()", "gap_count = 0"],
+        ["if r == 1:",
+         "    if last_onset >= 0:",
+         "        gaps.add(i - last_onset)",
+         "        gap_count += 1",
+         "    last_onset = i"],
+        ["score_syncopation = len(gaps) / min(gap_count, 8) * 20 if gap_count else 0"],
+    ),
+    'rest': (
+        ["rests = 0", "run = 0", "longest = 0"],
+        ["if r == 0:",
+         "    rests += 1",
+         "    run += 1",
+         "    if run > longest:",
+         "        longest = run",
+         "else:",
+         "    run = 0"],
+        ["score_rest = rest_score(rests, longest) if n else 0"],
+    ),
+    # 长度3、4的模式重复必然包含长度2的模式重复，
+    # 因此"是否存在重复的2-4拍模式"等价于"是否存在重复的相邻符号对"（n >= 4）
+    'pattern': (
+        ["seen = set()", "repeated = False", "prev_r = 0"],
+        ["if i:",
+         "    pair = (prev_r << 8) | r",
+         "    if pair in seen:",
+         "        repeated = True",
+         "    else:",
+         "        seen.add(pair)",
+         "prev_r = r"],
+        ["score_pattern = 10 if repeated and n >= 4 else 0"],
+    ),
+}
+
+_PITCH_BLOCKS = {
+    'stepwise': (
+        ["stepwise_table = INTERVAL_TABLES['stepwise']", "stepwise_sum = 0"],
+        ["stepwise_sum += stepwise_table[d]"],
+        ["score_stepwise = stepwise_sum / (m - 1) if m >= 2 else 0"],
+    ),
+    'consonance': (
+        ["consonance_table = INTERVAL_TABLES['consonance']", "consonance_sum = 0"],
+        ["consonance_sum += consonance_table[d]"],
+        ["score_consonance = consonance_sum / (m - 1) if m >= 2 else 0"],
+    ),
+    'range': (
+        [],
+        [],
+        ["if m >= 2:",
+         "    span = high - low",
+         "    score_range = -10 if span < 6 else (20 if span <= 18 else -5)",
+         "else:",
+         "    score_range = 0"],
+    ),
+    'direction': (
+        ["direction_table = INTERVAL_TABLES['direction']", "turns = 0", "last_dir = 0"],
+        ["step_dir = direction_table[d]",
+         "if k > 1:",
+         "    turns += DIRECTION_CHANGE_TABLE[last_dir][step_dir]",
+         "last_dir = step_dir"],
+        ["score_direction = turns / (m - 2) * 20 if m >= 3 else 0"],
+    ),
+    'climax': (
+        [],
+        [],
+        ["if m >= 4:",
+         "    score_climax = (12.5 if 0 < high_idx < m - 1 else 0) + (12.5 if 0 < low_idx < m - 1 else 0)",
+         "else:",
+         "    score_climax = 0"],
+    ),
+}
+
+# 需要在音高循环中跟踪最高/最低音的分量
+_EXTREMA_KEYS = ('range', 'climax')
+
+# 需要查 INTERVAL_TABLES 的分量（音程超出表的范围时整体改走 _by_components）
+_INTERVAL_KEYS = ('stepwise', 'consonance', 'direction')
+
+_COMPONENT_FUNCS = {
+    'parity': rhythm_fitness_parity,
+    'density': rhythm_fitness_density,
+    'syncopation': rhythm_fitness_syncopation,
+    'rest': rhythm_fitness_rest,
+    'pattern': rhythm_fitness_pattern,
+    'stepwise': pitch_fitness_stepwise,
+    'consonance': pitch_fitness_consonance,
+    'range': pitch_fitness_range,
+    'direction': pitch_fitness_direction,
+    'climax': pitch_fitness_climax,
+}
+
+
+class _Melody:
+    """传给逐分量函数的最小适配对象"""
+    __slots__ = ('notes', 'rhythm_genes')
+
+    def __init__(self, notes, rhythm_genes):
+        self.notes = notes
+        self.rhythm_genes = rhythm_genes
+
+
+def _by_components(rhythm_keys, pitch_keys, rhythm, notes):
+    """逐分量函数计算（与融合函数的返回值相同；累加顺序同 *_fitness_overall）"""
+    melody = _Melody(notes, rhythm)
+    breakdown = {key: _COMPONENT_FUNCS[key](melody) for key in rhythm_keys + pitch_keys}
+    rhythm_total = 0
+    for key in rhythm_keys:
+        rhythm_total += breakdown[key]
+    pitch_total = 0
+    for key in pitch_keys:
+        pitch_total += breakdown[key]
+    return rhythm_total, pitch_total, breakdown
+
+
+def _indent(lines, level):
+    return ["    " * level + line for line in lines]
+
+
+def _generate_source(rhythm_keys, pitch_keys):
+    """生成融合评估函数的源码"""
+    body = []
+
+    if rhythm_keys:
+        body.append("n = len(rhythm)")
+        body.append("half = n // 2")
+        body.append("half2 = half * 2")
+        for key in rhythm_keys:
+            body += _RHYTHM_BLOCKS[key][0]
+        body.append("for i, r in enumerate(rhythm):")
+        for key in rhythm_keys:
+            body += _indent(_RHYTHM_BLOCKS[key][1], 1)
+        for key in rhythm_keys:
+            body += _RHYTHM_BLOCKS[key][2]
+
+    if pitch_keys:
+        extrema = any(key in _EXTREMA_KEYS for key in pitch_keys)
+        body.append("m = len(notes)")
+        for key in pitch_keys:
+            body += _PITCH_BLOCKS[key][0]
+        body.append("if m:")
+        body.append("    prev = notes[0][0]")
+        if extrema:
+            body.append("    high = low = prev")
+            body.append("    high_idx = low_idx = 0")
+        body.append("    for k in range(1, m):")
+        body.append("        p = notes[k][0]")
+        body.append("        d = p - prev + INTERVAL_OFFSET")
+        if any(key in _INTERVAL_KEYS for key in pitch_keys):
+            body.append("        if not 0 <= d <= INTERVAL_LAST:")
+            body.append("            return by_components(rhythm, notes)")
+        for key in pitch_keys:
+            body += _indent(_PITCH_BLOCKS[key][1], 2)
+        if extrema:
+            body += _indent(["if p > high:",
+                             "    high = p",
+                             "    high_idx = k",
+                             "elif p < low:",
+                             "    low = p",
+                             "    low_idx = k"], 2)
+        body.append("        prev = p")
+        for key in pitch_keys:
+            body += _PITCH_BLOCKS[key][2]
+
+    # 按 *_fitness_overall 的顺序从0开始累加
+    body.append("rhythm_total = 0" + "".join(f" + score_{key}" for key in rhythm_keys))
+    body.append("pitch_total = 0" + "".join(f" + score_{key}" for key in pitch_keys))
+    breakdown = ", ".join(f"{key!r}: score_{key}" for key in rhythm_keys + pitch_keys)
+    body.append(f"return rhythm_total, pitch_total, {{{breakdown}}}")
+
+    return "def fused(rhythm, notes):\n" + "\n".join(_indent(body, 1)) + "\n"
+
+
+def compile_evaluator(rhythm_weights=None, pitch_weights=None):
+    """
+    按权重生成融合评估函数
+
+    Args:
+        rhythm_weights / pitch_weights: 默认使用当前的 RHYTHM_WEIGHTS / PITCH_WEIGHTS；
+                                        只有权重非0的分量会被计算
+
+    Returns:
+        fused(rhythm_genes, notes) -> (节奏总分, 音高总分, {分量: 得分})
+    """
+    rhythm_weights = RHYTHM_WEIGHTS if rhythm_weights is None else rhythm_weights
+    pitch_weights = PITCH_WEIGHTS if pitch_weights is None else pitch_weights
+    rhythm_keys = tuple(key for key in RHYTHM_KEYS if rhythm_weights.get(key, 0) != 0)
+    pitch_keys = tuple(key for key in PITCH_KEYS if pitch_weights.get(key, 0) != 0)
+
+    source = _generate_source(rhythm_keys, pitch_keys)
+    namespace = {
+        'parity_pair_score': parity_pair_score,
+        'density_score': density_score,
+        'rest_score': rest_score,
+        'INTERVAL_TABLES': INTERVAL_TABLES,
+        'INTERVAL_OFFSET': INTERVAL_OFFSET,
+        'INTERVAL_LAST': INTERVAL_LAST,
+        'DIRECTION_CHANGE_TABLE': DIRECTION_CHANGE_TABLE,
+        'by_components': partial(_by_components, rhythm_keys, pitch_keys),
+    }
+    exec(compile(source, f"<fused_fitness {'+'.join(rhythm_keys + pitch_keys)}>", 'exec'),
+         namespace)
+    fused = namespace['fused']
+    fused.source = source
+    return fused
+
+
+# 权重指纹 -> 已生成的评估函数
+_compiled = {}
+
+
+def get_evaluator():
+    """当前权重对应的融合评估函数（权重变化后自动重新生成）"""
+    key = weights_fingerprint(RHYTHM_WEIGHTS, PITCH_WEIGHTS)
+    fused = _compiled.get(key)
+    if fused is None:
+        fused = _compiled[key] = compile_evaluator()
+    return fused
+
+
+def fused_fitness(melody):
+    """
+    单遍计算综合适应度
+
+    Args:
+        melody: 带 notes（及可选 rhythm_genes）的对象，如 main.MelodyAdapter
+
+    Returns:
+        (总分, {分量: 得分})，总分 = rhythm_fitness_overall + pitch_fitness_overall
+    """
+    rhythm = getattr(melody, 'rhythm_genes', None) or ()
+    notes = melody.notes or ()
+    rhythm_total, pitch_total, breakdown = get_evaluator()(rhythm, notes)
+    return rhythm_total + pitch_total, breakdown
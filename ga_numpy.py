@@ -0,0 +1,500 @@
+"""
+NumPy 种群引擎
+NumPy Population Engine
+
+main.run_genetic_algorithm 的替代实现：
+整个种群保存为两个 (POP_SIZE, RHYTHM_LENGTH) 的 int8 矩阵（节奏 / 音高），
+选择、单点交叉、变异以及逆行/移调/倒影/增值/减值变换全部以批量数组运算完成。
+
+遗传算子的概率分布与 main.py 中的逐个体版本一致；
+返回值同样是 main.Individual，因此 save_to_midi / debug_genome 可以直接使用。
+"""
+
+import time
+
+import numpy as np
+
+# 导入配置
+from config import *
+
+from main import Individual, SCALES
+from stopping import StoppingRule
+from telemetry import TelemetryRecorder
+from checkpoint import (
+    CheckpointWriter, load_checkpoint, pack_scores, unpack_scores, capture_weights, restore_weights,
+)
+from seeding import resolve_seed, make_np_rng
+from decode_batch import decode_population, scale_lookup
+from fitness_function_rhythm_batch import RHYTHM_BATCH_VERSIONS
+from fitness_function_pitch_batch import PITCH_BATCH_VERSIONS
+
+
+# 节奏基因的候选值（与 mutate_rhythm 中 random.choice 的候选一致）
+RHYTHM_SYMBOLS = np.array([RHYTHM_NOTE, RHYTHM_HOLD, RHYTHM_REST], dtype=np.int8)
+
+# 音高变换的移调幅度（与 musical_transform_pitch 一致）
+TRANSPOSE_SHIFTS = np.array([-2, -1, 1, 2], dtype=np.int16)
+
+
+class NumpyPopulation:
+    """
+    以矩阵形式保存的种群
+
+    属性:
+        rhythm: (pop_size, RHYTHM_LENGTH) int8 节奏基因矩阵
+        pitch: (pop_size, PITCH_LENGTH) int8 音高基因矩阵（调式内索引）
+        rhythm_fitness / pitch_fitness / total_fitness: (pop_size,) 适应度向量
+    """
+
+    def __init__(self, scale_notes, pop_size=None, rng=None):
+        self.scale_notes = list(scale_notes)
+        self.num_scale_notes = len(self.scale_notes)
+        self.scale_array = scale_lookup(self.scale_notes)
+        self.pop_size = pop_size if pop_size is not None else POP_SIZE
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.rhythm = self._random_rhythm(self.pop_size)
+        self.pitch = self.rng.integers(
+            0, self.num_scale_notes, size=(self.pop_size, PITCH_LENGTH)
+        ).astype(np.int8)
+
+        self.rhythm_fitness = np.zeros(self.pop_size)
+        self.pitch_fitness = np.zeros(self.pop_size)
+        self.total_fitness = np.zeros(self.pop_size)
+
+    # ------------------------------------------------------------
+    # 初始化
+    # ------------------------------------------------------------
+
+    def _random_rhythm(self, n):
+        """加权生成节奏矩阵：40%发声，30%延长，30%休止（同 Individual._generate_rhythm）"""
+        rand = self.rng.random((n, RHYTHM_LENGTH))
+        rhythm = np.full((n, RHYTHM_LENGTH), RHYTHM_REST, dtype=np.int8)
+        rhythm[rand < 0.70] = RHYTHM_HOLD
+        rhythm[rand < 0.40] = RHYTHM_NOTE
+        # 确保第一个是发声
+        rhythm[:, 0] = RHYTHM_NOTE
+        return rhythm
+
+    # ------------------------------------------------------------
+    # 适应度
+    # ------------------------------------------------------------
+
+    def decode(self):
+        """将当前种群批量解码为 NoteTable"""
+        return decode_population(self.rhythm, self.pitch, self.scale_array)
+
+    def evaluate(self, rhythm_fitness_func, pitch_fitness_func):
+        """
+        计算整个种群的适应度
+        已知的适应度函数（见 *_BATCH_VERSIONS）走批量路径，
+        其余函数逐行调用，传入 NoteTable 的行视图
+        """
+        table = self.decode()
+        rhythm_batch = RHYTHM_BATCH_VERSIONS.get(rhythm_fitness_func)
+        pitch_batch = PITCH_BATCH_VERSIONS.get(pitch_fitness_func)
+
+        if rhythm_batch is not None:
+            self.rhythm_fitness = rhythm_batch(self.rhythm)
+        if pitch_batch is not None:
+            self.pitch_fitness = pitch_batch(table.pitch, table.counts)
+
+        if rhythm_batch is None or pitch_batch is None:
+            for i in range(self.pop_size):
+                melody = table.row(i)
+                try:
+                    if rhythm_batch is None:
+                        self.rhythm_fitness[i] = rhythm_fitness_func(melody)
+                    if pitch_batch is None:
+                        self.pitch_fitness[i] = pitch_fitness_func(melody)
+                except Exception as e:
+                    print(f"适应度计算错误: {e}")
+                    self.rhythm_fitness[i] = 0
+                    self.pitch_fitness[i] = 0
+        self.total_fitness = self.rhythm_fitness + self.pitch_fitness
+
+    def count_phenotypes(self):
+        """不同表现型（节奏基因 + 解码后的音高序列）的数量"""
+        table = self.decode()
+        keys = np.concatenate([self.rhythm.astype(np.int16), table.pitch.astype(np.int16)], axis=1)
+        return len(np.unique(keys, axis=0))
+
+    def sort(self):
+        """按总适应度降序排列（稳定排序，与 list.sort 一致）"""
+        order = np.argsort(-self.total_fitness, kind='stable')
+        self.rhythm = self.rhythm[order]
+        self.pitch = self.pitch[order]
+        self.rhythm_fitness = self.rhythm_fitness[order]
+        self.pitch_fitness = self.pitch_fitness[order]
+        self.total_fitness = self.total_fitness[order]
+
+    def to_individual(self, i):
+        """将第 i 行转换为 main.Individual（携带当前适应度）"""
+        ind = Individual(
+            rhythm_genes=bytearray(self.rhythm[i]),
+            pitch_genes=bytearray(self.pitch[i]),
+            scale_notes=self.scale_notes
+        )
+        ind.rhythm_fitness = float(self.rhythm_fitness[i])
+        ind.pitch_fitness = float(self.pitch_fitness[i])
+        ind.total_fitness = float(self.total_fitness[i])
+        return ind
+
+    # ------------------------------------------------------------
+    # 遗传操作算子（批量）
+    # ------------------------------------------------------------
+
+    def select_roulette(self, n):
+        """轮盘赌选择：一次抽取 n 个父代索引"""
+        fitness = self.total_fitness
+        min_fit = fitness.min()
+        offset = abs(min_fit) + 1 if min_fit < 0 else 0
+        weights = fitness + offset
+        total = weights.sum()
+        if total == 0:
+            return self.rng.integers(0, self.pop_size, size=n)
+
+        cumulative = np.cumsum(weights)
+        picks = self.rng.uniform(0, total, size=n)
+        idx = np.searchsorted(cumulative, picks, side='right')
+        return np.minimum(idx, self.pop_size - 1)
+
+    def select_sus(self, n):
+        """随机遍历抽样：n 个等间距指针，结果打乱顺序后返回"""
+        fitness = self.total_fitness
+        min_fit = fitness.min()
+        offset = abs(min_fit) + 1 if min_fit < 0 else 0
+        weights = fitness + offset
+        total = weights.sum()
+        if total == 0:
+            return self.rng.integers(0, self.pop_size, size=n)
+
+        cumulative = np.cumsum(weights)
+        step = total / n
+        pointers = self.rng.uniform(0, step) + step * np.arange(n)
+        idx = np.minimum(np.searchsorted(cumulative, pointers, side='right'), self.pop_size - 1)
+        return self.rng.permutation(idx)
+
+    def select_tournament(self, n, k=None):
+        """k-锦标赛选择：每行抽 k 个候选，取总适应度最高者"""
+        k = TOURNAMENT_SIZE if k is None else k
+        candidates = self.rng.integers(0, self.pop_size, size=(n, k))
+        winners = self.total_fitness[candidates].argmax(axis=1)
+        return candidates[np.arange(n), winners]
+
+    def select_parents(self, n, method=None):
+        """按 config.SELECTION_METHOD 一次抽取 n 个父代索引"""
+        method = SELECTION_METHOD if method is None else method
+        if method == 'roulette':
+            return self.select_roulette(n)
+        if method == 'sus':
+            return self.select_sus(n)
+        if method == 'tournament':
+            return self.select_tournament(n)
+        raise ValueError(f"未知的选择方式: {method}（可选: roulette, sus, tournament）")
+
+    def crossover(self, genes1, genes2, rate):
+        """单点交叉：每对以概率 rate 交叉，交叉点在 [1, L-1] 内均匀分布"""
+        n, length = genes1.shape
+        do_cross = self.rng.random(n) < rate
+        points = self.rng.integers(1, length, size=n)
+        head = np.arange(length)[None, :] < points[:, None]
+        head |= ~do_cross[:, None]
+        c1 = np.where(head, genes1, genes2)
+        c2 = np.where(head, genes2, genes1)
+        return c1, c2
+
+    def mutate_rhythm(self, genes, rate=None):
+        """节奏变异：每个位置以概率 rate 替换为随机节奏类型"""
+        rate = MUTATION_RATE if rate is None else rate
+        mask = self.rng.random(genes.shape) < rate
+        replacement = RHYTHM_SYMBOLS[self.rng.integers(0, len(RHYTHM_SYMBOLS), size=genes.shape)]
+        genes = np.where(mask, replacement, genes)
+        # 确保第一个是发声
+        genes[:, 0] = RHYTHM_NOTE
+        return genes
+
+    def mutate_pitch(self, genes, rate=None):
+        """音高变异：每个位置以概率 rate 替换为随机音级"""
+        rate = MUTATION_RATE if rate is None else rate
+        mask = self.rng.random(genes.shape) < rate
+        replacement = self.rng.integers(0, self.num_scale_notes, size=genes.shape)
+        return np.where(mask, replacement, genes).astype(np.int8)
+
+    def transform_pitch(self, genes, rate=None):
+        """音高特殊变换：被选中的行随机执行移调、倒影或逆行"""
+        rate = TRANSFORM_RATE if rate is None else rate
+        n = genes.shape[0]
+        num = self.num_scale_notes
+        selected = self.rng.random(n) < rate
+        ops = self.rng.integers(0, 3, size=n)
+        shifts = TRANSPOSE_SHIFTS[self.rng.integers(0, len(TRANSPOSE_SHIFTS), size=n)]
+
+        genes = genes.copy()
+        wide = genes.astype(np.int16)
+
+        rows = selected & (ops == 0)  # 移调
+        if rows.any():
+            genes[rows] = (wide[rows] + shifts[rows, None]) % num
+        rows = selected & (ops == 1)  # 倒影
+        if rows.any():
+            pivot = num // 2
+            genes[rows] = (2 * pivot - wide[rows]) % num
+        rows = selected & (ops == 2)  # 逆行
+        if rows.any():
+            genes[rows] = genes[rows, ::-1]
+        return genes
+
+    def transform_rhythm(self, genes, rate=None):
+        """节奏特殊变换：被选中的行随机执行逆行、增值或减值"""
+        rate = TRANSFORM_RATE if rate is None else rate
+        n, length = genes.shape
+        selected = self.rng.random(n) < rate
+        ops = self.rng.integers(0, 3, size=n)
+
+        genes = genes.copy()
+
+        rows = selected & (ops == 0)  # 逆行
+        if rows.any():
+            genes[rows] = genes[rows, ::-1]
+
+        rows = selected & (ops == 1)  # 增值：部分NOTE之后的位置改为HOLD
+        if rows.any():
+            sub = genes[rows]
+            rand = self.rng.random(sub.shape)
+            # 逐列推进：被前一列改成HOLD的NOTE不再触发（与逐元素循环的语义相同）
+            for i in range(length - 1):
+                fired = (sub[:, i] == RHYTHM_NOTE) & (rand[:, i] < 0.3)
+                sub[fired, i + 1] = RHYTHM_HOLD
+            genes[rows] = sub
+
+        rows = selected & (ops == 2)  # 减值：部分HOLD改为NOTE
+        if rows.any():
+            sub = genes[rows]
+            rand = self.rng.random(sub.shape)
+            sub[(sub == RHYTHM_HOLD) & (rand < 0.3)] = RHYTHM_NOTE
+            genes[rows] = sub
+
+        # 确保第一个是发声
+        genes[:, 0] = RHYTHM_NOTE
+        return genes
+
+    def breed(self, elitism_count=None):
+        """
+        由已排序、已评估的种群生成下一代
+        精英保留 + 选择（SELECTION_METHOD） + 交叉 + 变异 + 特殊变换
+        """
+        elitism_count = ELITISM_COUNT if elitism_count is None else elitism_count
+        num_children = self.pop_size - elitism_count
+        num_pairs = (num_children + 1) // 2
+
+        parents = self.select_parents(2 * num_pairs)
+        p1, p2 = parents[0::2], parents[1::2]
+
+        # 交叉（节奏和音高独立交叉）
+        r1, r2 = self.crossover(self.rhythm[p1], self.rhythm[p2], CROSSOVER_RATE)
+        t1, t2 = self.crossover(self.pitch[p1], self.pitch[p2], CROSSOVER_RATE)
+
+        # 子代按 c1, c2, c1, c2 ... 交错排列
+        child_rhythm = np.empty((2 * num_pairs, RHYTHM_LENGTH), dtype=np.int8)
+        child_pitch = np.empty((2 * num_pairs, PITCH_LENGTH), dtype=np.int8)
+        child_rhythm[0::2], child_rhythm[1::2] = r1, r2
+        child_pitch[0::2], child_pitch[1::2] = t1, t2
+
+        # 变异
+        child_rhythm = self.mutate_rhythm(child_rhythm)
+        child_pitch = self.mutate_pitch(child_pitch)
+
+        # 特殊变换
+        child_pitch = self.transform_pitch(child_pitch)
+        child_rhythm = self.transform_rhythm(child_rhythm)
+
+        self.rhythm = np.concatenate([self.rhythm[:elitism_count], child_rhythm[:num_children]])
+        self.pitch = np.concatenate([self.pitch[:elitism_count], child_pitch[:num_children]])
+        self.rhythm_fitness = np.zeros(self.pop_size)
+        self.pitch_fitness = np.zeros(self.pop_size)
+        self.total_fitness = np.zeros(self.pop_size)
+
+
+# === 主遗传算法（NumPy版） ===
+
+def run_genetic_algorithm_numpy(rhythm_fitness_func, pitch_fitness_func,
+                                scale_notes, func_name="Unknown",
+                                pop_size=None, max_gen=None, rng=None,
+                                stopping=None, run_info=None, seed=None, telemetry=None,
+                                checkpointer=None, resume=None):
+    """
+    与 main.run_genetic_algorithm 接口一致的矩阵化遗传算法
+
+    额外参数:
+        pop_size / max_gen: 覆盖 config 中的 POP_SIZE / MAX_GEN
+        rng: numpy.random.Generator（默认由 seed 派生）
+        stopping / run_info / seed / telemetry / checkpointer / resume: 同 main.run_genetic_algorithm
+
+    Returns:
+        Individual: 最后一代中总适应度最高的个体
+    """
+    max_gen = MAX_GEN if max_gen is None else max_gen
+
+    checkpoint_state = load_checkpoint(resume) if resume is not None else None
+    if checkpoint_state is not None:
+        if checkpoint_state.get('engine') != 'numpy':
+            raise ValueError(f"检查点不是 numpy 引擎保存的: {resume}")
+        if checkpoint_state['gen'] >= max_gen:
+            raise ValueError(f"检查点保存于第 {checkpoint_state['gen']} 代，max_gen={max_gen} "
+                             f"时没有可续跑的代数（max_gen 需大于 {checkpoint_state['gen']}）")
+        seed = checkpoint_state['seed']
+        scale_notes = checkpoint_state['scale_notes']
+        pop_size = checkpoint_state['pop_size']
+        restore_weights(checkpoint_state['weights'])
+
+    pop_size = POP_SIZE if pop_size is None else pop_size
+
+    if rng is None:
+        seed = resolve_seed(seed)
+        rng = make_np_rng(seed, 'run')
+
+    population = NumpyPopulation(scale_notes, pop_size=pop_size, rng=rng)
+    stopping = StoppingRule.from_config() if stopping is None else stopping
+    evaluations = 0
+
+    # 续跑：恢复已评估、已排序的种群与随机数状态
+    start_gen = 0
+    if checkpoint_state is not None:
+        population.rhythm = np.frombuffer(checkpoint_state['rhythm'], dtype=np.int8).reshape(
+            pop_size, RHYTHM_LENGTH).copy()
+        population.pitch = np.frombuffer(checkpoint_state['pitch'], dtype=np.int8).reshape(
+            pop_size, PITCH_LENGTH).copy()
+        population.rhythm_fitness = np.array(unpack_scores(checkpoint_state['rhythm_fitness']))
+        population.pitch_fitness = np.array(unpack_scores(checkpoint_state['pitch_fitness']))
+        population.total_fitness = np.array(unpack_scores(checkpoint_state['total_fitness']))
+        population.rng.bit_generator.state = checkpoint_state['rng_state']
+        evaluations = checkpoint_state['evaluations']
+        start_gen = checkpoint_state['gen']
+
+    own_checkpointer = False
+    if checkpointer is None:
+        checkpointer = CheckpointWriter.from_config()
+        own_checkpointer = checkpointer is not None
+
+    own_telemetry = False
+    if telemetry is None:
+        telemetry = TelemetryRecorder.from_config(func_name)
+        own_telemetry = telemetry is not None
+    if telemetry is not None:
+        telemetry.begin(run=func_name, engine='numpy', seed=seed)
+
+    print(f"\n{'='*60}")
+    print(f"开始运行: {func_name} [numpy]")
+    print(f"调式: {scale_notes}")
+    print(f"种群大小: {pop_size}, 最大代数: {max_gen}")
+    if seed is not None:
+        print(f"随机种子: {seed}")
+    if checkpoint_state is not None:
+        print(f"从检查点恢复: 第 {start_gen} 代 ({resume})")
+    print(f"{'='*60}")
+
+    best = None
+    stopping.start()
+    if checkpoint_state is not None:
+        stopping.restore(checkpoint_state['stopping'])
+    for gen in range(start_gen, max_gen):
+        track = telemetry is not None and telemetry.should_record(gen, last=gen == max_gen - 1)
+        eval_start = time.perf_counter()
+        resumed = checkpoint_state is not None and gen == start_gen
+
+        # 1. 计算适应度并排序（续跑的第一代直接使用检查点中的适应度）
+        if not resumed:
+            population.evaluate(rhythm_fitness_func, pitch_fitness_func)
+            evaluations += pop_size
+            population.sort()
+        best = population.to_individual(0)
+        eval_time = time.perf_counter() - eval_start
+
+        if checkpointer is not None and not resumed and checkpointer.due(gen):
+            checkpointer.save({
+                'engine': 'numpy',
+                'func_name': func_name,
+                'scale_notes': list(scale_notes),
+                'seed': seed,
+                'gen': gen,
+                'pop_size': pop_size,
+                'rhythm': population.rhythm.tobytes(),
+                'pitch': population.pitch.tobytes(),
+                'rhythm_fitness': pack_scores(population.rhythm_fitness),
+                'pitch_fitness': pack_scores(population.pitch_fitness),
+                'total_fitness': pack_scores(population.total_fitness),
+                'rng_state': population.rng.bit_generator.state,
+                'evaluations': evaluations,
+                'stopping': stopping.snapshot(),
+                'weights': capture_weights(),
+            })
+
+        # 检查停止条件
+        stop = stopping.should_stop(gen, best.total_fitness, evaluations)
+        if telemetry is not None and (track or stop):
+            # breed() 会替换得分数组，这里先保留本代的引用
+            scores = (population.rhythm_fitness, population.pitch_fitness,
+                      population.total_fitness)
+            unique_phenotypes = population.count_phenotypes()
+        if stop:
+            if telemetry is not None:
+                telemetry.record(gen, *scores, evaluations=pop_size, evaluations_total=evaluations,
+                                 unique_phenotypes=unique_phenotypes,
+                                 eval_time=eval_time, breed_time=0.0)
+            break
+
+        # 2. 生成下一代
+        breed_start = time.perf_counter()
+        if gen < max_gen - 1:
+            population.breed()
+        if track:
+            telemetry.record(gen, *scores, evaluations=pop_size, evaluations_total=evaluations,
+                             unique_phenotypes=unique_phenotypes,
+                             eval_time=eval_time, breed_time=time.perf_counter() - breed_start)
+
+        # 输出进度
+        if gen % PRINT_INTERVAL == 0:
+            print(f"  第{gen:4d}代: 总分={best.total_fitness:7.2f} "
+                  f"(节奏={best.rhythm_fitness:6.2f}, 音高={best.pitch_fitness:6.2f})")
+
+    print(f"\n最终结果: 总分={best.total_fitness:.2f} "
+          f"(节奏={best.rhythm_fitness:.2f}, 音高={best.pitch_fitness:.2f})")
+    print(f"停止于第 {stopping.generation} 代: {stopping.describe()} "
+          f"(评估 {evaluations} 次, 用时 {stopping.elapsed:.1f}s)")
+
+    if run_info is not None:
+        run_info.update({
+            'seed': seed,
+            'generations': stopping.generation + 1,
+            'stop_reason': stopping.reason,
+            'evaluations': evaluations,
+            'elapsed': stopping.elapsed,
+            'best_generation': stopping.best_gen,
+        })
+
+    if own_telemetry:
+        telemetry.close()
+    if own_checkpointer:
+        checkpointer.close()
+
+    return best
+
+
+if __name__ == "__main__":
+    import sys
+    from main import save_to_midi, debug_genome
+    from fitness_function_rhythm import rhythm_fitness_overall
+    from fitness_function_pitch import pitch_fitness_overall
+
+    chosen_scale = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SCALE
+    scale_notes = SCALES[chosen_scale]
+
+    best_ind = run_genetic_algorithm_numpy(
+        rhythm_fitness_overall,
+        pitch_fitness_overall,
+        scale_notes,
+        func_name="overall"
+    )
+    debug_genome(best_ind)
+    save_to_midi(best_ind, f"output_{chosen_scale}_overall_numpy.mid")
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Music_Math 权重网格并行搜索
+Parallel Grid-search Driver for Music_Math funcs
+
+Music_Math.py 的入口逐个串行运行 funcs，结果写入以时间戳命名的目录，
+中断后只能从头再来。本脚本把每个加权适应度函数作为一个独立任务交给进程池：
+- 每个任务在工作进程中运行一次完整的遗传算法（默认 music_math_numpy 引擎），
+  结果（权重、最高分、基因组、用时、种子）原子地写入 results/<函数名>.json，
+  最优旋律写入 <函数名>.mid（临时文件 + os.replace）
+- 父进程每完成一个任务就向 index.jsonl 追加一行并刷新到磁盘
+- 再次运行时跳过 index 中已有的组合（只有结果文件、没有 index 记录的组合会被补记；
+  追加时中断留下的不完整末行会被截掉，该组合随后按结果文件补记），
+  因此可以随时中断、继续，或在同一目录中逐步扩大网格
+- 网格的打乱顺序由根种子决定，根种子保存在输出目录的 grid.json 中，
+  续跑时自动沿用
+
+用法:
+    python grid_search.py                              # 与 Music_Math.py 相同的20个组合
+    python grid_search.py --count 2000 --workers 8     # 打乱后的前2000个组合
+    python grid_search.py --count 200 --screen 20000   # 先预筛选2万个组合，再运行其中最好的200个
+    python grid_search.py --all --max-gen 500          # 全部 10^5 个组合
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import RESULTS_DIR, GRID_SCREEN_SIZE
+from seeding import resolve_seed, derive_seed, make_rng
+
+
+INDEX_FILENAME = 'index.jsonl'
+META_FILENAME = 'grid.json'
+RESULT_SUBDIR = 'results'
+
+DEFAULT_COUNT = 20
+DEFAULT_OUTPUT_DIR = os.path.join(RESULTS_DIR, 'grid')
+
+
+# ============================================================
+# 文件
+# ============================================================
+
+def _atomic_write(path, data):
+    """先写入同目录的临时文件、fsync 后 os.replace，磁盘上不会出现写了一半的文件"""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_index(output_dir, repair=False):
+    """
+    读取 index.jsonl，返回 {函数名: 记录}
+
+    追加时中断会在末尾留下写了一半的行：读取时跳过，repair=True 时把文件截断到最后一个完整的行
+    （对应的组合仍有结果文件，grid_search 会补记）。其他位置无法解析的行直接报错。
+    """
+    path = os.path.join(output_dir, INDEX_FILENAME)
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    lines = data.split(b'\n')
+    valid_end = 0
+    for i, line in enumerate(lines):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if any(rest.strip() for rest in lines[i + 1:]):
+                    raise
+                print(f"⚠️  {path} 末尾有不完整的记录，已忽略")
+                break
+            records[record['name']] = record
+        valid_end += len(line) + 1
+
+    if repair:
+        valid_end = min(valid_end, len(data))
+        with open(path, 'r+b') as f:
+            # 截断不完整的末行，并保证文件以换行结尾（下一条记录从新的一行开始）
+            f.truncate(valid_end)
+            if valid_end and data[valid_end - 1:valid_end] != b'\n':
+                f.seek(valid_end)
+                f.write(b'\n')
+    return records
+
+
+def _load_root_seed(output_dir, seed):
+    """显式种子 > grid.json 中保存的种子 > 新种子；结果写回 grid.json"""
+    path = os.path.join(output_dir, META_FILENAME)
+    if seed is None and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            seed = json.load(f)['seed']
+    seed = resolve_seed(seed)
+    _atomic_write(path, json.dumps({'seed': seed}).encode('utf-8'))
+    return seed
+
+
+# ============================================================
+# 组合
+# ============================================================
+
+def combo_name(combo):
+    """与 create_weighted_fitness 生成的函数名相同"""
+    return "fit_w_" + "_".join(str(w) for w in combo)
+
+
+def build_combos(root_seed, count=DEFAULT_COUNT, screen=None):
+    """
+    按根种子打乱整个网格（同 fitness_function._build_grid），取前 count 个组合
+
+    Args:
+        count: 组合数量（None 表示全部）
+        screen: 先在共享抽样种群上为前 screen 个组合打分，再从中选出 count 个
+                （见 fitness_components.select_promising）
+    """
+    from fitness_function import weight_options
+    combos = list(itertools.product(weight_options, repeat=5))
+    make_rng(root_seed, 'fitness_grid').shuffle(combos)
+    if count is None:
+        return combos
+    if screen and screen > count:
+        from fitness_components import select_promising
+        return select_promising(combos[:screen], keep=count, seed=root_seed)
+    return combos[:count]
+
+
+# ============================================================
+# 任务（在工作进程中执行）
+# ============================================================
+
+def _run_job(task):
+    """
+    运行一个组合并写出结果文件
+
+    Args:
+        task: (combo, seed, engine, pop_size, max_gen, output_dir)
+
+    Returns:
+        index 记录（dict）
+    """
+    combo, seed, engine, pop_size, max_gen, output_dir = task
+    from fitness_function import create_weighted_fitness
+    from midi_writer import encode_midi
+    import Music_Math
+
+    fitness_func = create_weighted_fitness(*combo)
+    name = fitness_func.__name__
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        if engine == 'numpy':
+            from music_math_numpy import run_genetic_algorithm_numpy
+            best = run_genetic_algorithm_numpy(fitness_func, func_name=name, pop_size=pop_size,
+                                               max_gen=max_gen, seed=seed)
+        else:
+            # 逐个体版本返回的个体不携带得分，这里重新计算一次
+            best = Music_Math.run_genetic_algorithm(fitness_func, func_name=name,
+                                                    pop_size=pop_size, max_gen=max_gen, seed=seed)
+            best.fitness = fitness_func(Music_Math.MelodyAdapter(best.to_notes()))
+    runtime = time.perf_counter() - start
+
+    record = {
+        'name': name,
+        'weights': list(combo),
+        'best_score': float(best.fitness),
+        'genome': [int(g) for g in best.genes],
+        'runtime': runtime,
+        'seed': seed,
+        'engine': engine,
+        'pop_size': pop_size,
+        'max_gen': max_gen,
+        'result': os.path.join(RESULT_SUBDIR, f"{name}.json"),
+        'midi': os.path.join(RESULT_SUBDIR, f"{name}.mid"),
+    }
+    _atomic_write(os.path.join(output_dir, record['midi']), encode_midi(best.to_notes()))
+    _atomic_write(os.path.join(output_dir, record['result']),
+                  json.dumps(record, ensure_ascii=False, indent=2).encode('utf-8'))
+    return record
+
+
+# ============================================================
+# 父进程
+# ============================================================
+
+def grid_search(combos=None, output_dir=DEFAULT_OUTPUT_DIR, count=DEFAULT_COUNT, screen=None,
+                engine='numpy', workers=None, pop_size=200, max_gen=2000, seed=None):
+    """
+    并行运行网格中的组合
+
+    Args:
+        combos: 显式的组合列表（默认 build_combos(根种子, count, screen)）
+        output_dir: 输出目录（index.jsonl、grid.json 与 results/）
+        count / screen: 见 build_combos（screen 默认 config.GRID_SCREEN_SIZE）
+        engine: 'numpy'（music_math_numpy）或 'python'（Music_Math.run_genetic_algorithm）
+        workers: 进程数（默认 CPU 核心数；0 表示在主进程中串行运行）
+        pop_size / max_gen: 每个组合的遗传算法参数
+        seed: 根种子（默认沿用 grid.json，否则 config.RANDOM_SEED / 新种子）；
+              每个组合的种子由根种子与权重派生
+
+    Returns:
+        {函数名: 记录}，包含此前已完成的组合
+    """
+    os.makedirs(os.path.join(output_dir, RESULT_SUBDIR), exist_ok=True)
+    root_seed = _load_root_seed(output_dir, seed)
+    if combos is None:
+        screen = GRID_SCREEN_SIZE if screen is None else screen
+        combos = build_combos(root_seed, count, screen)
+
+    index = read_index(output_dir, repair=True)
+    index_path = os.path.join(output_dir, INDEX_FILENAME)
+    index_file = open(index_path, 'a', encoding='utf-8')
+
+    def append(record):
+        index[record['name']] = record
+        index_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        index_file.flush()
+        os.fsync(index_file.fileno())
+
+    # 已有结果文件但 index 中没有记录（上次在两者之间中断）：补记
+    pending = []
+    for combo in combos:
+        name = combo_name(combo)
+        if name in index:
+            continue
+        result_path = os.path.join(output_dir, RESULT_SUBDIR, f"{name}.json")
+        if os.path.exists(result_path):
+            with open(result_path, encoding='utf-8') as f:
+                append(json.load(f))
+            continue
+        pending.append(combo)
+
+    skipped = len(combos) - len(pending)
+    workers = os.cpu_count() if workers is None else workers
+    print(f"网格搜索: {len(combos)} 个组合（已完成 {skipped}，待运行 {len(pending)}）| "
+          f"引擎 {engine} | 种群 {pop_size}, {max_gen} 代 | "
+          f"{workers or '串行'}{' 个进程' if workers else ''} | 根种子 {root_seed}")
+
+    tasks = [(combo, derive_seed(root_seed, 'grid', tuple(combo)), engine, pop_size, max_gen,
+              output_dir) for combo in pending]
+    failed = 0
+    start_time = time.perf_counter()
+
+    def report(done, record):
+        elapsed = time.perf_counter() - start_time
+        print(f"[{done}/{len(tasks)}] {record['name']}  最高分={record['best_score']:.2f}  "
+              f"{record['runtime']:.1f}s  (累计 {elapsed:.0f}s)")
+
+    try:
+        if workers and tasks:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_run_job, task): task[0] for task in tasks}
+                for done, future in enumerate(as_completed(futures), 1):
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        failed += 1
+                        print(f"[{done}/{len(tasks)}] {combo_name(futures[future])} 失败: {e}")
+                        continue
+                    append(record)
+                    report(done, record)
+        else:
+            for done, task in enumerate(tasks, 1):
+                try:
+                    record = _run_job(task)
+                except Exception as e:
+                    failed += 1
+                    print(f"[{done}/{len(tasks)}] {combo_name(task[0])} 失败: {e}")
+                    continue
+                append(record)
+                report(done, record)
+    finally:
+        index_file.close()
+
+    total_time = time.perf_counter() - start_time
+    finished = len(tasks) - failed
+    rate = finished / total_time if total_time > 0 else 0.0
+    print(f"\n✓ 完成 {finished} 个组合，跳过 {skipped} 个，失败 {failed} 个，"
+          f"用时 {total_time:.1f}s（{rate:.2f} 组合/秒）")
+
+    ranked = sorted((index[combo_name(c)] for c in combos if combo_name(c) in index),
+                    key=lambda r: r['best_score'], reverse=True)
+    if ranked:
+        print("最高分组合:")
+        for record in ranked[:5]:
+            print(f"  {record['best_score']:10.2f}  {record['name']}")
+    print(f"✓ 索引: {index_path}")
+    return index
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Music_Math 权重网格并行搜索")
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT,
+                        help='运行打乱后的前N个组合')
+    parser.add_argument('--all', action='store_true', help='运行全部组合')
+    parser.add_argument('--screen', type=int, default=None, metavar='M',
+                        help='先在共享抽样种群上预筛选前M个组合，再运行其中最好的 --count 个')
+    parser.add_argument('--engine', choices=['numpy', 'python'], default='numpy',
+                        help='遗传算法引擎')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='进程数（默认 CPU 核心数，0 = 串行）')
+    parser.add_argument('--pop-size', type=int, default=200, help='种群大小')
+    parser.add_argument('--max-gen', type=int, default=2000, help='代数')
+    parser.add_argument('--seed', type=int, default=None, help='根种子（默认沿用输出目录中的）')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='输出目录')
+    args = parser.parse_args(argv)
+
+    grid_search(output_dir=args.output_dir, count=None if args.all else args.count,
+                screen=args.screen, engine=args.engine, workers=args.workers,
+                pop_size=args.pop_size, max_gen=args.max_gen, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
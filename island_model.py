@@ -0,0 +1,277 @@
+"""
+岛屿模型遗传算法
+Island-model GA with Periodic Migration
+
+单个种群只能占用一个核心，并且在32位的小搜索空间里很早收敛。
+岛屿模型把种群拆成 K 个子种群，每个子种群在自己的进程中
+用 ga_numpy.NumpyPopulation 独立进化（各自的随机种子），
+每隔 MIGRATION_INTERVAL 代同步一次：
+- 每个岛屿把最优的 MIGRATION_SIZE 个个体打包为紧凑的基因字节串迁出
+- 主进程按拓扑（ring：i → i+1；random：随机的其他岛屿）转发
+- 目标岛屿用迁入个体替换下一代中排在最后的个体（精英不受影响）
+
+每到 PRINT_INTERVAL 代输出各岛屿最优与全局最优。
+
+岛屿进程启动时写入父进程的 RHYTHM_WEIGHTS / PITCH_WEIGHTS 快照（checkpoint.capture_weights），
+因此在 spawn 启动方式（macOS / Windows）下父进程修改过的权重（如 ablation_study.set_weights）同样生效。
+
+用法:
+    python island_model.py C_major --islands 8 --interval 25 --migrants 2
+"""
+
+import os
+import multiprocessing
+
+import numpy as np
+
+# 导入配置
+from config import *
+
+from main import Individual, SCALES
+from seeding import resolve_seed, derive_seed, make_np_rng
+from checkpoint import capture_weights, restore_weights
+
+
+# ============================================================
+# 基因打包
+# ============================================================
+
+def pack_genes(rhythm, pitch):
+    """(m, L) int8 节奏/音高矩阵 -> (行数, 节奏字节串, 音高字节串)"""
+    return (len(rhythm),
+            np.ascontiguousarray(rhythm, dtype=np.int8).tobytes(),
+            np.ascontiguousarray(pitch, dtype=np.int8).tobytes())
+
+
+def unpack_genes(payload):
+    """pack_genes 的逆操作"""
+    rows, rhythm_bytes, pitch_bytes = payload
+    rhythm = np.frombuffer(rhythm_bytes, dtype=np.int8).reshape(rows, RHYTHM_LENGTH)
+    pitch = np.frombuffer(pitch_bytes, dtype=np.int8).reshape(rows, PITCH_LENGTH)
+    return rhythm, pitch
+
+
+# ============================================================
+# 岛屿进程
+# ============================================================
+
+def _island_worker(conn, scale_notes, rhythm_fitness_func, pitch_fitness_func,
+                   pop_size, migration_size, seed, weights):
+    """
+    岛屿进程主循环
+
+    先写入父进程的权重快照（weights，见 checkpoint.capture_weights），收到 (代数, 迁入个体) 后进化相应代数，回复
+    (进度记录, 迁出个体, 最优个体, 最优适应度)；收到 None 时退出。
+    """
+    from ga_numpy import NumpyPopulation
+
+    restore_weights(weights)
+    population = NumpyPopulation(scale_notes, pop_size=pop_size,
+                                 rng=np.random.default_rng(seed))
+    gen = 0
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        num_gens, immigrants = message
+
+        if immigrants is not None:
+            # 替换排在最后的个体（此时种群已繁殖、尚未评估，精英在最前）
+            rhythm, pitch = unpack_genes(immigrants)
+            count = min(len(rhythm), population.pop_size - ELITISM_COUNT)
+            if count > 0:
+                population.rhythm[-count:] = rhythm[:count]
+                population.pitch[-count:] = pitch[:count]
+
+        history = []
+        for _ in range(num_gens):
+            population.evaluate(rhythm_fitness_func, pitch_fitness_func)
+            population.sort()
+            if gen % PRINT_INTERVAL == 0:
+                history.append((gen, float(population.total_fitness[0])))
+            gen += 1
+            best_payload = pack_genes(population.rhythm[:1], population.pitch[:1])
+            best_scores = (float(population.rhythm_fitness[0]),
+                           float(population.pitch_fitness[0]))
+            emigrants = pack_genes(population.rhythm[:migration_size],
+                                   population.pitch[:migration_size])
+            population.breed()
+
+        conn.send((history, emigrants, best_payload, best_scores))
+    conn.close()
+
+
+# ============================================================
+# 迁移拓扑
+# ============================================================
+
+def migration_targets(num_islands, topology, rng):
+    """返回 targets[i] = 岛屿 i 的迁出个体发往的岛屿"""
+    if num_islands < 2:
+        return list(range(num_islands))
+    if topology == 'ring':
+        return [(i + 1) % num_islands for i in range(num_islands)]
+    if topology == 'random':
+        targets = []
+        for i in range(num_islands):
+            target = int(rng.integers(0, num_islands - 1))
+            targets.append(target + 1 if target >= i else target)
+        return targets
+    raise ValueError(f"未知的迁移拓扑: {topology}（可选: ring, random）")
+
+
+# ============================================================
+# 主进程
+# ============================================================
+
+def run_island_model(rhythm_fitness_func, pitch_fitness_func, scale_notes,
+                     func_name="Unknown", num_islands=None, pop_size=None, max_gen=None,
+                     migration_interval=None, migration_size=None, topology=None, seed=None):
+    """
+    岛屿模型遗传算法
+
+    Args:
+        rhythm_fitness_func / pitch_fitness_func: 模块级适应度函数（需可被 pickle）
+        num_islands: 岛屿数量（默认 ISLAND_COUNT，0 表示 CPU 核心数）
+        pop_size: 每个岛屿的种群大小（默认 POP_SIZE）
+        max_gen: 总代数（默认 MAX_GEN）
+        migration_interval / migration_size / topology: 默认取 config 中的 MIGRATION_*
+        seed: 根随机种子（默认 config.RANDOM_SEED，未设置时随机生成）；
+              岛屿 i 使用 derive_seed(seed, 'island', i)，迁移目标由 'migration' 流决定，
+              相同种子可逐位复现
+
+    Returns:
+        Individual: 所有岛屿中总适应度最高的个体
+    """
+    num_islands = num_islands or ISLAND_COUNT or os.cpu_count()
+    pop_size = POP_SIZE if pop_size is None else pop_size
+    max_gen = MAX_GEN if max_gen is None else max_gen
+    migration_interval = migration_interval or MIGRATION_INTERVAL
+    migration_size = MIGRATION_SIZE if migration_size is None else migration_size
+    topology = topology or MIGRATION_TOPOLOGY
+
+    seed = resolve_seed(seed)
+    rng = make_np_rng(seed, 'migration')
+
+    print(f"\n{'='*60}")
+    print(f"开始运行: {func_name} [岛屿模型]")
+    print(f"调式: {scale_notes}")
+    print(f"岛屿: {num_islands} × 种群 {pop_size}, 最大代数: {max_gen}")
+    print(f"迁移: 每 {migration_interval} 代, 每岛 {migration_size} 个, 拓扑 {topology}")
+    print(f"随机种子: {seed}")
+    print(f"{'='*60}")
+
+    weights = capture_weights()
+    connections = []
+    processes = []
+    for i in range(num_islands):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_island_worker,
+            args=(child_conn, list(scale_notes), rhythm_fitness_func, pitch_fitness_func,
+                  pop_size, migration_size, derive_seed(seed, 'island', i), weights),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        connections.append(parent_conn)
+        processes.append(process)
+
+    best_payload = None
+    best_scores = None
+    best_total = float('-inf')
+    incoming = [None] * num_islands
+    try:
+        gen = 0
+        while gen < max_gen:
+            num_gens = min(migration_interval, max_gen - gen)
+            for conn, immigrants in zip(connections, incoming):
+                conn.send((num_gens, immigrants))
+            replies = [conn.recv() for conn in connections]
+            gen += num_gens
+
+            # 进度：每个 PRINT_INTERVAL 代的各岛屿最优与全局最优
+            reported = {}
+            for i, (history, _, _, _) in enumerate(replies):
+                for report_gen, score in history:
+                    reported.setdefault(report_gen, [None] * num_islands)[i] = score
+            for report_gen in sorted(reported):
+                scores = reported[report_gen]
+                islands = " ".join(f"{s:7.2f}" for s in scores)
+                print(f"  第{report_gen:4d}代: 全局最优={max(scores):7.2f} | 各岛: {islands}")
+
+            for _, _, payload, scores in replies:
+                if sum(scores) > best_total:
+                    best_total = sum(scores)
+                    best_payload = payload
+                    best_scores = scores
+
+            # 迁移
+            targets = migration_targets(num_islands, topology, rng)
+            incoming = [None] * num_islands
+            if migration_size > 0 and num_islands > 1:
+                for i, (_, emigrants, _, _) in enumerate(replies):
+                    target = targets[i]
+                    if incoming[target] is None:
+                        incoming[target] = emigrants
+                    else:
+                        # random 拓扑下一个岛屿可能同时收到多批迁入个体
+                        rhythm_a, pitch_a = unpack_genes(incoming[target])
+                        rhythm_b, pitch_b = unpack_genes(emigrants)
+                        incoming[target] = pack_genes(np.concatenate([rhythm_a, rhythm_b]),
+                                                      np.concatenate([pitch_a, pitch_b]))
+    finally:
+        for conn in connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    rhythm, pitch = unpack_genes(best_payload)
+    best = Individual(rhythm_genes=bytearray(rhythm[0]), pitch_genes=bytearray(pitch[0]),
+                      scale_notes=list(scale_notes))
+    best.rhythm_fitness, best.pitch_fitness = best_scores
+    best.total_fitness = best_total
+
+    print(f"\n最终结果: 总分={best.total_fitness:.2f} "
+          f"(节奏={best.rhythm_fitness:.2f}, 音高={best.pitch_fitness:.2f})")
+    return best
+
+
+if __name__ == "__main__":
+    import argparse
+    from main import save_to_midi, debug_genome
+    from fitness_function_rhythm import rhythm_fitness_overall
+    from fitness_function_pitch import pitch_fitness_overall
+
+    parser = argparse.ArgumentParser(description="岛屿模型遗传算法")
+    parser.add_argument('scale', nargs='?', default=DEFAULT_SCALE, help='调式名称')
+    parser.add_argument('--islands', type=int, default=None, help='岛屿数量（默认CPU核心数）')
+    parser.add_argument('--pop-size', type=int, default=None, help='每个岛屿的种群大小')
+    parser.add_argument('--generations', type=int, default=None, help='总代数')
+    parser.add_argument('--interval', type=int, default=None, help='迁移间隔（代）')
+    parser.add_argument('--migrants', type=int, default=None, help='每次迁出的个体数')
+    parser.add_argument('--topology', choices=['ring', 'random'], default=None, help='迁移拓扑')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子')
+    args = parser.parse_args()
+
+    scale_notes = SCALES[args.scale]
+    best_ind = run_island_model(
+        rhythm_fitness_overall,
+        pitch_fitness_overall,
+        scale_notes,
+        func_name="overall",
+        num_islands=args.islands,
+        pop_size=args.pop_size,
+        max_gen=args.generations,
+        migration_interval=args.interval,
+        migration_size=args.migrants,
+        topology=args.topology,
+        seed=args.seed,
+    )
+    debug_genome(best_ind)
+    save_to_midi(best_ind, f"output_{args.scale}_overall_islands.mid")
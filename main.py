@@ -2,21 +2,27 @@ import random
 import copy
 import time
 import os
-from midiutil import MIDIFile
+from bisect import bisect_right
+from itertools import accumulate
 
 # 导入配置
 from config import *
-
-# 创建results文件夹
-if not os.path.exists(RESULTS_DIR):
-    os.makedirs(RESULTS_DIR)
-    print(f"✓ 已创建 {RESULTS_DIR}/ 文件夹")
+from fitness_cache import FitnessCache, phenotype_key, weights_fingerprint
+import delta_fitness
+import fused_fitness
+from stopping import StoppingRule
+from telemetry import TelemetryRecorder
+from checkpoint import (
+    CheckpointWriter, load_checkpoint, pack_genes, unpack_genes, pack_scores, unpack_scores,
+    capture_weights, restore_weights,
+)
+from seeding import resolve_seed, make_rng
+from midi_writer import write_midi
 
 # === 1. 导入适应度函数库 ===
 try:
     from fitness_function_rhythm import rhythm_fitness_overall
     from fitness_function_pitch import pitch_fitness_overall
-    print("✓ 已导入综合适应度函数")
 except ImportError as e:
     print(f"错误: 未找到适应度函数文件 - {e}")
     exit(1)
@@ -67,40 +73,109 @@ for scale_name, scale_info in AVAILABLE_SCALES.items():
         scale_info['intervals']
     )
 
-# === 3. Individual类（双基因编码）===
+# === 3. 解码与Individual类（双基因编码）===
+def decode_genes(rhythm_genes, pitch_genes, scale_notes):
+    """
+    将双基因解码为音符列表
+    返回: [(pitch, start_time, duration), ...]
+    """
+    notes = []
+    current_pitch = None
+    current_start = 0.0
+    current_dur = 0
+    
+    for i in range(RHYTHM_LENGTH):
+        time_step = i * 0.5  # 每个八分音符0.5拍
+        rhythm = rhythm_genes[i]
+        
+        if rhythm == RHYTHM_NOTE:
+            # 如果有音符在播放，先结束它
+            if current_pitch is not None:
+                notes.append((current_pitch, current_start, current_dur * 0.5))
+            
+            # 开始新音符
+            pitch_idx = pitch_genes[i]
+            current_pitch = scale_notes[pitch_idx]
+            current_start = time_step
+            current_dur = 1
+            
+        elif rhythm == RHYTHM_HOLD:
+            if current_pitch is not None:
+                current_dur += 1  # 延长当前音符
+            # 如果前面是休止，则继续休止
+            
+        elif rhythm == RHYTHM_REST:
+            # 结束当前音符（如果有）
+            if current_pitch is not None:
+                notes.append((current_pitch, current_start, current_dur * 0.5))
+            current_pitch = None
+            current_dur = 0
+    
+    # 结束最后的音符
+    if current_pitch is not None:
+        notes.append((current_pitch, current_start, current_dur * 0.5))
+        
+    return notes
+
+
+def as_genes(genes):
+    """基因的紧凑表示：bytearray（每个位置1字节）；已是 bytearray 时直接使用"""
+    return genes if type(genes) is bytearray else bytearray(genes)
+
+
 class Individual:
-    def __init__(self, rhythm_genes=None, pitch_genes=None, scale_notes=None):
+    """
+    双基因个体
+    使用 __slots__（无实例字典），基因保存为 bytearray，
+    复制与交叉都是缓冲区切片；下标访问、count、切片、迭代与列表用法一致
+    """
+    __slots__ = (
+        'rhythm_genes', 'pitch_genes', 'scale_notes',
+        'rhythm_fitness', 'pitch_fitness', 'total_fitness',
+        'fitness_state', 'parent_state',
+    )
+    
+    def __init__(self, rhythm_genes=None, pitch_genes=None, scale_notes=None, rng=random):
         """
         rhythm_genes: 长度16的节奏基因 [0=休止, 1=发声, 2=延长]
         pitch_genes: 长度16的音高基因 [0到len(scale_notes)-1，索引调式内的音]
+                     （列表、bytes、bytearray 等均可，内部统一保存为 bytearray）
         scale_notes: 调式音阶列表（MIDI音高）
+        rng: 随机生成基因时使用的生成器（random.Random，默认全局 random）
         """
         self.scale_notes = scale_notes if scale_notes else SCALES['C_major']
-        self.num_scale_notes = len(self.scale_notes)
         
         if rhythm_genes:
-            self.rhythm_genes = rhythm_genes
+            self.rhythm_genes = as_genes(rhythm_genes)
         else:
             # 加权生成节奏：40%发声，30%延长，30%休止
-            self.rhythm_genes = [self._generate_rhythm() for _ in range(RHYTHM_LENGTH)]
+            self.rhythm_genes = bytearray(self._generate_rhythm(rng) for _ in range(RHYTHM_LENGTH))
             # 确保第一个是发声
             if self.rhythm_genes[0] != RHYTHM_NOTE:
                 self.rhythm_genes[0] = RHYTHM_NOTE
                 
         if pitch_genes:
-            self.pitch_genes = pitch_genes
+            self.pitch_genes = as_genes(pitch_genes)
         else:
             # 随机生成音高索引（索引范围：0 到 调式音数量-1）
-            self.pitch_genes = [random.randint(0, self.num_scale_notes - 1) 
-                               for _ in range(PITCH_LENGTH)]
+            self.pitch_genes = bytearray(rng.randint(0, self.num_scale_notes - 1)
+                                         for _ in range(PITCH_LENGTH))
             
         self.rhythm_fitness = 0.0
         self.pitch_fitness = 0.0
         self.total_fitness = 0.0
+        
+        # 增量评估用：自身与父代的分量状态（delta_fitness.FitnessState）
+        self.fitness_state = None
+        self.parent_state = None
+    
+    @property
+    def num_scale_notes(self):
+        return len(self.scale_notes)
     
-    def _generate_rhythm(self):
+    def _generate_rhythm(self, rng=random):
         """加权生成节奏基因"""
-        rand = random.random()
+        rand = rng.random()
         if rand < 0.40:
             return RHYTHM_NOTE  # 40% 发声
         elif rand < 0.70:
@@ -113,43 +188,7 @@ class Individual:
         将双基因解码为音符列表
         返回: [(pitch, start_time, duration), ...]
         """
-        notes = []
-        current_pitch = None
-        current_start = 0.0
-        current_dur = 0
-        
-        for i in range(RHYTHM_LENGTH):
-            time_step = i * 0.5  # 每个八分音符0.5拍
-            rhythm = self.rhythm_genes[i]
-            
-            if rhythm == RHYTHM_NOTE:
-                # 如果有音符在播放，先结束它
-                if current_pitch is not None:
-                    notes.append((current_pitch, current_start, current_dur * 0.5))
-                
-                # 开始新音符
-                pitch_idx = self.pitch_genes[i]
-                current_pitch = self.scale_notes[pitch_idx]
-                current_start = time_step
-                current_dur = 1
-                
-            elif rhythm == RHYTHM_HOLD:
-                if current_pitch is not None:
-                    current_dur += 1  # 延长当前音符
-                # 如果前面是休止，则继续休止
-                
-            elif rhythm == RHYTHM_REST:
-                # 结束当前音符（如果有）
-                if current_pitch is not None:
-                    notes.append((current_pitch, current_start, current_dur * 0.5))
-                current_pitch = None
-                current_dur = 0
-        
-        # 结束最后的音符
-        if current_pitch is not None:
-            notes.append((current_pitch, current_start, current_dur * 0.5))
-            
-        return notes
+        return decode_genes(self.rhythm_genes, self.pitch_genes, self.scale_notes)
 
 def debug_genome(individual):
     """调试输出"""
@@ -161,8 +200,8 @@ def debug_genome(individual):
     rest_count = rhythm.count(RHYTHM_REST)
     
     print(f"\n--- 基因调试工具 ---")
-    print(f"节奏基因: {rhythm}")
-    print(f"音高基因: {pitch}")
+    print(f"节奏基因: {list(rhythm)}")
+    print(f"音高基因: {list(pitch)}")
     print(f"统计: 发声:{note_count} | 延长:{hold_count} | 休止:{rest_count}")
     print(f"节奏适应度: {individual.rhythm_fitness:.2f}")
     print(f"音高适应度: {individual.pitch_fitness:.2f}")
@@ -177,16 +216,16 @@ class MelodyAdapter:
 
 # === 5. 遗传操作算子 ===
 
-def selection_roulette(population):
+def selection_roulette(population, rng=random):
     """轮盘赌选择"""
     min_fit = min(ind.total_fitness for ind in population)
     offset = abs(min_fit) + 1 if min_fit < 0 else 0
     
     total_fitness = sum(ind.total_fitness + offset for ind in population)
     if total_fitness == 0:
-        return random.choice(population)
+        return rng.choice(population)
         
-    pick = random.uniform(0, total_fitness)
+    pick = rng.uniform(0, total_fitness)
     current = 0
     for ind in population:
         current += (ind.total_fitness + offset)
@@ -194,65 +233,130 @@ def selection_roulette(population):
             return ind
     return population[-1]
 
-def crossover_genes(genes1, genes2):
+def _roulette_weights(population):
+    """轮盘赌权重：负分整体平移到正数区间（与 selection_roulette 相同）"""
+    min_fit = min(ind.total_fitness for ind in population)
+    offset = abs(min_fit) + 1 if min_fit < 0 else 0
+    return [ind.total_fitness + offset for ind in population]
+
+def select_roulette_batch(population, n, rng=random):
+    """
+    轮盘赌选择（批量版）
+    每代只构建一次累积适应度数组，每次抽取用二分查找，O(log N)
+    """
+    cumulative = list(accumulate(_roulette_weights(population)))
+    total_fitness = cumulative[-1]
+    if total_fitness == 0:
+        return [rng.choice(population) for _ in range(n)]
+    
+    last = len(population) - 1
+    return [population[min(bisect_right(cumulative, rng.uniform(0, total_fitness)), last)]
+            for _ in range(n)]
+
+def select_sus_batch(population, n, rng=random):
+    """
+    随机遍历抽样 (Stochastic Universal Sampling)
+    n 个等间距指针一次扫过累积适应度数组，选择方差低于轮盘赌
+    """
+    cumulative = list(accumulate(_roulette_weights(population)))
+    total_fitness = cumulative[-1]
+    if total_fitness == 0:
+        return [rng.choice(population) for _ in range(n)]
+    
+    step = total_fitness / n
+    pointer = rng.uniform(0, step)
+    selected = []
+    idx = 0
+    last = len(population) - 1
+    for _ in range(n):
+        while idx < last and cumulative[idx] <= pointer:
+            idx += 1
+        selected.append(population[idx])
+        pointer += step
+    # 打乱顺序，避免相邻的相似个体总被配成一对
+    rng.shuffle(selected)
+    return selected
+
+def select_tournament_batch(population, n, k=None, rng=random):
+    """k-锦标赛选择：每次随机抽 k 个个体，取总适应度最高者"""
+    k = TOURNAMENT_SIZE if k is None else k
+    size = len(population)
+    return [max((population[rng.randrange(size)] for _ in range(k)),
+                key=lambda ind: ind.total_fitness)
+            for _ in range(n)]
+
+SELECTION_METHODS = {
+    'roulette': select_roulette_batch,
+    'sus': select_sus_batch,
+    'tournament': select_tournament_batch,
+}
+
+def select_parents(population, n, method=None, rng=random):
+    """按 config.SELECTION_METHOD 一次抽取下一代所需的全部 n 个父代"""
+    method = SELECTION_METHOD if method is None else method
+    if method not in SELECTION_METHODS:
+        raise ValueError(f"未知的选择方式: {method}（可选: {', '.join(SELECTION_METHODS)}）")
+    return SELECTION_METHODS[method](population, n, rng=rng)
+
+def crossover_genes(genes1, genes2, rng=random):
     """单点交叉"""
-    point = random.randint(1, len(genes1) - 1)
+    point = rng.randint(1, len(genes1) - 1)
     c1 = genes1[:point] + genes2[point:]
     c2 = genes2[:point] + genes1[point:]
     return c1, c2
 
-def mutate_rhythm(genes, rate=0.05):
+def mutate_rhythm(genes, rate=0.05, rng=random):
     """节奏变异"""
     new_genes = genes[:]
     for i in range(len(new_genes)):
-        if random.random() < rate:
-            new_genes[i] = random.choice([RHYTHM_NOTE, RHYTHM_HOLD, RHYTHM_REST])
+        if rng.random() < rate:
+            new_genes[i] = rng.choice([RHYTHM_NOTE, RHYTHM_HOLD, RHYTHM_REST])
     # 确保第一个是发声
     if new_genes[0] != RHYTHM_NOTE:
         new_genes[0] = RHYTHM_NOTE
     return new_genes
 
-def mutate_pitch(genes, num_scale_notes, rate=0.05):
+def mutate_pitch(genes, num_scale_notes, rate=0.05, rng=random):
     """音高变异"""
     new_genes = genes[:]
     for i in range(len(new_genes)):
-        if random.random() < rate:
-            new_genes[i] = random.randint(0, num_scale_notes - 1)
+        if rng.random() < rate:
+            new_genes[i] = rng.randint(0, num_scale_notes - 1)
     return new_genes
 
-def musical_transform_pitch(genes, num_scale_notes):
+def musical_transform_pitch(genes, num_scale_notes, rng=random):
     """音高特殊变换：移调、倒影、逆行"""
     new_genes = genes[:]
-    op = random.choice(['transposition', 'inversion', 'retrograde'])
+    op = rng.choice(['transposition', 'inversion', 'retrograde'])
     
     if op == 'retrograde':
         new_genes.reverse()
     elif op == 'transposition':
-        shift = random.choice([-2, -1, 1, 2])
-        new_genes = [(g + shift) % num_scale_notes for g in new_genes]
+        shift = rng.choice([-2, -1, 1, 2])
+        new_genes = bytearray((g + shift) % num_scale_notes for g in new_genes)
     elif op == 'inversion':
         pivot = num_scale_notes // 2  # 中心音
-        new_genes = [(2 * pivot - g) % num_scale_notes for g in new_genes]
+        new_genes = bytearray((2 * pivot - g) % num_scale_notes for g in new_genes)
     
     return new_genes
 
-def musical_transform_rhythm(genes):
+def musical_transform_rhythm(genes, rng=random):
     """节奏特殊变换：逆行、增值、减值"""
     new_genes = genes[:]
-    op = random.choice(['retrograde', 'augmentation', 'diminution'])
+    op = rng.choice(['retrograde', 'augmentation', 'diminution'])
     
     if op == 'retrograde':
         new_genes.reverse()
     elif op == 'augmentation':
         # 增值：将一些NOTE改为HOLD（让音符更长）
         for i in range(len(new_genes)):
-            if new_genes[i] == RHYTHM_NOTE and random.random() < 0.3:
+            if new_genes[i] == RHYTHM_NOTE and rng.random() < 0.3:
                 if i + 1 < len(new_genes):
                     new_genes[i + 1] = RHYTHM_HOLD
     elif op == 'diminution':
         # 减值：将一些HOLD改为NOTE（让音符更短）
         for i in range(len(new_genes)):
-            if new_genes[i] == RHYTHM_HOLD and random.random() < 0.3:
+            if new_genes[i] == RHYTHM_HOLD and rng.random() < 0.3:
                 new_genes[i] = RHYTHM_NOTE
     
     # 确保第一个是发声
@@ -262,42 +366,283 @@ def musical_transform_rhythm(genes):
 
 # === 6. 主遗传算法 ===
 
+def _checkpoint_state(population, gen, seed, rng, evaluations, stopping, scale_notes, func_name,
+                      cache):
+    """
+    本代评估、排序之后的完整状态（见 checkpoint.py）
+    适应度缓存与"哪些个体带有增量评估状态"也一并保存，续跑后的缓存命中与评估次数与不中断时相同
+    """
+    weights_key = weights_fingerprint(RHYTHM_WEIGHTS, PITCH_WEIGHTS)
+    return {
+        'engine': 'python',
+        'func_name': func_name,
+        'scale_notes': list(scale_notes),
+        'seed': seed,
+        'gen': gen,
+        'pop_size': len(population),
+        'rhythm': pack_genes(ind.rhythm_genes for ind in population),
+        'pitch': pack_genes(ind.pitch_genes for ind in population),
+        'rhythm_fitness': pack_scores(ind.rhythm_fitness for ind in population),
+        'pitch_fitness': pack_scores(ind.pitch_fitness for ind in population),
+        'total_fitness': pack_scores(ind.total_fitness for ind in population),
+        'delta_state': bytes(ind.fitness_state is not None for ind in population),
+        'cache': cache.snapshot(weights_key),
+        'rng_state': rng.getstate(),
+        'evaluations': evaluations,
+        'stopping': stopping.snapshot(),
+        'weights': capture_weights(),
+    }
+
+def _restore_population(state):
+    """由检查点重建已评估的种群"""
+    scale_notes = state['scale_notes']
+    population = []
+    for rhythm, pitch, rhythm_fitness, pitch_fitness, total_fitness in zip(
+            unpack_genes(state['rhythm'], RHYTHM_LENGTH),
+            unpack_genes(state['pitch'], PITCH_LENGTH),
+            unpack_scores(state['rhythm_fitness']),
+            unpack_scores(state['pitch_fitness']),
+            unpack_scores(state['total_fitness'])):
+        ind = Individual(rhythm, pitch, scale_notes)
+        ind.rhythm_fitness = rhythm_fitness
+        ind.pitch_fitness = pitch_fitness
+        ind.total_fitness = total_fitness
+        population.append(ind)
+    return population
+
+def _record_telemetry(telemetry, gen, population, phenotypes, **fields):
+    """写出一条遥测记录（phenotypes 为本代收集到的表现型键集合，未收集时现算）"""
+    if phenotypes is None:
+        phenotypes = {phenotype_key(ind.to_notes(), ind.rhythm_genes, None) for ind in population}
+    telemetry.record(
+        gen,
+        [ind.rhythm_fitness for ind in population],
+        [ind.pitch_fitness for ind in population],
+        [ind.total_fitness for ind in population],
+        unique_phenotypes=len(phenotypes),
+        **fields
+    )
+
+
 def run_genetic_algorithm(rhythm_fitness_func, pitch_fitness_func, 
-                         scale_notes, func_name="Unknown"):
+                         scale_notes, func_name="Unknown", evaluator=None,
+                         pop_size=None, max_gen=None, stopping=None, run_info=None,
+                         seed=None, telemetry=None, checkpointer=None, resume=None):
     """
     双基因独立进化的遗传算法
     使用config.py中定义的超参数
+    
+    evaluator: 可选的 parallel_eval.ParallelEvaluator（可跨多次运行复用）；
+               未提供且 PARALLEL_WORKERS > 0 时自动创建，并在运行结束时关闭
+    pop_size / max_gen: 覆盖 config 中的 POP_SIZE / MAX_GEN（如使用配置预设时）
+    stopping: 可选的 stopping.StoppingRule（默认按 config 中的停止条件构建）
+    run_info: 可选的字典，运行结束后写入 seed / generations / stop_reason /
+              evaluations / elapsed / best_generation
+    seed: 根随机种子（默认 config.RANDOM_SEED，未设置时随机生成）；
+          本次运行的全部随机性都来自由它派生的生成器，相同种子可逐位复现
+    telemetry: 可选的 telemetry.TelemetryRecorder，逐代记录得分统计、评估次数与耗时；
+               未提供且设置了 config.TELEMETRY_PATH 时自动创建，并在运行结束时关闭
+    checkpointer: 可选的 checkpoint.CheckpointWriter，周期性保存检查点；
+                  未提供且设置了 config.CHECKPOINT_PATH 时自动创建，并在运行结束时关闭
+    resume: 检查点文件路径；从检查点所在的代继续（种子、调式、种群大小与权重都取自检查点，
+            max_gen 可以大于原运行，但必须大于检查点所在的代，否则抛出 ValueError），
+            之后的进化与不中断时逐位相同
     """
-    # 初始化种群
-    population = [Individual(scale_notes=scale_notes) for _ in range(POP_SIZE)]
+    max_gen = MAX_GEN if max_gen is None else max_gen
+    
+    # 断点续跑：种子、调式、种群与权重都来自检查点
+    checkpoint_state = load_checkpoint(resume) if resume is not None else None
+    if checkpoint_state is not None:
+        if checkpoint_state.get('engine') != 'python':
+            raise ValueError(f"检查点不是 python 引擎保存的: {resume}")
+        if checkpoint_state['gen'] >= max_gen:
+            raise ValueError(f"检查点保存于第 {checkpoint_state['gen']} 代，max_gen={max_gen} "
+                             f"时没有可续跑的代数（max_gen 需大于 {checkpoint_state['gen']}）")
+        seed = checkpoint_state['seed']
+        scale_notes = checkpoint_state['scale_notes']
+        pop_size = checkpoint_state['pop_size']
+        restore_weights(checkpoint_state['weights'])
+    
+    pop_size = POP_SIZE if pop_size is None else pop_size
+    seed = resolve_seed(seed)
+    rng = make_rng(seed, 'run')
+    
+    own_evaluator = False
+    if evaluator is None and PARALLEL_WORKERS > 0:
+        from parallel_eval import ParallelEvaluator
+        evaluator = ParallelEvaluator(PARALLEL_WORKERS, PARALLEL_CHUNK_SIZE)
+        own_evaluator = True
+    
+    own_telemetry = False
+    if telemetry is None:
+        telemetry = TelemetryRecorder.from_config(func_name)
+        own_telemetry = telemetry is not None
+    if telemetry is not None:
+        telemetry.begin(run=func_name, engine='python', seed=seed)
+    
+    own_checkpointer = False
+    if checkpointer is None:
+        checkpointer = CheckpointWriter.from_config()
+        own_checkpointer = checkpointer is not None
+    
+    # 初始化种群（续跑时恢复检查点中已评估、已排序的种群与随机数状态）
+    if checkpoint_state is None:
+        population = [Individual(scale_notes=scale_notes, rng=rng) for _ in range(pop_size)]
+        start_gen = 0
+    else:
+        population = _restore_population(checkpoint_state)
+        rng.setstate(checkpoint_state['rng_state'])
+        start_gen = checkpoint_state['gen']
+    
+    # 表现型适应度缓存（跨代共享；续跑时恢复检查点中的条目）
+    cache = FitnessCache(FITNESS_CACHE_SIZE)
+    if checkpoint_state is not None and 'cache' in checkpoint_state:
+        cache.restore(checkpoint_state['cache'], weights_fingerprint(RHYTHM_WEIGHTS, PITCH_WEIGHTS))
+    
+    # 增量评估
+    use_delta = DELTA_EVALUATION and delta_fitness.supports(rhythm_fitness_func, pitch_fitness_func)
+    decode = lambda rhythm_genes, pitch_genes: decode_genes(rhythm_genes, pitch_genes, scale_notes)
+    delta_count = 0
+    if checkpoint_state is not None and use_delta:
+        # 重建检查点中带有增量评估状态的个体的状态（不计评估次数），子代照常走增量路径
+        for ind, has_state in zip(population, checkpoint_state.get('delta_state', b'')):
+            if has_state:
+                ind.fitness_state = delta_fitness.evaluate_full(ind.rhythm_genes, ind.pitch_genes,
+                                                                ind.to_notes())
+    
+    # 融合评估：overall 组合按当前权重单遍计算全部分量
+    use_fused = FUSED_EVALUATION and fused_fitness.supports(rhythm_fitness_func, pitch_fitness_func)
+    
+    # 停止条件与实际计算的适应度次数（缓存命中不计）
+    stopping = StoppingRule.from_config() if stopping is None else stopping
+    evaluations = 0
     
     print(f"\n{'='*60}")
     print(f"开始运行: {func_name}")
     print(f"调式: {scale_notes}")
-    print(f"种群大小: {POP_SIZE}, 最大代数: {MAX_GEN}")
+    print(f"种群大小: {pop_size}, 最大代数: {max_gen}")
+    print(f"随机种子: {seed}")
+    if checkpoint_state is not None:
+        print(f"从检查点恢复: 第 {start_gen} 代 ({resume})")
     print(f"{'='*60}")
     
-    for gen in range(MAX_GEN):
+    stopping.start()
+    if checkpoint_state is not None:
+        evaluations = checkpoint_state['evaluations']
+        stopping.restore(checkpoint_state['stopping'])
+    for gen in range(start_gen, max_gen):
+        # 续跑的第一代即检查点本身：适应度已恢复，跳过评估（不改变缓存与评估次数）
+        resumed = checkpoint_state is not None and gen == start_gen
+        
+        # 遥测：只在抽样的代收集表现型与耗时
+        track = telemetry is not None and telemetry.should_record(gen, last=gen == max_gen - 1)
+        if track:
+            eval_start = time.perf_counter()
+            evaluations_before = evaluations
+            hits_before = cache.hits
+        phenotypes = set() if track and not resumed else None
+        
         # 1. 计算适应度
-        for ind in population:
+        weights_key = weights_fingerprint(RHYTHM_WEIGHTS, PITCH_WEIGHTS)
+        fused = fused_fitness.get_evaluator() if use_fused else None
+        pending = []
+        for ind in (() if resumed else population):
+            # 增量评估：基于父代状态只修补变化部分
+            if use_delta and ind.parent_state is not None:
+                state = delta_fitness.evaluate_delta(
+                    ind.parent_state, ind.rhythm_genes, ind.pitch_genes,
+                    scale_notes, decode, DELTA_MAX_CHANGES
+                )
+                ind.fitness_state = state
+                ind.rhythm_fitness = state.rhythm_fitness
+                ind.pitch_fitness = state.pitch_fitness
+                ind.total_fitness = ind.rhythm_fitness + ind.pitch_fitness
+                delta_count += 1
+                evaluations += 1
+                if track:
+                    phenotypes.add(phenotype_key(state.notes, ind.rhythm_genes, weights_key))
+                continue
+            
             note_list = ind.to_notes()
-            adapter = MelodyAdapter(note_list, ind.rhythm_genes, ind.pitch_genes)
+            key = phenotype_key(note_list, ind.rhythm_genes, weights_key)
+            if track:
+                phenotypes.add(key)
+            cached = cache.get(key)
+            if cached is not None:
+                ind.rhythm_fitness, ind.pitch_fitness = cached
+                ind.total_fitness = ind.rhythm_fitness + ind.pitch_fitness
+                continue
+            
+            if use_delta:
+                state = delta_fitness.evaluate_full(ind.rhythm_genes, ind.pitch_genes, note_list)
+                ind.fitness_state = state
+                ind.rhythm_fitness = state.rhythm_fitness
+                ind.pitch_fitness = state.pitch_fitness
+                ind.total_fitness = ind.rhythm_fitness + ind.pitch_fitness
+                cache.put(key, (ind.rhythm_fitness, ind.pitch_fitness))
+                evaluations += 1
+                continue
+            
+            if evaluator is not None:
+                pending.append((ind, key))
+                continue
+            
+            evaluations += 1
             
             try:
-                ind.rhythm_fitness = rhythm_fitness_func(adapter)
-                ind.pitch_fitness = pitch_fitness_func(adapter)
+                if fused is not None:
+                    ind.rhythm_fitness, ind.pitch_fitness, _ = fused(ind.rhythm_genes, note_list)
+                else:
+                    adapter = MelodyAdapter(note_list, ind.rhythm_genes, ind.pitch_genes)
+                    ind.rhythm_fitness = rhythm_fitness_func(adapter)
+                    ind.pitch_fitness = pitch_fitness_func(adapter)
                 # 总适应度是两者的加权和
                 ind.total_fitness = ind.rhythm_fitness + ind.pitch_fitness
+                cache.put(key, (ind.rhythm_fitness, ind.pitch_fitness))
             except Exception as e:
                 print(f"适应度计算错误: {e}")
                 ind.rhythm_fitness = 0
                 ind.pitch_fitness = 0
                 ind.total_fitness = 0
         
+        # 并行评估未命中缓存的个体
+        if pending:
+            scores = evaluator.evaluate(
+                [(ind.rhythm_genes, ind.pitch_genes) for ind, _ in pending],
+                scale_notes, rhythm_fitness_func, pitch_fitness_func
+            )
+            for (ind, key), (rhythm_fitness, pitch_fitness) in zip(pending, scores):
+                ind.rhythm_fitness = rhythm_fitness
+                ind.pitch_fitness = pitch_fitness
+                ind.total_fitness = rhythm_fitness + pitch_fitness
+                cache.put(key, (rhythm_fitness, pitch_fitness))
+            evaluations += len(pending)
+        
         # 排序
         population.sort(key=lambda x: x.total_fitness, reverse=True)
         best = population[0]
         
+        eval_time = time.perf_counter() - eval_start if track else None
+        
+        # 检查点（续跑的第一代即检查点本身，不再重复保存）
+        if checkpointer is not None and checkpointer.due(gen) and not resumed:
+            checkpointer.save(_checkpoint_state(population, gen, seed, rng, evaluations,
+                                                stopping, scale_notes, func_name, cache))
+        
+        # 检查停止条件（在繁殖之前，best 即为目前为止的最优个体）
+        if stopping.should_stop(gen, best.total_fitness, evaluations):
+            if telemetry is not None:
+                # 提前停止的一代总会被记录
+                _record_telemetry(
+                    telemetry, gen, population, phenotypes,
+                    evaluations=evaluations - evaluations_before if track else None,
+                    evaluations_total=evaluations,
+                    cache_hits=cache.hits - hits_before if track else None,
+                    eval_time=eval_time, breed_time=0.0,
+                )
+            break
+        breed_start = time.perf_counter() if track else None
+        
         # 2. 生成下一代
         next_gen = []
         
@@ -309,11 +654,16 @@ def run_genetic_algorithm(rhythm_fitness_func, pitch_fitness_func,
                 scale_notes=scale_notes
             ) for ind in population[:ELITISM_COUNT]
         ])
+        for elite, ind in zip(next_gen, population):
+            elite.parent_state = ind.fitness_state
+        
+        # 选择：一次抽取本代所需的全部父代
+        num_pairs = (pop_size - len(next_gen) + 1) // 2
+        parents = select_parents(population, 2 * num_pairs, rng=rng)
         
-        while len(next_gen) < POP_SIZE:
-            # 选择
-            p1 = selection_roulette(population)
-            p2 = selection_roulette(population)
+        for pair in range(num_pairs):
+            p1 = parents[2 * pair]
+            p2 = parents[2 * pair + 1]
             
             # 复制父代
             c1_rhythm = p1.rhythm_genes[:]
@@ -322,34 +672,47 @@ def run_genetic_algorithm(rhythm_fitness_func, pitch_fitness_func,
             c2_pitch = p2.pitch_genes[:]
             
             # 交叉（节奏和音高独立交叉）
-            if random.random() < CROSSOVER_RATE:
-                c1_rhythm, c2_rhythm = crossover_genes(c1_rhythm, c2_rhythm)
-            if random.random() < CROSSOVER_RATE:
-                c1_pitch, c2_pitch = crossover_genes(c1_pitch, c2_pitch)
+            if rng.random() < CROSSOVER_RATE:
+                c1_rhythm, c2_rhythm = crossover_genes(c1_rhythm, c2_rhythm, rng)
+            if rng.random() < CROSSOVER_RATE:
+                c1_pitch, c2_pitch = crossover_genes(c1_pitch, c2_pitch, rng)
             
             # 获取音阶大小
             num_scale_notes = len(scale_notes)
             
             # 变异
-            c1_rhythm = mutate_rhythm(c1_rhythm)
-            c1_pitch = mutate_pitch(c1_pitch, num_scale_notes)
-            c2_rhythm = mutate_rhythm(c2_rhythm)
-            c2_pitch = mutate_pitch(c2_pitch, num_scale_notes)
+            c1_rhythm = mutate_rhythm(c1_rhythm, rng=rng)
+            c1_pitch = mutate_pitch(c1_pitch, num_scale_notes, rng=rng)
+            c2_rhythm = mutate_rhythm(c2_rhythm, rng=rng)
+            c2_pitch = mutate_pitch(c2_pitch, num_scale_notes, rng=rng)
             
             # 特殊变换
-            if random.random() < TRANSFORM_RATE:
-                c1_pitch = musical_transform_pitch(c1_pitch, num_scale_notes)
-            if random.random() < TRANSFORM_RATE:
-                c2_pitch = musical_transform_pitch(c2_pitch, num_scale_notes)
-            if random.random() < TRANSFORM_RATE:
-                c1_rhythm = musical_transform_rhythm(c1_rhythm)
-            if random.random() < TRANSFORM_RATE:
-                c2_rhythm = musical_transform_rhythm(c2_rhythm)
+            if rng.random() < TRANSFORM_RATE:
+                c1_pitch = musical_transform_pitch(c1_pitch, num_scale_notes, rng)
+            if rng.random() < TRANSFORM_RATE:
+                c2_pitch = musical_transform_pitch(c2_pitch, num_scale_notes, rng)
+            if rng.random() < TRANSFORM_RATE:
+                c1_rhythm = musical_transform_rhythm(c1_rhythm, rng)
+            if rng.random() < TRANSFORM_RATE:
+                c2_rhythm = musical_transform_rhythm(c2_rhythm, rng)
             
-            # 创建新个体
-            next_gen.append(Individual(c1_rhythm, c1_pitch, scale_notes))
-            if len(next_gen) < POP_SIZE:
-                next_gen.append(Individual(c2_rhythm, c2_pitch, scale_notes))
+            # 创建新个体（记录父代状态，供增量评估）
+            child = Individual(c1_rhythm, c1_pitch, scale_notes)
+            child.parent_state = p1.fitness_state
+            next_gen.append(child)
+            if len(next_gen) < pop_size:
+                child = Individual(c2_rhythm, c2_pitch, scale_notes)
+                child.parent_state = p2.fitness_state
+                next_gen.append(child)
+        
+        if track:
+            _record_telemetry(
+                telemetry, gen, population, phenotypes,
+                evaluations=evaluations - evaluations_before,
+                evaluations_total=evaluations,
+                cache_hits=cache.hits - hits_before,
+                eval_time=eval_time, breed_time=time.perf_counter() - breed_start,
+            )
         
         population = next_gen
         
@@ -358,59 +721,93 @@ def run_genetic_algorithm(rhythm_fitness_func, pitch_fitness_func,
             print(f"  第{gen:4d}代: 总分={best.total_fitness:7.2f} "
                   f"(节奏={best.rhythm_fitness:6.2f}, 音高={best.pitch_fitness:6.2f})")
     
-    # 最终输出
-    best = population[0]
+    # 最终输出（best 为最后一次评估中的最优个体，带有完整的适应度）
     print(f"\n最终结果: 总分={best.total_fitness:.2f} "
           f"(节奏={best.rhythm_fitness:.2f}, 音高={best.pitch_fitness:.2f})")
+    print(f"停止于第 {stopping.generation} 代: {stopping.describe()} "
+          f"(评估 {evaluations} 次, 用时 {stopping.elapsed:.1f}s)")
+    print(f"适应度缓存: 命中率={cache.hit_ratio:.1%} "
+          f"(命中={cache.hits}, 未命中={cache.misses})")
+    if use_delta:
+        print(f"增量评估: {delta_count} 次")
+    
+    if run_info is not None:
+        run_info.update({
+            'seed': seed,
+            'generations': stopping.generation + 1,
+            'stop_reason': stopping.reason,
+            'evaluations': evaluations,
+            'elapsed': stopping.elapsed,
+            'best_generation': stopping.best_gen,
+        })
+    
+    if own_evaluator:
+        evaluator.close()
+    if own_telemetry:
+        telemetry.close()
+    if own_checkpointer:
+        checkpointer.close()
     
     return best
 
-def save_to_midi(individual, filename):
-    """保存为MIDI文件到results文件夹"""
+def save_to_midi(individual, filename, directory=None):
+    """保存为MIDI文件到results文件夹（或指定的 directory）"""
     # 确保文件名保存到results文件夹
-    filepath = os.path.join(RESULTS_DIR, filename)
-    
-    mf = MIDIFile(1)
-    track = 0
-    mf.addTrackName(track, 0, "GA Melody")
-    mf.addTempo(track, 0, MIDI_TEMPO)
-    
-    decoded_notes = individual.to_notes()
-    
-    for pitch, start, duration in decoded_notes:
-        mf.addNote(track, 0, pitch, start, duration, MIDI_VELOCITY)
-    
-    with open(filepath, 'wb') as out_f:
-        mf.writeFile(out_f)
+    directory = RESULTS_DIR if directory is None else directory
+    if directory and not os.path.exists(directory):
+        # 首次保存时才创建（导入 main 不产生磁盘I/O）
+        os.makedirs(directory)
+        print(f"✓ 已创建 {directory}/ 文件夹")
+    filepath = os.path.join(directory, filename)
+    
+    # 输出与 midiutil.MIDIFile 逐字节相同（见 midi_writer.py）
+    write_midi(filepath, individual.to_notes(), tempo=MIDI_TEMPO, velocity=MIDI_VELOCITY)
     print(f"✓ 已保存: {filepath}")
 
 # === 7. 主程序 ===
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="音乐遗传算法 - 节奏与音高独立进化")
+    parser.add_argument('--resume', metavar='PATH',
+                        help='从检查点继续运行（调式、种子与权重取自检查点，如 results/run.ckpt）')
+    args = parser.parse_args()
+    
     print("\n" + "="*60)
     print("  音乐遗传算法 - 节奏与音高独立进化")
     print("="*60)
     
-    # 用户输入调式
-    print("\n可用调式:")
-    for i, scale_name in enumerate(SCALES.keys(), 1):
-        print(f"  {i}. {scale_name}")
-    
-    while True:
+    # 断点续跑: python main.py --resume results/run.ckpt
+    resume = args.resume
+    if resume is not None:
         try:
-            choice = input(f"\n请选择调式编号 (1-{len(SCALES)}，直接回车默认{DEFAULT_SCALE}): ").strip()
-            if not choice:
-                chosen_scale = DEFAULT_SCALE
-                break
-            choice_num = int(choice)
-            if 1 <= choice_num <= len(SCALES):
-                chosen_scale = list(SCALES.keys())[choice_num - 1]
-                break
-            else:
-                print("无效选择，请重新输入")
-        except ValueError:
-            print("请输入数字")
-    
-    scale_notes = SCALES[chosen_scale]
+            resume_notes = load_checkpoint(resume)['scale_notes']
+        except (OSError, ValueError) as e:
+            parser.error(f"无法读取检查点: {e}")
+        chosen_scale = next((name for name, notes in SCALES.items() if notes == resume_notes),
+                            'resumed')
+    
+    if resume is None:
+        # 用户输入调式
+        print("\n可用调式:")
+        for i, scale_name in enumerate(SCALES.keys(), 1):
+            print(f"  {i}. {scale_name}")
+    
+        while True:
+            try:
+                choice = input(f"\n请选择调式编号 (1-{len(SCALES)}，直接回车默认{DEFAULT_SCALE}): ").strip()
+                if not choice:
+                    chosen_scale = DEFAULT_SCALE
+                    break
+                choice_num = int(choice)
+                if 1 <= choice_num <= len(SCALES):
+                    chosen_scale = list(SCALES.keys())[choice_num - 1]
+                    break
+                else:
+                    print("无效选择，请重新输入")
+            except ValueError:
+                print("请输入数字")
+    
+    scale_notes = resume_notes if resume is not None else SCALES[chosen_scale]
     print(f"\n已选择: {chosen_scale}")
     print(f"音阶: {scale_notes}")
     print(f"音阶大小: {len(scale_notes)} 个音")
@@ -426,7 +823,8 @@ if __name__ == "__main__":
         rhythm_fitness_overall, 
         pitch_fitness_overall, 
         scale_notes,
-        func_name=func_name
+        func_name=func_name,
+        resume=resume
     )
     
     # 调试输出
@@ -0,0 +1,301 @@
+"""
+批量MIDI写出
+Fast Bulk MIDI Writer
+
+save_to_midi 原先为每段旋律构建一个 midiutil.MIDIFile：
+每个音符两个事件对象、写出前整体排序、再逐个序列化。
+批量生成数千段4小节旋律时，输出阶段的大部分时间花在这些对象上。
+
+这里是一个只覆盖本项目所需子集的标准MIDI文件（SMF）编码器：
+- 解码后的音符 [(pitch, start, duration), ...] 直接写入预分配的 bytearray
+  （按音符数算出上界一次分配，同一个 MidiEncoder 的缓冲区在多次编码间复用）
+- 速度、力度默认取 config.MIDI_TEMPO / MIDI_VELOCITY
+- 同音高的音符互不重叠时，单段旋律的输出与 MIDIUtil（MIDIFile(1)、960 ticks/四分音符）
+  逐字节相同（to_notes 的输出总是如此）：
+  格式1，第0轨为速度轨，第1轨为音轨名 + 音符；
+  开始与时值分别向零取整为 tick（note off = note on + 时值，同 MIDIUtil）；
+  同一时刻先写 note off 再写 note on，note off 的力度与 note on 相同
+  因此 pretty_midi / pygame / playmid.py 的读取结果不变
+- 与 MIDIUtil 的差别：同音高的音符相互重叠时，MIDIUtil 会把前一个音符的 note off
+  提前到后一个音符开始的位置（deInterleaveNotes），这里按原样写出各自的 note off
+
+两种写出方式：
+- 每段旋律一个文件：write_midi / write_midi_files
+- 多段旋律打包为一个文件：write_midi_packed
+    layout='tracks'   每段旋律一条音轨（同时开始，适合在音序器里逐轨对比）
+    layout='sections' 同一条音轨上首尾相接，每段从整小节开始，
+                      段间空 gap_bars 小节，并在段首写入 marker（段名）
+
+用法:
+    write_midi('results/out.mid', individual)
+    write_midi_files([('a.mid', ind_a), ('b.mid', ind_b)], directory='results')
+    write_midi_packed('results/all.mid', individuals, layout='sections')
+"""
+
+import os
+import struct
+
+from config import MIDI_TEMPO, MIDI_VELOCITY
+
+
+TICKS_PER_QUARTER = 960   # 与 MIDIUtil 的默认分辨率一致
+BEATS_PER_BAR = 4         # 4/4拍（sections 布局按整小节对齐）
+TRACK_NAME = "GA Melody"
+
+PACK_LAYOUTS = ('tracks', 'sections')
+
+# 每个事件的字节数上界：delta 时间（最多4字节变长整数）+ 3字节消息
+_MAX_EVENT_BYTES = 7
+
+
+def _as_notes(melody):
+    """Individual（有 to_notes）或音符列表 -> 音符列表"""
+    to_notes = getattr(melody, 'to_notes', None)
+    return to_notes() if to_notes is not None else melody
+
+
+def _to_ticks(beats):
+    """拍 -> tick（与 MIDIUtil 相同，向零取整）"""
+    return int(beats * TICKS_PER_QUARTER)
+
+
+def _note_events(notes, offset=0):
+    """
+    音符列表 -> 排好序的 (tick, 类型, 序号, pitch)，类型 0 = note off，1 = note on
+
+    排序键与 MIDIUtil 相同（时间、note off 先于 note on、插入顺序），
+    按开始时间排好且互不重叠的音符（to_notes 的输出）本身就有序，无需重排
+    """
+    events = []
+    last_start = last_end = -1
+    ordered = True
+    for seq, (pitch, start, duration) in enumerate(notes):
+        on = offset + _to_ticks(start)
+        off = on + _to_ticks(duration)
+        if on < last_end or on < last_start or off <= on:
+            ordered = False
+        events.append((on, 1, seq, pitch))
+        events.append((off, 0, seq, pitch))
+        last_start, last_end = on, off
+    if not ordered:
+        events.sort()
+    return events
+
+
+class MidiEncoder:
+    """
+    复用缓冲区的SMF编码器
+
+    Args:
+        tempo: 速度（BPM）
+        velocity: 力度（0-127）
+        track_name: 单段旋律的音轨名
+    """
+
+    def __init__(self, tempo=MIDI_TEMPO, velocity=MIDI_VELOCITY, track_name=TRACK_NAME):
+        self.tempo = tempo
+        self.velocity = velocity
+        self.track_name = track_name
+        self._buffer = bytearray(4096)
+        self._pos = 0
+
+    # ---------- 底层写入 ----------
+
+    def _reserve(self, size):
+        """确保缓冲区还有 size 字节（不足时整体扩容一次）"""
+        need = self._pos + size
+        if need > len(self._buffer):
+            self._buffer.extend(bytes(max(need, 2 * len(self._buffer)) - len(self._buffer)))
+
+    def _write(self, data):
+        pos = self._pos
+        end = pos + len(data)
+        self._buffer[pos:end] = data
+        self._pos = end
+
+    def _write_varlen(self, value):
+        """变长整数（每字节7位，高位在前，除最后一字节外最高位为1）"""
+        buffer = self._buffer
+        pos = self._pos
+        if value < 0x80:
+            buffer[pos] = value
+            self._pos = pos + 1
+            return
+        groups = []
+        while True:
+            groups.append(value & 0x7F)
+            value >>= 7
+            if not value:
+                break
+        for group in reversed(groups[1:]):
+            buffer[pos] = group | 0x80
+            pos += 1
+        buffer[pos] = groups[0]
+        self._pos = pos + 1
+
+    def _write_meta(self, delta, meta_type, data):
+        self._reserve(8 + len(data))
+        self._write_varlen(delta)
+        self._write(bytes((0xFF, meta_type)))
+        self._write_varlen(len(data))
+        self._write(data)
+
+    def _begin_track(self):
+        """写入音轨头，返回长度字段的位置"""
+        self._reserve(8)
+        self._write(b'MTrk\x00\x00\x00\x00')
+        return self._pos - 4
+
+    def _end_track(self, length_pos):
+        self._write_meta(0, 0x2F, b'')
+        struct.pack_into('>I', self._buffer, length_pos, self._pos - length_pos - 4)
+
+    # ---------- 文件结构 ----------
+
+    def _write_header(self, num_tracks):
+        self._pos = 0
+        self._reserve(14)
+        self._write(struct.pack('>4sIHHH', b'MThd', 6, 1, num_tracks, TICKS_PER_QUARTER))
+
+    def _write_tempo_track(self):
+        length_pos = self._begin_track()
+        self._write_meta(0, 0x51, struct.pack('>I', int(60000000 / self.tempo))[1:])
+        self._end_track(length_pos)
+
+    def _write_events(self, events, markers=()):
+        """写出排好序的音符事件（markers 为 [(tick, 文本), ...]，写在同一时刻的音符之前）"""
+        velocity = self.velocity
+        self._reserve(len(events) * _MAX_EVENT_BYTES
+                      + sum(8 + len(text.encode('utf-8')) for _, text in markers))
+        buffer = self._buffer
+        now = 0
+        marker_index = 0
+        for tick, kind, _, pitch in events:
+            while marker_index < len(markers) and markers[marker_index][0] <= tick:
+                marker_tick, text = markers[marker_index]
+                self._write_meta(marker_tick - now, 0x06, text.encode('utf-8'))
+                now = marker_tick
+                marker_index += 1
+            self._write_varlen(tick - now)
+            pos = self._pos
+            buffer[pos] = 0x90 if kind else 0x80
+            buffer[pos + 1] = pitch
+            buffer[pos + 2] = velocity
+            self._pos = pos + 3
+            now = tick
+        for marker_tick, text in markers[marker_index:]:
+            self._write_meta(marker_tick - now, 0x06, text.encode('utf-8'))
+            now = marker_tick
+
+    def _write_note_track(self, name, events, markers=()):
+        length_pos = self._begin_track()
+        self._write_meta(0, 0x03, name.encode('utf-8'))
+        self._write_events(events, markers=markers)
+        self._end_track(length_pos)
+
+    # ---------- 编码 ----------
+
+    def encode(self, notes):
+        """
+        编码单段旋律
+
+        Args:
+            notes: Individual 或音符列表 [(pitch, start, duration), ...]
+
+        Returns:
+            memoryview（指向内部缓冲区，下一次编码前有效；需要保留时用 bytes() 复制）
+        """
+        self._write_header(2)
+        self._write_tempo_track()
+        self._write_note_track(self.track_name, _note_events(_as_notes(notes)))
+        return memoryview(self._buffer)[:self._pos]
+
+    def encode_packed(self, melodies, layout='tracks', names=None, gap_bars=1):
+        """
+        将多段旋律编码为一个文件
+
+        Args:
+            melodies: Individual 或音符列表的序列
+            layout: 'tracks'（每段一条音轨）或 'sections'（同一音轨上首尾相接）
+            names: 每段的名称（音轨名 / marker；默认 "GA Melody 1"、"GA Melody 2"…）
+            gap_bars: sections 布局中段与段之间的空小节数
+
+        Returns:
+            memoryview（同 encode）
+        """
+        if layout not in PACK_LAYOUTS:
+            raise ValueError(f"未知布局: {layout}（可选: {', '.join(PACK_LAYOUTS)}）")
+        note_lists = [_as_notes(melody) for melody in melodies]
+        if names is None:
+            names = [f"{self.track_name} {i}" for i in range(1, len(note_lists) + 1)]
+        elif len(names) != len(note_lists):
+            raise ValueError("names 的数量必须与旋律数量相同")
+
+        if layout == 'tracks':
+            self._write_header(len(note_lists) + 1)
+            self._write_tempo_track()
+            for name, notes in zip(names, note_lists):
+                self._write_note_track(name, _note_events(notes))
+        else:
+            bar_ticks = BEATS_PER_BAR * TICKS_PER_QUARTER
+            events = []
+            markers = []
+            offset = 0
+            for name, notes in zip(names, note_lists):
+                section = _note_events(notes, offset)
+                markers.append((offset, name))
+                events += section
+                end = max((tick for tick, *_ in section), default=offset)
+                bars = max(1, -(-(end - offset) // bar_ticks))
+                offset += (bars + gap_bars) * bar_ticks
+            self._write_header(2)
+            self._write_tempo_track()
+            self._write_note_track(self.track_name, events, markers)
+        return memoryview(self._buffer)[:self._pos]
+
+
+def _write_file(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def encode_midi(notes, tempo=MIDI_TEMPO, velocity=MIDI_VELOCITY):
+    """单段旋律 -> MIDI文件内容（bytes）"""
+    return bytes(MidiEncoder(tempo, velocity).encode(notes))
+
+
+def write_midi(path, notes, tempo=MIDI_TEMPO, velocity=MIDI_VELOCITY, encoder=None):
+    """写出单段旋律（notes 为 Individual 或音符列表）"""
+    encoder = encoder or MidiEncoder(tempo, velocity)
+    _write_file(path, encoder.encode(notes))
+
+
+def write_midi_files(items, directory=None, tempo=MIDI_TEMPO, velocity=MIDI_VELOCITY):
+    """
+    每段旋律写一个文件（所有文件共用一个编码缓冲区）
+
+    Args:
+        items: [(文件名, Individual 或音符列表), ...]
+        directory: 输出目录（None 表示文件名即路径）
+
+    Returns:
+        写出的路径列表
+    """
+    encoder = MidiEncoder(tempo, velocity)
+    paths = []
+    for filename, notes in items:
+        path = os.path.join(directory, filename) if directory else filename
+        _write_file(path, encoder.encode(notes))
+        paths.append(path)
+    return paths
+
+
+def write_midi_packed(path, melodies, layout='tracks', names=None, gap_bars=1,
+                      tempo=MIDI_TEMPO, velocity=MIDI_VELOCITY):
+    """多段旋律写入一个文件（参数见 MidiEncoder.encode_packed）"""
+    encoder = MidiEncoder(tempo, velocity)
+    _write_file(path, encoder.encode_packed(melodies, layout=layout, names=names,
+                                            gap_bars=gap_bars))
@@ -0,0 +1,235 @@
+"""
+Music_Math 的 NumPy 种群引擎
+NumPy Population Engine for the Single-chromosome Encoding
+
+Music_Math.run_genetic_algorithm 的替代实现：
+整个种群保存为一个 (POP_SIZE, GENOME_LENGTH) 的 int8 矩阵
+（0=休止，1..NUM_PITCHES=PITCH_MAP 中的音高，CODE_HOLD=延长），
+加权初始化、轮盘赌选择、单点交叉、加权变异以及移调/倒影/逆行变换全部以批量数组运算完成。
+
+- 解码：转换为节奏 / 音高两个矩阵后交给 decode_batch.decode_population，
+  结果与 Music_Math.Individual.to_notes 完全相同
+- 适应度：fitness_function 中的函数（含 create_weighted_fitness 生成的组合）
+  走 fitness_function_batch 的批量路径；其余函数逐行调用，出错按0分处理（同原版）
+
+遗传算子的概率分布与 Music_Math.py 中的逐个体版本一致；
+返回值是 Music_Math.Individual，因此 debug_genome / save_to_midi 可以直接使用。
+
+用法:
+    python Music_Math.py                   # 默认使用本引擎运行全部 funcs
+    best = run_genetic_algorithm_numpy(fitness_func, func_name="fit", seed=42)
+"""
+
+import numpy as np
+
+from config import RHYTHM_NOTE, RHYTHM_HOLD, RHYTHM_REST
+from Music_Math import (
+    Individual, MelodyAdapter, PITCH_MAP, NUM_PITCHES, CODE_REST, CODE_HOLD, GENOME_LENGTH,
+)
+from seeding import resolve_seed, make_np_rng
+from decode_batch import decode_population, scale_lookup
+from fitness_function_batch import batch_version
+
+
+# 移调幅度（与 musical_transform 一致）
+TRANSPOSE_SHIFTS = np.array([-2, -1, 1, 2], dtype=np.int16)
+
+# 倒影时找不到音高基因的默认中心轴（与 musical_transform 一致）
+DEFAULT_PIVOT = 10
+
+# 基因 -> 节奏符号 / 音高索引（decode_genes 按基因值查表）
+GENE_RHYTHM = np.array([RHYTHM_REST] + [RHYTHM_NOTE] * NUM_PITCHES + [RHYTHM_HOLD], dtype=np.int8)
+GENE_PITCH_INDEX = np.array([0] + list(range(NUM_PITCHES)) + [0], dtype=np.int8)
+
+ELITISM_COUNT = 5
+CROSSOVER_RATE = 0.7
+MUTATION_RATE = 0.05
+TRANSFORM_RATE = 0.1
+
+
+def decode_genes(genes):
+    """
+    批量解码 (N, GENOME_LENGTH) 基因矩阵 -> decode_batch.NoteTable
+
+    音高基因对应发声、CODE_HOLD 对应延长、CODE_REST 对应休止，
+    因此可以直接复用双基因编码的解码器（休止之后的延长同样保持静音）
+    """
+    genes = np.asarray(genes)
+    return decode_population(GENE_RHYTHM[genes], GENE_PITCH_INDEX[genes], scale_lookup(PITCH_MAP))
+
+
+class MusicMathPopulation:
+    """
+    以矩阵形式保存的单染色体种群
+
+    属性:
+        genes: (pop_size, GENOME_LENGTH) int8 基因矩阵
+        fitness: (pop_size,) 适应度向量
+    """
+
+    def __init__(self, pop_size=200, rng=None):
+        self.pop_size = pop_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.genes = self._weighted_genes((pop_size, GENOME_LENGTH))
+        # 第一个基因不能是延长记号：改为休止或随机音（同 Individual.__init__）
+        first_hold = self.genes[:, 0] == CODE_HOLD
+        self.genes[first_hold, 0] = self.rng.integers(0, NUM_PITCHES + 1, size=first_hold.sum())
+        self.fitness = np.zeros(pop_size)
+
+    def _weighted_genes(self, shape):
+        """加权生成基因（同 generate_weighted_gene）：50%延长，10%休止，40%随机音高"""
+        rand = self.rng.random(shape)
+        pitches = self.rng.integers(1, NUM_PITCHES + 1, size=shape)
+        genes = np.where(rand < 0.5, CODE_HOLD, np.where(rand < 0.6, CODE_REST, pitches))
+        return genes.astype(np.int8)
+
+    # ------------------------------------------------------------
+    # 适应度
+    # ------------------------------------------------------------
+
+    def evaluate(self, fitness_func):
+        """计算整个种群的适应度（有批量版本时一次完成，否则逐行调用）"""
+        table = decode_genes(self.genes)
+        batch = batch_version(fitness_func)
+        if batch is not None:
+            self.fitness = np.asarray(batch(table), dtype=float)
+            return
+        fitness = np.zeros(self.pop_size)
+        for i in range(self.pop_size):
+            try:
+                fitness[i] = fitness_func(MelodyAdapter(table.notes(i)))
+            except Exception:
+                fitness[i] = 0  # 防止报错中断（同原版）
+        self.fitness = fitness
+
+    def sort(self):
+        """按适应度降序排列（稳定排序，与 list.sort(reverse=True) 一致）"""
+        order = np.argsort(-self.fitness, kind='stable')
+        self.genes = self.genes[order]
+        self.fitness = self.fitness[order]
+
+    def to_individual(self, i):
+        """将第 i 行转换为 Music_Math.Individual（携带当前适应度）"""
+        ind = Individual(self.genes[i].tolist())
+        ind.fitness = float(self.fitness[i])
+        return ind
+
+    # ------------------------------------------------------------
+    # 遗传操作算子（批量）
+    # ------------------------------------------------------------
+
+    def select_roulette(self, n):
+        """轮盘赌选择（同 selection_roulette）：一次抽取 n 个父代索引"""
+        min_fit = self.fitness.min()
+        offset = abs(min_fit) if min_fit < 0 else 0
+        weights = self.fitness + offset
+        total = weights.sum()
+        if total == 0:
+            return self.rng.integers(0, self.pop_size, size=n)
+
+        cumulative = np.cumsum(weights)
+        picks = self.rng.uniform(0, total, size=n)
+        idx = np.searchsorted(cumulative, picks, side='right')
+        return np.minimum(idx, self.pop_size - 1)
+
+    def crossover(self, genes1, genes2, rate=CROSSOVER_RATE):
+        """单点交叉：每对以概率 rate 交叉，交叉点在 [1, L-1] 内均匀分布"""
+        n, length = genes1.shape
+        do_cross = self.rng.random(n) < rate
+        points = self.rng.integers(1, length, size=n)
+        head = np.arange(length)[None, :] < points[:, None]
+        head |= ~do_cross[:, None]
+        return np.where(head, genes1, genes2), np.where(head, genes2, genes1)
+
+    def mutate(self, genes, rate=MUTATION_RATE):
+        """加权变异（同 mutate）：每个位置以概率 rate 替换为加权生成的基因"""
+        mask = self.rng.random(genes.shape) < rate
+        genes = genes.copy()
+        genes[mask] = self._weighted_genes(int(mask.sum()))
+        return genes
+
+    def transform(self, genes, rate=TRANSFORM_RATE):
+        """
+        特殊变换（同 musical_transform）：被选中的行随机执行移调、倒影或逆行
+        移调 / 倒影只改变音高基因，结果超出 1..NUM_PITCHES 的位置保持不变
+        """
+        n = genes.shape[0]
+        selected = self.rng.random(n) < rate
+        ops = self.rng.integers(0, 3, size=n)
+        shifts = TRANSPOSE_SHIFTS[self.rng.integers(0, len(TRANSPOSE_SHIFTS), size=n)]
+
+        genes = genes.copy()
+        wide = genes.astype(np.int16)
+        is_pitch = (wide >= 1) & (wide <= NUM_PITCHES)
+
+        rows = selected & (ops == 0)  # 移调
+        if rows.any():
+            moved = wide[rows] + shifts[rows, None]
+            keep = is_pitch[rows] & (moved >= 1) & (moved <= NUM_PITCHES)
+            genes[rows] = np.where(keep, moved, wide[rows])
+
+        rows = selected & (ops == 1)  # 倒影：以第一个音高基因为中心轴
+        if rows.any():
+            sub, sub_pitch = wide[rows], is_pitch[rows]
+            first = sub_pitch.argmax(axis=1)
+            pivot = np.where(sub_pitch.any(axis=1), sub[np.arange(len(sub)), first], DEFAULT_PIVOT)
+            flipped = 2 * pivot[:, None] - sub
+            keep = sub_pitch & (flipped >= 1) & (flipped <= NUM_PITCHES)
+            genes[rows] = np.where(keep, flipped, sub)
+
+        rows = selected & (ops == 2)  # 逆行
+        if rows.any():
+            genes[rows] = genes[rows, ::-1]
+        return genes
+
+    def breed(self, elitism_count=ELITISM_COUNT):
+        """由已排序、已评估的种群生成下一代：精英保留 + 轮盘赌 + 交叉 + 变异 + 特殊变换"""
+        num_children = self.pop_size - elitism_count
+        num_pairs = (num_children + 1) // 2
+
+        parents = self.select_roulette(2 * num_pairs)
+        c1, c2 = self.crossover(self.genes[parents[0::2]], self.genes[parents[1::2]])
+
+        # 子代按 c1, c2, c1, c2 ... 交错排列
+        children = np.empty((2 * num_pairs, GENOME_LENGTH), dtype=np.int8)
+        children[0::2], children[1::2] = c1, c2
+        children = self.transform(self.mutate(children))
+
+        self.genes = np.concatenate([self.genes[:elitism_count], children[:num_children]])
+        self.fitness = np.zeros(self.pop_size)
+
+
+# === 主遗传算法（NumPy版） ===
+
+def run_genetic_algorithm_numpy(target_fitness_func, func_name="Unknown", pop_size=200,
+                                max_gen=2000, seed=None, rng=None):
+    """
+    与 Music_Math.run_genetic_algorithm 接口一致的矩阵化遗传算法
+
+    额外参数:
+        rng: numpy.random.Generator（默认由 seed 派生）
+
+    Returns:
+        Individual: 最后一代中适应度最高的个体（fitness 为其得分）
+    """
+    if rng is None:
+        seed = resolve_seed(seed)
+        rng = make_np_rng(seed, 'music_math', 'numpy')
+
+    population = MusicMathPopulation(pop_size, rng=rng)
+
+    print(f"--- 开始运行: {func_name} [numpy] (随机种子: {seed}) ---")
+
+    for gen in range(max_gen):
+        # 1. 计算适应度并排序
+        population.evaluate(target_fitness_func)
+        population.sort()
+        best_score = population.fitness[0]
+
+        # 2. 生成下一代（最后一代保留已评估的种群）
+        if gen < max_gen - 1:
+            population.breed()
+
+        if gen % 200 == 0:
+            print(f"  Gen {gen}: Best Score = {best_score:.2f}")
+    return population.to_individual(0)
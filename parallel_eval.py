@@ -0,0 +1,144 @@
+"""
+多进程适应度评估
+Process-pool Parallel Fitness Evaluation
+
+把待评估的基因组分块发送给常驻的 ProcessPoolExecutor：
+- 工作进程启动时导入一次 fitness_function_rhythm / fitness_function_pitch
+- 任务只携带紧凑的基因字节串，返回值只有两个得分数组
+- 每个任务都附带父进程当前的 RHYTHM_WEIGHTS / PITCH_WEIGHTS 快照，
+  工作进程在评估前原地写入自己的权重字典，
+  因此父进程在运行期修改权重（如 ablation_study.set_weights）也能生效
+
+用法:
+    with ParallelEvaluator(max_workers=8) as evaluator:
+        scores = evaluator.evaluate(genomes, scale_notes,
+                                    rhythm_fitness_overall, pitch_fitness_overall)
+
+适应度函数必须是模块级函数（可被 pickle 按名称引用）。
+"""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from config import (
+    RHYTHM_WEIGHTS, PITCH_WEIGHTS, PARALLEL_WORKERS, PARALLEL_CHUNK_SIZE, FUSED_EVALUATION
+)
+
+
+# ============================================================
+# 工作进程
+# ============================================================
+
+_worker_rhythm_weights = None
+_worker_pitch_weights = None
+
+
+def _init_worker():
+    """工作进程初始化：导入一次适应度函数库并记住其权重字典"""
+    global _worker_rhythm_weights, _worker_pitch_weights
+    import fitness_function_rhythm
+    import fitness_function_pitch
+    _worker_rhythm_weights = fitness_function_rhythm.RHYTHM_WEIGHTS
+    _worker_pitch_weights = fitness_function_pitch.PITCH_WEIGHTS
+
+
+def _apply_weights(rhythm_weights, pitch_weights):
+    """原地同步权重（保持各模块对同一字典的引用）"""
+    _worker_rhythm_weights.clear()
+    _worker_rhythm_weights.update(rhythm_weights)
+    _worker_pitch_weights.clear()
+    _worker_pitch_weights.update(pitch_weights)
+
+
+def _evaluate_chunk(task):
+    """
+    评估一块基因组
+
+    Args:
+        task: (genomes, scale_notes, rhythm_func, pitch_func, rhythm_weights, pitch_weights)
+              genomes 为 [(rhythm_bytes, pitch_bytes), ...]
+
+    Returns:
+        (array('d') 节奏得分, array('d') 音高得分)
+    """
+    from main import decode_genes, MelodyAdapter
+    import fused_fitness
+
+    genomes, scale_notes, rhythm_func, pitch_func, rhythm_weights, pitch_weights = task
+    _apply_weights(rhythm_weights, pitch_weights)
+    fused = None
+    if FUSED_EVALUATION and fused_fitness.supports(rhythm_func, pitch_func):
+        fused = fused_fitness.get_evaluator()
+
+    rhythm_scores = array('d')
+    pitch_scores = array('d')
+    for rhythm_bytes, pitch_bytes in genomes:
+        rhythm_genes = list(rhythm_bytes)
+        pitch_genes = list(pitch_bytes)
+        note_list = decode_genes(rhythm_genes, pitch_genes, scale_notes)
+        try:
+            if fused is not None:
+                rhythm_fitness, pitch_fitness, _ = fused(rhythm_genes, note_list)
+            else:
+                adapter = MelodyAdapter(note_list, rhythm_genes, pitch_genes)
+                rhythm_fitness = rhythm_func(adapter)
+                pitch_fitness = pitch_func(adapter)
+        except Exception as e:
+            print(f"适应度计算错误: {e}")
+            rhythm_fitness = 0
+            pitch_fitness = 0
+        rhythm_scores.append(rhythm_fitness)
+        pitch_scores.append(pitch_fitness)
+    return rhythm_scores, pitch_scores
+
+
+# ============================================================
+# 父进程接口
+# ============================================================
+
+class ParallelEvaluator:
+    """常驻进程池评估器（可在多次 run_genetic_algorithm 之间复用）"""
+
+    def __init__(self, max_workers=None, chunk_size=None):
+        self.max_workers = max_workers or PARALLEL_WORKERS or os.cpu_count()
+        self.chunk_size = chunk_size or PARALLEL_CHUNK_SIZE
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                         initializer=_init_worker)
+
+    def evaluate(self, genomes, scale_notes, rhythm_fitness_func, pitch_fitness_func):
+        """
+        并行评估
+
+        Args:
+            genomes: [(rhythm_genes, pitch_genes), ...]
+            scale_notes: 调式音阶列表
+
+        Returns:
+            [(rhythm_fitness, pitch_fitness), ...]，顺序与 genomes 一致
+        """
+        packed = [(bytes(r), bytes(p)) for r, p in genomes]
+        rhythm_weights = dict(RHYTHM_WEIGHTS)
+        pitch_weights = dict(PITCH_WEIGHTS)
+        scale_notes = list(scale_notes)
+
+        tasks = [
+            (packed[i:i + self.chunk_size], scale_notes,
+             rhythm_fitness_func, pitch_fitness_func, rhythm_weights, pitch_weights)
+            for i in range(0, len(packed), self.chunk_size)
+        ]
+
+        results = []
+        for rhythm_scores, pitch_scores in self._pool.map(_evaluate_chunk, tasks):
+            results.extend(zip(rhythm_scores, pitch_scores))
+        return results
+
+    def close(self):
+        """关闭进程池"""
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
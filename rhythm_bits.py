@@ -0,0 +1,260 @@
+"""
+位压缩节奏基因
+Bit-packed Rhythm Genomes
+
+节奏基因只有三种符号（RHYTHM_REST=0、RHYTHM_NOTE=1、RHYTHM_HOLD=2），
+因此可以用两个位掩码表示：onset（起拍位置）与 hold（延长位置），
+rest 掩码 = 全1 & ~(onset | hold)。第 i 个位置对应第 i 位。
+长度为32时两个掩码可以合成一个64位整数（to_word / from_word）。
+
+节奏适应度分量直接用位运算与 popcount 计算，得分与 fitness_function_rhythm 完全一致：
+- parity：前半段与后半段的 onset 掩码按位与/异或
+- density：onset 的 popcount
+- rest：rest 的 popcount 与最长连续1（反复 m &= m >> 1）
+- syncopation：逐个取出最低的 onset 位得到起拍间隔
+- pattern：两个符号掩码错位相与，得到每种相邻符号对的出现位置
+变异、单点交叉也是掩码运算，且与 main.mutate_rhythm / crossover_genes
+消耗相同的随机数，同一随机状态下结果一致。
+
+适合超大种群或只搜索节奏的场景：每个个体只占两个整数。
+
+用法:
+    packed = PackedRhythm.from_genes(individual.rhythm_genes)
+    score = rhythm_fitness_overall_bits(packed)
+    child = mutate_packed(packed, rate=0.05, rng=rng)
+    genes = child.to_genes()
+"""
+
+import random
+
+from config import RHYTHM_LENGTH, RHYTHM_NOTE, RHYTHM_HOLD, RHYTHM_REST
+from fitness_function_rhythm import (
+    RHYTHM_WEIGHTS,
+    parity_pair_score,
+    density_score,
+    rest_score,
+)
+
+
+def popcount(mask):
+    """置位数量"""
+    return mask.bit_count()
+
+
+def longest_run(mask):
+    """最长连续置位长度：每次 m &= m >> 1 会把每段连续1缩短一位"""
+    length = 0
+    while mask:
+        mask &= mask >> 1
+        length += 1
+    return length
+
+
+def set_bits(mask):
+    """按从低到高的顺序返回所有置位的位置"""
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+# ============================================================
+# 压缩表示
+# ============================================================
+
+class PackedRhythm:
+    """onset / hold 两个位掩码表示的节奏基因"""
+
+    __slots__ = ('onset', 'hold', 'length')
+
+    def __init__(self, onset=0, hold=0, length=RHYTHM_LENGTH):
+        self.onset = onset
+        self.hold = hold
+        self.length = length
+
+    @classmethod
+    def from_genes(cls, genes):
+        """由节奏基因列表（或 bytearray）构建"""
+        onset = 0
+        hold = 0
+        for i, r in enumerate(genes):
+            if r == RHYTHM_NOTE:
+                onset |= 1 << i
+            elif r == RHYTHM_HOLD:
+                hold |= 1 << i
+        return cls(onset, hold, len(genes))
+
+    def to_genes(self):
+        """还原为节奏基因 bytearray（与 from_genes 互逆）"""
+        genes = bytearray([RHYTHM_REST]) * self.length
+        for i in set_bits(self.onset):
+            genes[i] = RHYTHM_NOTE
+        for i in set_bits(self.hold):
+            genes[i] = RHYTHM_HOLD
+        return genes
+
+    @classmethod
+    def from_word(cls, word, length=RHYTHM_LENGTH):
+        """由单个整数构建：低 length 位为 onset，其上 length 位为 hold"""
+        full = (1 << length) - 1
+        return cls(word & full, (word >> length) & full, length)
+
+    def to_word(self):
+        """合成单个整数（长度为32时即一个64位字）"""
+        return self.onset | (self.hold << self.length)
+
+    @property
+    def full(self):
+        """全部位置的掩码"""
+        return (1 << self.length) - 1
+
+    @property
+    def rest(self):
+        """休止位置的掩码"""
+        return self.full & ~(self.onset | self.hold)
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedRhythm):
+            return NotImplemented
+        return (self.onset, self.hold, self.length) == (other.onset, other.hold, other.length)
+
+    def __hash__(self):
+        return hash((self.onset, self.hold, self.length))
+
+    def __repr__(self):
+        return f"PackedRhythm({list(self.to_genes())})"
+
+
+# ============================================================
+# 位运算适应度（规则同 fitness_function_rhythm）
+# ============================================================
+
+def rhythm_bits_parity(packed):
+    """节奏奇性：第 i 位与第 i + n//2 位的 onset 对比"""
+    half = packed.length // 2
+    half_mask = (1 << half) - 1
+    first = packed.onset & half_mask
+    second = (packed.onset >> half) & half_mask
+    both = popcount(first & second)
+    only_first = popcount(first & ~second)
+    only_second = popcount(second & ~first)
+    return (both * parity_pair_score(True, True)
+            + only_first * parity_pair_score(True, False)
+            + only_second * parity_pair_score(False, True))
+
+
+def rhythm_bits_density(packed):
+    """节奏密度：onset 的 popcount"""
+    if not packed.length:
+        return 0
+    return density_score(popcount(packed.onset), packed.length)
+
+
+def onset_gaps(packed):
+    """相邻起拍之间的间隔列表"""
+    positions = set_bits(packed.onset)
+    return [b - a for a, b in zip(positions, positions[1:])]
+
+
+def rhythm_bits_syncopation(packed):
+    """切分音：起拍间隔的种类数 / min(间隔数, 8) × 20"""
+    gaps = onset_gaps(packed)
+    if not gaps:
+        return 0
+    return len(set(gaps)) / min(len(gaps), 8) * 20
+
+
+def rhythm_bits_rest(packed):
+    """休止符分布：rest 的 popcount 与最长连续休止"""
+    if not packed.length:
+        return 0
+    rest = packed.rest
+    return rest_score(popcount(rest), longest_run(rest))
+
+
+def rhythm_bits_pattern(packed):
+    """
+    节奏模式：存在重复的2-4拍模式时 +10
+
+    长度3、4的模式重复必然包含长度2的模式重复，因此只需检查相邻符号对：
+    masks[a] & (masks[b] >> 1) 的第 i 位表示位置 i、i+1 为 (a, b)，置位数≥2即重复
+    """
+    if packed.length < 4:
+        return 0
+    masks = (packed.rest, packed.onset, packed.hold)
+    for a in masks:
+        for b in masks:
+            if popcount(a & (b >> 1)) >= 2:
+                return 10
+    return 0
+
+
+def rhythm_fitness_overall_bits(packed):
+    """综合节奏适应度（与 rhythm_fitness_overall 相同：权重=0的分量不计算，其余按顺序相加）"""
+    total_score = 0
+    for key, func in RHYTHM_BITS_FUNCS.items():
+        if RHYTHM_WEIGHTS.get(key, 0) != 0:
+            total_score += func(packed)
+    return total_score
+
+
+# 顺序与 rhythm_fitness_overall 的累加顺序一致
+RHYTHM_BITS_FUNCS = {
+    'parity': rhythm_bits_parity,
+    'density': rhythm_bits_density,
+    'syncopation': rhythm_bits_syncopation,
+    'rest': rhythm_bits_rest,
+    'pattern': rhythm_bits_pattern,
+}
+
+
+# ============================================================
+# 掩码遗传算子
+# ============================================================
+
+def _symbol_masks(symbol, bit):
+    """单个位置写入某符号时的 (onset, hold) 位"""
+    if symbol == RHYTHM_NOTE:
+        return bit, 0
+    if symbol == RHYTHM_HOLD:
+        return 0, bit
+    return 0, 0
+
+
+def mutate_packed(packed, rate=0.05, rng=random):
+    """
+    节奏变异（同 main.mutate_rhythm）
+
+    先生成变异位置掩码与新符号的 onset/hold 位，再一次性写入：
+        onset = (onset & ~mask) | new_onset
+    最后确保第一个位置是起拍
+    """
+    mask = 0
+    new_onset = 0
+    new_hold = 0
+    for i in range(packed.length):
+        if rng.random() < rate:
+            bit = 1 << i
+            onset_bit, hold_bit = _symbol_masks(
+                rng.choice([RHYTHM_NOTE, RHYTHM_HOLD, RHYTHM_REST]), bit)
+            mask |= bit
+            new_onset |= onset_bit
+            new_hold |= hold_bit
+    onset = (packed.onset & ~mask) | new_onset | 1
+    hold = (packed.hold & ~mask) | new_hold
+    return PackedRhythm(onset, hold & ~1, packed.length)
+
+
+def crossover_packed(packed1, packed2, rng=random):
+    """单点交叉（同 main.crossover_genes）：低 point 位来自一方，其余来自另一方"""
+    length = packed1.length
+    point = rng.randint(1, length - 1)
+    low = (1 << point) - 1
+    high = ((1 << length) - 1) & ~low
+    child1 = PackedRhythm((packed1.onset & low) | (packed2.onset & high),
+                          (packed1.hold & low) | (packed2.hold & high), length)
+    child2 = PackedRhythm((packed2.onset & low) | (packed1.onset & high),
+                          (packed2.hold & low) | (packed1.hold & high), length)
+    return child1, child2
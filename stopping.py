@@ -0,0 +1,122 @@
+"""
+停止条件
+Stopping Rules for the GA Loop
+
+run_genetic_algorithm 默认总是跑满 MAX_GEN 代。
+StoppingRule 在每代评估、排序之后检查以下条件，满足任一条件即停止，
+返回当前最优个体：
+- stagnation：最优总分连续 STAGNATION_WINDOW 代没有提升超过 STAGNATION_TOLERANCE
+- target：最优总分达到 TARGET_SCORE
+- time_limit：墙钟时间超过 TIME_LIMIT 秒（每代检查一次）
+- max_evaluations：实际计算的适应度次数超过 MAX_EVALUATIONS（缓存命中不计）
+都未触发时，跑满代数的停止原因为 max_gen。
+"""
+
+import time
+
+from config import (
+    STAGNATION_WINDOW, STAGNATION_TOLERANCE, TARGET_SCORE, TIME_LIMIT, MAX_EVALUATIONS
+)
+
+
+# 停止原因的中文说明（用于输出）
+STOP_REASONS = {
+    'max_gen': '达到最大代数',
+    'stagnation': '最优总分停滞',
+    'target': '达到目标分数',
+    'time_limit': '达到时间上限',
+    'max_evaluations': '达到评估次数上限',
+}
+
+
+class StoppingRule:
+    """
+    提前停止判定（参数为 None 表示不启用该条件）
+
+    用法:
+        rule = StoppingRule.from_config()
+        rule.start()
+        for gen in range(max_gen):
+            ...评估、排序...
+            if rule.should_stop(gen, best.total_fitness, evaluations):
+                break
+        print(rule.reason)
+    """
+
+    def __init__(self, stagnation_window=None, stagnation_tolerance=1e-6,
+                 target_score=None, time_limit=None, max_evaluations=None):
+        self.stagnation_window = stagnation_window
+        self.stagnation_tolerance = stagnation_tolerance
+        self.target_score = target_score
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.start()
+
+    @classmethod
+    def from_config(cls):
+        """按 config 中的 STAGNATION_* / TARGET_SCORE / TIME_LIMIT / MAX_EVALUATIONS 构建"""
+        return cls(stagnation_window=STAGNATION_WINDOW,
+                   stagnation_tolerance=STAGNATION_TOLERANCE,
+                   target_score=TARGET_SCORE,
+                   time_limit=TIME_LIMIT,
+                   max_evaluations=MAX_EVALUATIONS)
+
+    def start(self):
+        """重置状态并开始计时"""
+        self.start_time = time.perf_counter()
+        self.best_score = float('-inf')
+        self.best_gen = 0
+        self.generation = 0
+        self.reason = 'max_gen'
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def snapshot(self):
+        """可序列化的状态（供检查点保存）"""
+        return {'best_score': self.best_score, 'best_gen': self.best_gen,
+                'generation': self.generation, 'elapsed': self.elapsed}
+
+    def restore(self, snapshot):
+        """从 snapshot() 恢复；计时从已用时间继续"""
+        self.best_score = snapshot['best_score']
+        self.best_gen = snapshot['best_gen']
+        self.generation = snapshot['generation']
+        self.start_time = time.perf_counter() - snapshot['elapsed']
+
+    def should_stop(self, gen, best_score, evaluations=0):
+        """
+        一代评估完成后调用
+
+        Args:
+            gen: 当前代号（从0开始）
+            best_score: 本代最优总分
+            evaluations: 截至本代实际计算的适应度次数
+
+        Returns:
+            bool：是否停止（原因记录在 self.reason）
+        """
+        self.generation = gen
+        if best_score > self.best_score + self.stagnation_tolerance:
+            self.best_score = best_score
+            self.best_gen = gen
+
+        if self.target_score is not None and best_score >= self.target_score:
+            self.reason = 'target'
+            return True
+        if (self.stagnation_window is not None
+                and gen - self.best_gen >= self.stagnation_window):
+            self.reason = 'stagnation'
+            return True
+        if self.time_limit is not None and self.elapsed >= self.time_limit:
+            self.reason = 'time_limit'
+            return True
+        if self.max_evaluations is not None and evaluations >= self.max_evaluations:
+            self.reason = 'max_evaluations'
+            return True
+        return False
+
+    def describe(self):
+        """停止原因的中文说明"""
+        return STOP_REASONS.get(self.reason, self.reason)
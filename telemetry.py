@@ -0,0 +1,151 @@
+"""
+逐代遥测
+Per-generation Telemetry Stream
+
+run_genetic_algorithm 只在每 PRINT_INTERVAL 代打印最优个体的得分。
+TelemetryRecorder 为每一代（或每 interval 代抽样一次）生成一条记录，
+写入 JSONL 文件（每行一个 JSON 对象）或交给回调函数：
+
+    {"run": "overall", "engine": "python", "seed": 42, "gen": 10, "elapsed": 1.23,
+     "rhythm": {"best": .., "mean": .., "median": .., "std": ..},
+     "pitch": {...}, "total": {...},
+     "unique_phenotypes": 187, "evaluations": 64, "evaluations_total": 1530,
+     "cache_hits": 12, "eval_time": 0.021, "breed_time": 0.004}
+
+- evaluations / cache_hits 为本代的数量（numpy 引擎没有缓存，cache_hits 为 null）
+- eval_time / breed_time 为本代评估、繁殖所用的秒数
+- 最后一代（跑满或提前停止）总会被记录
+
+未被抽样的代不做任何统计，开销只有一次取模判断。
+
+用法:
+    with TelemetryRecorder('results/run.jsonl', interval=10) as telemetry:
+        run_genetic_algorithm(..., telemetry=telemetry)
+
+    run_genetic_algorithm(..., telemetry=TelemetryRecorder(callback=records.append))
+"""
+
+import os
+import json
+import math
+import time
+
+from config import TELEMETRY_PATH, TELEMETRY_INTERVAL
+
+
+def summarize(values):
+    """一组得分的 best / mean / median / std（总体标准差）"""
+    values = sorted(float(v) for v in values)
+    n = len(values)
+    if n == 0:
+        return {'best': None, 'mean': None, 'median': None, 'std': None}
+    mean = math.fsum(values) / n
+    mid = n // 2
+    median = values[mid] if n % 2 else (values[mid - 1] + values[mid]) / 2
+    std = math.sqrt(math.fsum((v - mean) ** 2 for v in values) / n)
+    return {'best': values[-1], 'mean': mean, 'median': median, 'std': std}
+
+
+class TelemetryRecorder:
+    """
+    逐代记录器
+
+    Args:
+        path: JSONL 输出文件（追加写入，每条记录后刷新，可用 tail -f 观察）
+        callback: 可选的回调函数 callback(record)
+        interval: 抽样间隔（每 interval 代记录一次，最后一代总会记录）
+        run_name: 写入每条记录的 run 字段（默认使用 func_name）
+    """
+
+    def __init__(self, path=None, callback=None, interval=1, run_name=None):
+        if path is None and callback is None:
+            raise ValueError("TelemetryRecorder 需要 path 或 callback")
+        self.path = path
+        self.callback = callback
+        self.interval = max(1, int(interval))
+        self.run_name = run_name
+        self.context = {}
+        self.records = 0
+        self._file = None
+        self._start = time.perf_counter()
+
+    @classmethod
+    def from_config(cls, run_name=None):
+        """按 config.TELEMETRY_PATH / TELEMETRY_INTERVAL 构建；未设置路径时返回 None"""
+        if not TELEMETRY_PATH:
+            return None
+        return cls(TELEMETRY_PATH, interval=TELEMETRY_INTERVAL, run_name=run_name)
+
+    def begin(self, **context):
+        """
+        开始一次运行：重置计时，context（如 run / engine / seed）写入之后的每条记录
+        同一个记录器可以依次用于多次运行（如批量生成）
+        """
+        self.context = dict(context)
+        if self.run_name is not None:
+            self.context['run'] = self.run_name
+        self._start = time.perf_counter()
+
+    def should_record(self, gen, last=False):
+        """本代是否需要记录（未抽样的代不必计算任何统计量）"""
+        return last or gen % self.interval == 0
+
+    def record(self, gen, rhythm_fitness, pitch_fitness, total_fitness,
+               evaluations=None, evaluations_total=None, unique_phenotypes=None,
+               cache_hits=None, eval_time=None, breed_time=None, **extra):
+        """
+        生成并输出一条记录
+
+        Args:
+            rhythm_fitness / pitch_fitness / total_fitness: 本代所有个体的得分序列
+            其余参数见模块说明；extra 原样写入记录
+        """
+        record = dict(self.context)
+        record.update({
+            'gen': gen,
+            'elapsed': time.perf_counter() - self._start,
+            'rhythm': summarize(rhythm_fitness),
+            'pitch': summarize(pitch_fitness),
+            'total': summarize(total_fitness),
+            'unique_phenotypes': unique_phenotypes,
+            'evaluations': evaluations,
+            'evaluations_total': evaluations_total,
+            'cache_hits': cache_hits,
+            'eval_time': eval_time,
+            'breed_time': breed_time,
+        })
+        record.update(extra)
+        self.emit(record)
+        return record
+
+    def emit(self, record):
+        """写出一条已构建好的记录"""
+        self.records += 1
+        if self.callback is not None:
+            self.callback(record)
+        if self.path is not None:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def read_telemetry(path):
+    """读取 JSONL 遥测文件，返回记录列表"""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
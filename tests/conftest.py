@@ -0,0 +1,26 @@
+"""
+测试公共设置：把仓库根目录加入 sys.path（模块都在根目录下），
+并在每个测试之后恢复 RHYTHM_WEIGHTS / PITCH_WEIGHTS（测试会原地修改权重）
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoint import capture_weights, restore_weights  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _keep_weights():
+    weights = capture_weights()
+    yield
+    restore_weights(weights)
+
+
+def set_enabled(weights, enabled):
+    """只启用 enabled 中的分量（权重1.0），其余为0"""
+    for key in weights:
+        weights[key] = 1.0 if key in enabled else 0.0
@@ -0,0 +1,81 @@
+"""从检查点续跑与不中断的运行逐位相同（最优个体、评估次数、按预算停止的代数）"""
+
+import pytest
+
+import fitness_function_rhythm as fr
+import fitness_function_pitch as fp
+import main
+from checkpoint import CheckpointWriter, load_checkpoint
+from ga_numpy import run_genetic_algorithm_numpy
+from stopping import StoppingRule
+
+SCALE = main.SCALES['C_major']
+ENGINES = {
+    'python': main.run_genetic_algorithm,
+    'numpy': run_genetic_algorithm_numpy,
+}
+
+
+def _run(engine, **kwargs):
+    run_info = {}
+    best = ENGINES[engine](fr.rhythm_fitness_overall, fp.pitch_fitness_overall, SCALE,
+                           pop_size=60, seed=3, run_info=run_info, **kwargs)
+    return (best.total_fitness, bytes(best.rhythm_genes), bytes(best.pitch_genes)), run_info
+
+
+def _checkpoint(engine, path, gen, **kwargs):
+    """运行到第 gen 代并在该代保存检查点"""
+    with CheckpointWriter(str(path), interval=gen) as writer:
+        _run(engine, max_gen=gen + 1, checkpointer=writer, **kwargs)
+    assert load_checkpoint(str(path))['gen'] == gen
+
+
+@pytest.fixture(params=['python', 'python-delta', 'numpy'])
+def engine(request, monkeypatch):
+    monkeypatch.setattr(main, 'DELTA_EVALUATION', request.param == 'python-delta')
+    return request.param.split('-')[0]
+
+
+def test_resume_is_bit_identical(engine, tmp_path):
+    expected, info = _run(engine, max_gen=80)
+    path = tmp_path / 'run.ckpt'
+    _checkpoint(engine, path, 40)
+    resumed, resumed_info = _run(engine, max_gen=80, resume=str(path))
+    assert resumed == expected
+    assert resumed_info['evaluations'] == info['evaluations']
+    assert resumed_info['generations'] == info['generations']
+
+
+def test_resume_stops_on_the_same_budget(engine, tmp_path):
+    _, info = _run(engine, max_gen=80)
+    budget = info['evaluations'] - 500
+    expected, info = _run(engine, max_gen=80, stopping=StoppingRule(max_evaluations=budget))
+    path = tmp_path / 'run.ckpt'
+    _checkpoint(engine, path, 30, stopping=StoppingRule(max_evaluations=budget))
+    resumed, resumed_info = _run(engine, max_gen=80, resume=str(path),
+                                 stopping=StoppingRule(max_evaluations=budget))
+    assert resumed == expected
+    assert info['generations'] < 80
+    assert (resumed_info['generations'], resumed_info['evaluations']) \
+        == (info['generations'], info['evaluations'])
+
+
+def test_resume_restores_weights(engine, tmp_path):
+    fp.PITCH_WEIGHTS['climax'] = 0.0
+    expected, _ = _run(engine, max_gen=60)
+    path = tmp_path / 'run.ckpt'
+    _checkpoint(engine, path, 20)
+    fp.PITCH_WEIGHTS['climax'] = 1.0
+    resumed, _ = _run(engine, max_gen=60, resume=str(path))
+    assert resumed == expected
+    assert fp.PITCH_WEIGHTS['climax'] == 0.0
+
+
+def test_resume_past_max_gen_is_rejected(engine, tmp_path):
+    path = tmp_path / 'run.ckpt'
+    _checkpoint(engine, path, 20)
+    for max_gen in (20, 10):
+        with pytest.raises(ValueError, match='max_gen'):
+            _run(engine, max_gen=max_gen, resume=str(path))
+    _, info = _run(engine, max_gen=21, resume=str(path))
+    assert info['generations'] == 21
@@ -0,0 +1,92 @@
+"""delta_fitness 的增量评估与完整评估、逐旋律的 *_fitness_overall 逐位相同"""
+
+import random
+
+import pytest
+
+import delta_fitness
+import fitness_function_rhythm as fr
+import fitness_function_pitch as fp
+import main
+from conftest import set_enabled
+from main import Individual, MelodyAdapter, SCALES, decode_genes
+
+SCALE = SCALES['C_major']
+CONFIGS = [
+    None,  # config 中的默认权重
+    (fr.RHYTHM_WEIGHTS.keys(), fp.PITCH_WEIGHTS.keys()),
+    (('parity', 'syncopation'), ('stepwise', 'climax')),
+    (('density', 'rest'), ('direction',)),
+    (('pattern',), ('consonance', 'range')),
+    ((), ('stepwise',)),
+    (('rest',), ()),
+]
+
+
+def decode(rhythm_genes, pitch_genes):
+    return decode_genes(rhythm_genes, pitch_genes, SCALE)
+
+
+def _apply(config):
+    if config is not None:
+        set_enabled(fr.RHYTHM_WEIGHTS, config[0])
+        set_enabled(fp.PITCH_WEIGHTS, config[1])
+
+
+def _scalar(rhythm_genes, pitch_genes):
+    melody = MelodyAdapter(decode(rhythm_genes, pitch_genes), rhythm_genes, pitch_genes)
+    return fr.rhythm_fitness_overall(melody), fp.pitch_fitness_overall(melody)
+
+
+def _mutate(rng, rhythm, pitch):
+    """点变异：0-5 个位置（超过 max_changes 时走完整评估）"""
+    rhythm, pitch = list(rhythm), list(pitch)
+    for _ in range(rng.randint(0, 5)):
+        i = rng.randrange(len(rhythm))
+        if rng.random() < 0.5:
+            rhythm[i] = rng.randint(0, 2)
+        else:
+            pitch[i] = rng.randrange(len(SCALE))
+    return rhythm, pitch
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+def test_delta_matches_full_and_scalar(config):
+    _apply(config)
+    rng = random.Random(0)
+    for _ in range(200):
+        ind = Individual(scale_notes=SCALE, rng=rng)
+        rhythm, pitch = list(ind.rhythm_genes), list(ind.pitch_genes)
+        state = delta_fitness.evaluate_full(rhythm, pitch, decode(rhythm, pitch))
+        assert (state.rhythm_fitness, state.pitch_fitness) == _scalar(rhythm, pitch)
+        # 多代链式修补
+        for _ in range(5):
+            rhythm, pitch = _mutate(rng, rhythm, pitch)
+            state = delta_fitness.evaluate_delta(state, rhythm, pitch, SCALE, decode)
+            full = delta_fitness.evaluate_full(rhythm, pitch, decode(rhythm, pitch))
+            assert (state.rhythm_fitness, state.pitch_fitness) \
+                == (full.rhythm_fitness, full.pitch_fitness) == _scalar(rhythm, pitch)
+
+
+def test_weights_changed_between_generations():
+    """父代在另一组权重下评估（如网格搜索在同一进程中切换权重）"""
+    rng = random.Random(1)
+    for i in range(200):
+        _apply(CONFIGS[2 + i % 5])
+        ind = Individual(scale_notes=SCALE, rng=rng)
+        rhythm, pitch = list(ind.rhythm_genes), list(ind.pitch_genes)
+        state = delta_fitness.evaluate_full(rhythm, pitch, decode(rhythm, pitch))
+        _apply(CONFIGS[2 + (i + 1) % 5])
+        rhythm, pitch = _mutate(rng, rhythm, pitch)
+        state = delta_fitness.evaluate_delta(state, rhythm, pitch, SCALE, decode)
+        assert (state.rhythm_fitness, state.pitch_fitness) == _scalar(rhythm, pitch)
+
+
+def test_run_with_delta_matches_full_evaluation(monkeypatch):
+    def best(delta):
+        monkeypatch.setattr(main, 'DELTA_EVALUATION', delta)
+        ind = main.run_genetic_algorithm(fr.rhythm_fitness_overall, fp.pitch_fitness_overall,
+                                         SCALE, pop_size=60, max_gen=40, seed=3)
+        return ind.total_fitness, ind.rhythm_genes, ind.pitch_genes
+
+    assert best(True) == best(False)
@@ -0,0 +1,68 @@
+"""fitness_cache 的 LRU 语义，以及开启缓存不改变进化结果"""
+
+import fitness_function_rhythm as fr
+import fitness_function_pitch as fp
+import main
+from fitness_cache import FitnessCache, phenotype_key, weights_fingerprint
+from fitness_function_rhythm import RHYTHM_WEIGHTS
+from fitness_function_pitch import PITCH_WEIGHTS
+
+
+def test_lru_eviction_and_counts():
+    cache = FitnessCache(max_size=2)
+    cache.put('a', (1, 2))
+    cache.put('b', (3, 4))
+    assert cache.get('a') == (1, 2)  # a 变为最近使用
+    cache.put('c', (5, 6))           # 淘汰 b
+    assert cache.get('b') is None
+    assert cache.get('a') == (1, 2) and cache.get('c') == (5, 6)
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert cache.hit_ratio == 0.75
+
+    disabled = FitnessCache(max_size=0)
+    disabled.put('a', (1, 2))
+    assert disabled.get('a') is None and len(disabled) == 0
+
+
+def test_weights_change_the_key():
+    notes = [(60, 0, 1.0), (62, 1, 0.5)]
+    rhythm = [1, 2, 1]
+    before = phenotype_key(notes, rhythm, weights_fingerprint(RHYTHM_WEIGHTS, PITCH_WEIGHTS))
+    assert before == phenotype_key(list(notes), bytes(rhythm),
+                                   weights_fingerprint(dict(RHYTHM_WEIGHTS), dict(PITCH_WEIGHTS)))
+    PITCH_WEIGHTS['stepwise'] += 1.0
+    assert before != phenotype_key(notes, rhythm, weights_fingerprint(RHYTHM_WEIGHTS, PITCH_WEIGHTS))
+
+
+def test_snapshot_round_trip():
+    old_key, new_key = 'old', 'new'
+    cache = FitnessCache(max_size=8)
+    for i in range(5):
+        cache.put(((i,), bytes([i]), old_key), (i, -i))
+    cache.put(((9,), b'\x09', 'other'), (9, 9))  # 其他权重下的条目不保存
+    cache.get(((0,), b'\x00', old_key))
+    cache.get(((7,), b'\x07', old_key))
+
+    restored = FitnessCache(max_size=8)
+    restored.restore(cache.snapshot(old_key), new_key)
+    assert list(restored._data) == [((i,), bytes([i]), new_key) for i in (1, 2, 3, 4, 0)]
+    assert (restored.hits, restored.misses) == (cache.hits, cache.misses)
+
+
+def _best(monkeypatch, cache_size, fused):
+    monkeypatch.setattr(main, 'FITNESS_CACHE_SIZE', cache_size)
+    monkeypatch.setattr(main, 'FUSED_EVALUATION', fused)
+    run_info = {}
+    best = main.run_genetic_algorithm(fr.rhythm_fitness_overall, fp.pitch_fitness_overall,
+                                      main.SCALES['C_major'], pop_size=60, max_gen=40,
+                                      seed=5, run_info=run_info)
+    return (best.total_fitness, best.rhythm_genes, best.pitch_genes), run_info['evaluations']
+
+
+def test_cache_does_not_change_the_run(monkeypatch):
+    for fused in (True, False):
+        cached, cached_evaluations = _best(monkeypatch, 4096, fused)
+        uncached, uncached_evaluations = _best(monkeypatch, 0, fused)
+        assert cached == uncached
+        assert cached_evaluations < uncached_evaluations
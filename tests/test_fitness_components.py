@@ -0,0 +1,79 @@
+"""fitness_components 的分量矩阵、加权总分与逐函数计算一致，分量缓存按表现型命中"""
+
+import numpy as np
+
+import Music_Math
+import fitness_function
+from fitness_components import (
+    COMPONENT_KEYS, EMPTY_SCORE, ComponentCache, component_matrix, weighted_totals,
+)
+from music_math_numpy import MusicMathPopulation, decode_genes
+
+SCALAR = [
+    fitness_function.fitness_function_11,
+    fitness_function.fitness_function_10,
+    fitness_function.fitness_rhythmic_sustain,
+    fitness_function.fitness_rhythmic_rest,
+]
+WEIGHTS = [(0.5, 0.7, 1.1, 1.3, 0.0), (4.7, 3.9, 0.5, 2.9, 0.0), (1, 1, 1, 1, 0), (0, 0, 2.2, 0, 0)]
+
+
+def _genes():
+    rng = np.random.default_rng(0)
+    genes = MusicMathPopulation(400, rng=rng).genes
+    genes[:60] = rng.integers(0, Music_Math.CODE_HOLD + 1, size=(60, Music_Math.GENOME_LENGTH))
+    genes[60:65] = Music_Math.CODE_REST  # 没有音符
+    genes[65:130] = genes[130:195]       # 重复的表现型
+    return genes
+
+
+def _melodies(genes):
+    return [Music_Math.MelodyAdapter(Music_Math.Individual(row.tolist()).to_notes())
+            for row in genes]
+
+
+def test_component_matrix_matches_scalar():
+    genes = _genes()
+    table = decode_genes(genes)
+    components = component_matrix(table)
+    assert components.shape == (len(genes), len(COMPONENT_KEYS))
+    for i, melody in enumerate(_melodies(genes)):
+        if melody.notes:
+            assert components[i, :4].tolist() == [func(melody) for func in SCALAR]
+
+
+def test_weighted_totals_match_combined_functions():
+    genes = _genes()
+    table = decode_genes(genes)
+    totals = weighted_totals(component_matrix(table), WEIGHTS, table.counts)
+    melodies = _melodies(genes)
+    for k, weights in enumerate(WEIGHTS):
+        func = fitness_function.create_weighted_fitness(*weights)
+        expected = np.array([func(melody) for melody in melodies])
+        # 矩阵乘法的累加顺序不同：与逐函数累加在浮点误差范围内一致
+        np.testing.assert_allclose(totals[:, k], expected, rtol=1e-12, atol=1e-9)
+    assert (totals[table.counts == 0] == EMPTY_SCORE).all()
+
+    # 组合函数本身（带 weights 属性）也可以作为权重组
+    funcs = [fitness_function.create_weighted_fitness(*weights) for weights in WEIGHTS]
+    np.testing.assert_array_equal(weighted_totals(component_matrix(table), funcs, table.counts),
+                                  totals)
+
+
+def test_component_cache_hits_by_phenotype():
+    genes = _genes()
+    table = decode_genes(genes)
+    unique = len({bytes(row) for row in genes})
+    cache = ComponentCache()
+    first = cache.lookup(table)
+    np.testing.assert_array_equal(first, component_matrix(table))
+    assert len(cache) <= unique  # 基因不同、表现型相同的行共享一个条目
+    assert cache.misses == len(genes) and cache.hits == 0
+
+    second = cache.lookup(table)
+    np.testing.assert_array_equal(second, first)
+    assert cache.hits == len(genes)
+
+    small = ComponentCache(max_size=10)
+    np.testing.assert_array_equal(small.lookup(table), first)
+    assert len(small) == 10
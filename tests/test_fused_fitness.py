@@ -0,0 +1,62 @@
+"""融合评估与 rhythm_fitness_overall / pitch_fitness_overall 逐位一致"""
+
+import random
+
+import pytest
+
+import fitness_function_rhythm as fr
+import fitness_function_pitch as fp
+import fused_fitness
+from main import Individual, MelodyAdapter, SCALES
+from conftest import set_enabled
+
+
+def _melodies(seed):
+    rng = random.Random(seed)
+    scale = SCALES['C_major']
+    melodies = []
+    for _ in range(500):
+        ind = Individual(scale_notes=scale, rng=rng)
+        melodies.append(MelodyAdapter(ind.to_notes(), ind.rhythm_genes, ind.pitch_genes))
+    # 短序列与空旋律
+    for length in (0, 1, 2, 3, 5):
+        for _ in range(20):
+            rhythm = bytearray(rng.choice((0, 1, 2)) for _ in range(length))
+            notes = [(rng.randint(0, 127), 0, 1) for _ in range(rng.randint(0, 4))]
+            melodies.append(MelodyAdapter(notes, rhythm, bytearray()))
+    return melodies
+
+
+def _random_configs(count, seed):
+    rng = random.Random(seed)
+    keys = list(fr.RHYTHM_WEIGHTS) + list(fp.PITCH_WEIGHTS)
+    return [set(rng.sample(keys, rng.randint(0, len(keys)))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('enabled', [None] + _random_configs(6, seed=0))
+def test_fused_matches_overall(enabled):
+    if enabled is not None:
+        set_enabled(fr.RHYTHM_WEIGHTS, enabled)
+        set_enabled(fp.PITCH_WEIGHTS, enabled)
+    evaluate = fused_fitness.get_evaluator()
+    for melody in _melodies(seed=4):
+        rhythm, pitch, breakdown = evaluate(melody.rhythm_genes, melody.notes)
+        assert rhythm == fr.rhythm_fitness_overall(melody)
+        assert pitch == fp.pitch_fitness_overall(melody)
+        for key, value in breakdown.items():
+            scalar = getattr(fr, 'rhythm_fitness_' + key, None) or getattr(fp, 'pitch_fitness_' + key)
+            assert value == scalar(melody), key
+        total, _ = fused_fitness.fused_fitness(melody)
+        assert total == rhythm + pitch
+
+
+def test_evaluator_follows_weight_changes():
+    melody = _melodies(seed=5)[0]
+    before = fused_fitness.get_evaluator()(melody.rhythm_genes, melody.notes)
+    set_enabled(fr.RHYTHM_WEIGHTS, {'density'})
+    rhythm, _, _ = fused_fitness.get_evaluator()(melody.rhythm_genes, melody.notes)
+    assert rhythm == fr.rhythm_fitness_overall(melody)
+    fr.RHYTHM_WEIGHTS.update({key: 1.0 for key in fr.RHYTHM_WEIGHTS})
+    assert fused_fitness.get_evaluator()(melody.rhythm_genes, melody.notes)[0] == \
+        fr.rhythm_fitness_overall(melody)
+    assert before[1] == fp.pitch_fitness_overall(melody)
@@ -0,0 +1,133 @@
+"""ga_numpy 的矩阵化种群：适应度与逐个体计算一致，批量算子与 main.py 中的逐元素规则一致"""
+
+import copy
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+import fitness_function_rhythm as fr
+import fitness_function_pitch as fp
+from config import RHYTHM_NOTE, RHYTHM_HOLD
+from ga_numpy import NumpyPopulation, TRANSPOSE_SHIFTS, run_genetic_algorithm_numpy
+from main import MelodyAdapter, SCALES
+
+SCALE = SCALES['C_major']
+
+
+def _population(seed, pop_size=300):
+    population = NumpyPopulation(SCALE, pop_size=pop_size, rng=np.random.default_rng(seed))
+    # 混入任意节奏（首位不一定是发声）与全休止的行
+    population.rhythm[:50] = population.rng.integers(0, 3, size=(50, population.rhythm.shape[1]))
+    population.rhythm[50:55] = 0
+    return population
+
+
+def _replay(population):
+    """与 population.rng 处于同一状态的独立生成器"""
+    rng = np.random.default_rng()
+    rng.bit_generator.state = copy.deepcopy(population.rng.bit_generator.state)
+    return rng
+
+
+def _density_rowwise(melody):
+    """没有批量版本的函数：走逐行路径"""
+    return fr.rhythm_fitness_density(melody)
+
+
+def test_evaluate_matches_scalar():
+    population = _population(0)
+    population.evaluate(fr.rhythm_fitness_overall, fp.pitch_fitness_overall)
+    for i in range(population.pop_size):
+        ind = population.to_individual(i)
+        melody = MelodyAdapter(ind.to_notes(), ind.rhythm_genes, ind.pitch_genes)
+        assert population.rhythm_fitness[i] == fr.rhythm_fitness_overall(melody)
+        assert population.pitch_fitness[i] == fp.pitch_fitness_overall(melody)
+
+    population.evaluate(fr.rhythm_fitness_density, fp.pitch_fitness_overall)
+    batch = population.rhythm_fitness.copy()
+    population.evaluate(_density_rowwise, fp.pitch_fitness_overall)
+    np.testing.assert_array_equal(population.rhythm_fitness, batch)
+
+
+def test_sort_is_stable_descending():
+    population = _population(1)
+    population.evaluate(fr.rhythm_fitness_overall, fp.pitch_fitness_overall)
+    before = [(float(t), bytes(r)) for t, r in zip(population.total_fitness, population.rhythm)]
+    population.sort()
+    expected = sorted(before, key=lambda item: item[0], reverse=True)
+    assert [(float(t), bytes(r)) for t, r in zip(population.total_fitness, population.rhythm)] \
+        == expected
+
+
+def test_crossover_matches_single_point_rule():
+    population = _population(2)
+    genes1, genes2 = population.rhythm[:150], population.rhythm[150:]
+    replay = _replay(population)
+    c1, c2 = population.crossover(genes1, genes2, rate=0.7)
+    do_cross = replay.random(len(genes1)) < 0.7
+    points = replay.integers(1, genes1.shape[1], size=len(genes1))
+    for i in range(len(genes1)):
+        a, b = genes1[i].tolist(), genes2[i].tolist()
+        point = points[i] if do_cross[i] else len(a)
+        assert c1[i].tolist() == a[:point] + b[point:]
+        assert c2[i].tolist() == b[:point] + a[point:]
+
+
+def test_transform_pitch_matches_scalar_rules():
+    population = _population(3)
+    genes = population.pitch
+    num = population.num_scale_notes
+    replay = _replay(population)
+    out = population.transform_pitch(genes, rate=0.5)
+
+    n = len(genes)
+    selected = replay.random(n) < 0.5
+    ops = replay.integers(0, 3, size=n)
+    shifts = TRANSPOSE_SHIFTS[replay.integers(0, len(TRANSPOSE_SHIFTS), size=n)]
+    for i in range(n):
+        row = genes[i].tolist()
+        if selected[i] and ops[i] == 0:  # 同 musical_transform_pitch
+            row = [(g + int(shifts[i])) % num for g in row]
+        elif selected[i] and ops[i] == 1:
+            row = [(2 * (num // 2) - g) % num for g in row]
+        elif selected[i]:
+            row.reverse()
+        assert out[i].tolist() == row
+
+
+def test_transform_rhythm_matches_scalar_rules():
+    population = _population(4)
+    genes = population.rhythm
+    replay = _replay(population)
+    out = population.transform_rhythm(genes, rate=0.5)
+
+    n, length = genes.shape
+    selected = replay.random(n) < 0.5
+    ops = replay.integers(0, 3, size=n)
+    rand = {}
+    for op in (1, 2):
+        rows = np.flatnonzero(selected & (ops == op))
+        if len(rows):
+            rand.update(zip(rows.tolist(), replay.random((len(rows), length))))
+    for i in range(n):
+        row = genes[i].tolist()
+        if selected[i] and ops[i] == 0:
+            row.reverse()
+        elif selected[i] and ops[i] == 1:  # 同 musical_transform_rhythm 的增值
+            for j in range(length - 1):
+                if row[j] == RHYTHM_NOTE and rand[i][j] < 0.3:
+                    row[j + 1] = RHYTHM_HOLD
+        elif selected[i]:  # 减值
+            row = [RHYTHM_NOTE if g == RHYTHM_HOLD and r < 0.3 else g for g, r in zip(row, rand[i])]
+        row[0] = RHYTHM_NOTE
+        assert out[i].tolist() == row
+
+
+def test_run_is_reproducible():
+    def run():
+        with redirect_stdout(io.StringIO()):
+            best = run_genetic_algorithm_numpy(fr.rhythm_fitness_overall, fp.pitch_fitness_overall,
+                                               SCALE, pop_size=60, max_gen=30, seed=11)
+        return best.total_fitness, bytes(best.rhythm_genes), bytes(best.pitch_genes)
+    assert run() == run()
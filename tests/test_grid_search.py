@@ -0,0 +1,78 @@
+"""grid_search 的断点续跑：已完成的组合跳过，写了一半的索引行被截断并从结果文件补记"""
+
+import json
+import os
+
+import pytest
+
+import grid_search
+from grid_search import INDEX_FILENAME, RESULT_SUBDIR, read_index
+
+
+def _search(output_dir, **kwargs):
+    return grid_search.grid_search(output_dir=str(output_dir), count=3, workers=0,
+                                   pop_size=20, max_gen=5, seed=7, **kwargs)
+
+
+def _no_jobs(monkeypatch):
+    def fail(task):
+        raise AssertionError(f"不应重新运行 {grid_search.combo_name(task[0])}")
+    monkeypatch.setattr(grid_search, '_run_job', fail)
+
+
+def _index_data(output_dir):
+    with open(os.path.join(output_dir, INDEX_FILENAME), 'rb') as f:
+        return f.read()
+
+
+def test_rerun_skips_completed(tmp_path, monkeypatch):
+    first = _search(tmp_path)
+    assert len(first) == 3
+    for name, record in first.items():
+        with open(tmp_path / RESULT_SUBDIR / f"{name}.json", encoding='utf-8') as f:
+            assert json.load(f) == record
+
+    _no_jobs(monkeypatch)
+    assert _search(tmp_path) == first
+    assert _index_data(tmp_path).count(b'\n') == 3
+
+
+def test_same_seed_same_scores(tmp_path):
+    first = _search(tmp_path / 'a')
+    second = _search(tmp_path / 'b')
+    assert {name: r['best_score'] for name, r in first.items()} \
+        == {name: r['best_score'] for name, r in second.items()}
+
+
+def test_torn_last_line_is_re_recorded(tmp_path, monkeypatch):
+    first = _search(tmp_path)
+    lines = _index_data(tmp_path).splitlines()
+    # 追加最后一条记录时中断：末行只写了一半
+    with open(tmp_path / INDEX_FILENAME, 'wb') as f:
+        f.write(b"\n".join(lines[:2]) + b"\n" + lines[2][:15])
+
+    assert len(read_index(str(tmp_path))) == 2
+    _no_jobs(monkeypatch)
+    assert _search(tmp_path) == first
+    data = _index_data(tmp_path)
+    assert data.endswith(b"\n")
+    assert [json.loads(line) for line in data.splitlines()] \
+        == [first[json.loads(line)['name']] for line in lines]
+
+
+def test_missing_final_newline_is_repaired(tmp_path):
+    first = _search(tmp_path)
+    data = _index_data(tmp_path)
+    with open(tmp_path / INDEX_FILENAME, 'wb') as f:
+        f.write(data.rstrip(b"\n"))
+    assert read_index(str(tmp_path), repair=True) == first
+    assert _index_data(tmp_path) == data
+
+
+def test_corrupt_middle_line_is_an_error(tmp_path):
+    _search(tmp_path)
+    lines = _index_data(tmp_path).splitlines()
+    with open(tmp_path / INDEX_FILENAME, 'wb') as f:
+        f.write(b"\n".join([lines[0][:15]] + lines[1:]) + b"\n")
+    with pytest.raises(ValueError):
+        read_index(str(tmp_path))
@@ -0,0 +1,102 @@
+"""音程查找表与逐音程规则一致；超出表范围的音程（非 MIDI 音高）在各评估路径中按规则计算"""
+
+import random
+
+import numpy as np
+import pytest
+
+import delta_fitness
+import fitness_function_pitch as fp
+import fitness_function_rhythm as fr
+import fused_fitness
+from conftest import set_enabled
+from fitness_function_pitch_batch import PITCH_BATCH_FUNCS, pitch_matrix_from_notes
+from main import MelodyAdapter
+
+RULES = {
+    'stepwise': lambda diff: fp.stepwise_interval_score(abs(diff)),
+    'consonance': lambda diff: fp.consonance_interval_score(abs(diff)),
+    'direction': fp.interval_direction,
+}
+
+
+def _reference(key, pitches):
+    """查找表之前的写法：逐音程调用规则函数"""
+    n = len(pitches)
+    values = [RULES[key](b - a) for a, b in zip(pitches, pitches[1:])]
+    if key != 'direction':
+        return sum(values) / (n - 1) if n >= 2 else 0
+    if n < 3:
+        return 0
+    turns = sum(fp.is_direction_change(a, b) for a, b in zip(values, values[1:]))
+    return turns / (len(values) - 1) * 20
+
+
+def _melodies(seed):
+    rng = random.Random(seed)
+    note_lists = [[(300, 0, 1), (10, 1, 1), (300, 2, 1)], [(0, 0, 1), (200, 1, 1), (0, 2, 1)]]
+    note_lists += [[(rng.randint(-300, 400), k, 1) for k in range(rng.choice([1, 2, 3, 8, 16]))]
+                   for _ in range(300)]
+    note_lists += [[(rng.randint(0, 127), k, 1) for k in range(8)] for _ in range(100)]
+    return [MelodyAdapter(notes, bytearray(rng.randint(0, 2) for _ in range(16)), bytearray())
+            for notes in note_lists]
+
+
+def test_tables_match_rules():
+    for key, rule in RULES.items():
+        table = fp.INTERVAL_TABLES[key]
+        assert len(table) == fp.INTERVAL_LAST + 1
+        for diff in range(-fp.INTERVAL_SPAN, fp.INTERVAL_SPAN + 1):
+            assert table[diff + fp.INTERVAL_OFFSET] == rule(diff)
+        for diff in (-400, -255, -128, 128, 255, 400):
+            assert fp.interval_value(key, diff) == rule(diff)
+
+
+def test_scalar_matches_rules_outside_table():
+    for melody in _melodies(0):
+        pitches = [n[0] for n in melody.notes]
+        for key in RULES:
+            assert getattr(fp, 'pitch_fitness_' + key)(melody) == _reference(key, pitches), \
+                (key, pitches)
+
+
+def test_batch_outside_table():
+    melodies = _melodies(1)
+    pitches, lengths = pitch_matrix_from_notes([m.notes for m in melodies])
+    for key, batch in PITCH_BATCH_FUNCS.items():
+        scalar = getattr(fp, 'pitch_fitness_' + key)
+        expected = np.array([scalar(m) for m in melodies], dtype=float)
+        np.testing.assert_array_equal(batch(pitches, lengths), expected, err_msg=key)
+
+
+@pytest.mark.parametrize('enabled', [None, {'stepwise', 'range'}, {'climax'}])
+def test_fused_and_delta_outside_table(enabled):
+    if enabled is not None:
+        set_enabled(fp.PITCH_WEIGHTS, enabled)
+    for melody in _melodies(2):
+        rhythm = list(melody.rhythm_genes)
+        expected_rhythm = fr.rhythm_fitness_overall(melody)
+        expected_pitch = fp.pitch_fitness_overall(melody)
+        total, _ = fused_fitness.fused_fitness(melody)
+        assert total == expected_rhythm + expected_pitch
+        state = delta_fitness.evaluate_full(rhythm, [0] * len(rhythm), melody.notes)
+        assert (state.rhythm_fitness, state.pitch_fitness) == (expected_rhythm, expected_pitch)
+
+
+def test_delta_patch_outside_table():
+    scale = [-200, 0, 60, 300]
+    rng = random.Random(3)
+
+    def decode(rhythm, pitch):
+        return [(scale[p], i, 1) for i, (r, p) in enumerate(zip(rhythm, pitch)) if r == 1]
+
+    for _ in range(200):
+        rhythm = [rng.choice((1, 1, 2, 0)) for _ in range(16)]
+        pitch = [rng.randrange(len(scale)) for _ in range(16)]
+        state = delta_fitness.evaluate_full(rhythm, pitch, decode(rhythm, pitch))
+        for _ in range(5):
+            pitch = list(pitch)
+            pitch[rng.randrange(16)] = rng.randrange(len(scale))
+            state = delta_fitness.evaluate_delta(state, rhythm, pitch, scale, decode)
+            melody = MelodyAdapter(decode(rhythm, pitch), rhythm, pitch)
+            assert state.pitch_fitness == fp.pitch_fitness_overall(melody)
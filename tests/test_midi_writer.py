@@ -0,0 +1,56 @@
+"""midi_writer 与 MIDIUtil（MIDIFile(1)）的输出逐字节相同"""
+
+import io
+import random
+
+import numpy as np
+import pytest
+
+import main
+from config import MIDI_TEMPO, MIDI_VELOCITY
+from midi_writer import MidiEncoder, encode_midi
+
+midiutil = pytest.importorskip('midiutil')
+
+
+def _midiutil_bytes(notes, tempo=MIDI_TEMPO, velocity=MIDI_VELOCITY):
+    """save_to_midi 原先的写法"""
+    mf = midiutil.MIDIFile(1)
+    mf.addTrackName(0, 0, "GA Melody")
+    mf.addTempo(0, 0, tempo)
+    for pitch, start, duration in notes:
+        mf.addNote(0, 0, pitch, start, duration, velocity)
+    buffer = io.BytesIO()
+    mf.writeFile(buffer)
+    return buffer.getvalue()
+
+
+def test_main_ga_output():
+    rng = random.Random(0)
+    scale = main.SCALES[main.DEFAULT_SCALE]
+    for _ in range(500):
+        notes = main.Individual(scale_notes=scale, rng=rng).to_notes()
+        assert encode_midi(notes) == _midiutil_bytes(notes)
+
+
+def test_music_math_output():
+    from music_math_numpy import MusicMathPopulation
+    population = MusicMathPopulation(300, rng=np.random.default_rng(1))
+    encoder = MidiEncoder()
+    for i in range(population.pop_size):
+        notes = population.to_individual(i).to_notes()
+        assert bytes(encoder.encode(notes)) == _midiutil_bytes(notes)
+
+
+def test_off_grid_times():
+    """不在0.5拍网格上的开始与时值（同音高互不重叠）"""
+    rng = random.Random(2)
+    for _ in range(500):
+        notes, now = [], 0.0
+        for _ in range(rng.randint(1, 16)):
+            now += rng.choice((0.0, round(rng.random(), 4)))
+            duration = round(rng.uniform(0.05, 2.0), 4)
+            notes.append((rng.randint(40, 90), round(now, 4), duration))
+            now += duration + 0.001
+        assert encode_midi(notes, tempo=97, velocity=80) == _midiutil_bytes(notes, 97, 80)
+    assert encode_midi([(79, 0.5333, 0.3333)]) == _midiutil_bytes([(79, 0.5333, 0.3333)])
@@ -0,0 +1,47 @@
+"""Music_Math 的批量解码与批量适应度与逐个体版本一致"""
+
+import numpy as np
+
+import Music_Math
+import fitness_function
+from fitness_function_batch import FITNESS_BATCH_VERSIONS, batch_version
+from music_math_numpy import MusicMathPopulation, decode_genes
+
+
+def _genes():
+    rng = np.random.default_rng(0)
+    genes = MusicMathPopulation(600, rng=rng).genes
+    # 任意基因（含首位延长）、全休止、全延长
+    genes[:100] = rng.integers(0, Music_Math.CODE_HOLD + 1, size=(100, Music_Math.GENOME_LENGTH))
+    genes[100:110] = Music_Math.CODE_REST
+    genes[110:120] = Music_Math.CODE_HOLD
+    return genes
+
+
+def _scalar_scores(func, individuals):
+    scores = []
+    for ind in individuals:
+        try:
+            scores.append(func(Music_Math.MelodyAdapter(ind.to_notes())))
+        except Exception:
+            scores.append(0)  # 同 run_genetic_algorithm
+    return np.array(scores, dtype=float)
+
+
+def test_decode_matches_to_notes():
+    genes = _genes()
+    table = decode_genes(genes)
+    for i, row in enumerate(genes):
+        assert table.notes(i) == Music_Math.Individual(row.tolist()).to_notes()
+
+
+def test_batch_fitness_matches_scalar():
+    genes = _genes()
+    table = decode_genes(genes)
+    individuals = [Music_Math.Individual(row.tolist()) for row in genes]
+    funcs = list(FITNESS_BATCH_VERSIONS)
+    funcs += [fitness_function.create_weighted_fitness(*w)
+              for w in [(0.5, 0.7, 1.1, 1.3, 0.0), (4.7, 3.9, 0.5, 2.9, 0.0), (1, 1, 1, 1, 0)]]
+    for func in funcs:
+        np.testing.assert_array_equal(batch_version(func)(table), _scalar_scores(func, individuals),
+                                      err_msg=func.__name__)
@@ -0,0 +1,44 @@
+"""批量音高适应度与 fitness_function_pitch 的逐旋律版本逐位一致"""
+
+import random
+
+import numpy as np
+import pytest
+
+import fitness_function_pitch as fp
+from fitness_function_pitch_batch import (
+    PITCH_BATCH_FUNCS, pitch_fitness_overall_batch, pitch_matrix_from_notes,
+)
+from main import Individual, MelodyAdapter, SCALES
+from conftest import set_enabled
+
+
+def _note_lists(seed):
+    rng = random.Random(seed)
+    scale = SCALES['C_major']
+    note_lists = [Individual(scale_notes=scale, rng=rng).to_notes() for _ in range(500)]
+    # 短旋律与任意 MIDI 音高
+    note_lists += [[(rng.randint(0, 127), 0, 1) for _ in range(rng.choice([0, 1, 2, 3, 20]))]
+                   for _ in range(1500)]
+    return note_lists
+
+
+def test_components_match_scalar():
+    note_lists = _note_lists(seed=2)
+    melodies = [MelodyAdapter(notes, bytearray(), bytearray()) for notes in note_lists]
+    pitches, lengths = pitch_matrix_from_notes(note_lists)
+    for key, batch in PITCH_BATCH_FUNCS.items():
+        scalar = getattr(fp, 'pitch_fitness_' + key)
+        expected = np.array([scalar(m) for m in melodies], dtype=float)
+        np.testing.assert_array_equal(batch(pitches, lengths), expected, err_msg=key)
+
+
+@pytest.mark.parametrize('enabled', [None, {'stepwise', 'range', 'climax'}, set()])
+def test_overall_matches_scalar(enabled):
+    if enabled is not None:
+        set_enabled(fp.PITCH_WEIGHTS, enabled)
+    note_lists = _note_lists(seed=3)
+    pitches, lengths = pitch_matrix_from_notes(note_lists)
+    expected = [fp.pitch_fitness_overall(MelodyAdapter(notes, bytearray(), bytearray()))
+                for notes in note_lists]
+    np.testing.assert_array_equal(pitch_fitness_overall_batch(pitches, lengths), expected)
@@ -0,0 +1,45 @@
+"""批量节奏适应度与 fitness_function_rhythm 的逐旋律版本逐位一致"""
+
+import random
+
+import numpy as np
+import pytest
+
+import fitness_function_rhythm as fr
+from fitness_function_rhythm_batch import RHYTHM_BATCH_FUNCS, rhythm_fitness_overall_batch
+from main import Individual, MelodyAdapter, SCALES
+from conftest import set_enabled
+
+
+def _rows(length, count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        p = rng.random()
+        weights = [p, (1 - p) / 2, (1 - p) / 2]
+        rows.append([rng.choices((0, 1, 2), weights)[0] for _ in range(length)])
+    return rows
+
+
+@pytest.mark.parametrize('length', [1, 3, 8, 32, 33])
+def test_components_match_scalar(length):
+    rows = _rows(length, 1000, seed=length)
+    melodies = [MelodyAdapter([], bytearray(row), bytearray()) for row in rows]
+    matrix = np.array(rows, dtype=np.int8)
+    for key, batch in RHYTHM_BATCH_FUNCS.items():
+        scalar = getattr(fr, 'rhythm_fitness_' + key)
+        expected = np.array([scalar(m) for m in melodies], dtype=float)
+        np.testing.assert_array_equal(batch(matrix), expected, err_msg=key)
+
+
+@pytest.mark.parametrize('enabled', [None, {'parity', 'syncopation', 'pattern'}, set()])
+def test_overall_matches_scalar_on_ga_genomes(enabled):
+    if enabled is not None:
+        set_enabled(fr.RHYTHM_WEIGHTS, enabled)
+    rng = random.Random(1)
+    scale = SCALES['C_major']
+    genomes = [Individual(scale_notes=scale, rng=rng).rhythm_genes for _ in range(1000)]
+    expected = [fr.rhythm_fitness_overall(MelodyAdapter([], genes, bytearray()))
+                for genes in genomes]
+    np.testing.assert_array_equal(
+        rhythm_fitness_overall_batch(np.array(genomes, dtype=np.int8)), expected)
@@ -0,0 +1,57 @@
+"""位压缩节奏：得分与 fitness_function_rhythm 一致，变异 / 交叉与 main 中的版本在同一随机状态下一致"""
+
+import random
+
+import pytest
+
+import fitness_function_rhythm as fr
+import main
+from rhythm_bits import (
+    PackedRhythm, RHYTHM_BITS_FUNCS, rhythm_fitness_overall_bits, mutate_packed, crossover_packed,
+)
+
+
+class _Rhythm:
+    def __init__(self, genes):
+        self.rhythm_genes = genes
+        self.notes = []
+
+
+def _genomes(length, count, seed):
+    rng = random.Random(seed)
+    genomes = []
+    for _ in range(count):
+        p = rng.random()
+        weights = [p, (1 - p) / 2, (1 - p) / 2]
+        genomes.append(bytearray(rng.choices((0, 1, 2), weights)[0] for _ in range(length)))
+    return genomes
+
+
+@pytest.mark.parametrize('length', [0, 1, 2, 3, 7, 16, 31, 32, 33])
+def test_scores_match_scalar(length):
+    for genes in _genomes(length, 300, seed=length):
+        packed = PackedRhythm.from_genes(genes)
+        assert packed.to_genes() == genes
+        assert PackedRhythm.from_word(packed.to_word(), length) == packed
+        melody = _Rhythm(genes)
+        for key, func in RHYTHM_BITS_FUNCS.items():
+            assert func(packed) == getattr(fr, 'rhythm_fitness_' + key)(melody), key
+        assert rhythm_fitness_overall_bits(packed) == fr.rhythm_fitness_overall(melody)
+
+
+@pytest.mark.parametrize('length', [2, 5, 32])
+def test_operators_match_main_under_same_rng(length):
+    rng = random.Random(length)
+    genomes = _genomes(length, 200, seed=100 + length)
+    for genes, other in zip(genomes, reversed(genomes)):
+        packed, packed_other = PackedRhythm.from_genes(genes), PackedRhythm.from_genes(other)
+        seed = rng.random()
+        bits_rng, list_rng = random.Random(seed), random.Random(seed)
+
+        assert mutate_packed(packed, 0.2, bits_rng).to_genes() == \
+            main.mutate_rhythm(genes, 0.2, list_rng)
+
+        c1, c2 = crossover_packed(packed, packed_other, bits_rng)
+        d1, d2 = main.crossover_genes(genes, other, list_rng)
+        assert (c1.to_genes(), c2.to_genes()) == (d1, d2)
+        assert bits_rng.random() == list_rng.random()